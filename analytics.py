@@ -0,0 +1,124 @@
+import numpy as np
+
+# Dashboard aggregates, kept current by db_handler inside every candidate
+# insert (record) and wiped by clear_db (reset), so reading them never scans
+# the candidates. Histograms are fixed-size int64 count arrays stored one
+# BLOB per metric; per-skill and per-role totals are small keyed tables.
+SCORE_BIN_WIDTH = 5
+SCORE_BINS = 100 // SCORE_BIN_WIDTH
+# Yearly bins; the last one also holds everything above it
+EXPERIENCE_BINS = 31
+HISTOGRAMS = {"match_score": SCORE_BINS, "experience": EXPERIENCE_BINS}
+TOP_SKILLS = 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stats_histograms (
+    metric TEXT PRIMARY KEY,
+    counts BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stats_roles (
+    job_role TEXT PRIMARY KEY,
+    candidates INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    experience_sum REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS stats_skills (
+    skill TEXT PRIMARY KEY,
+    candidates INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_stats_skills_count ON stats_skills (candidates DESC, skill);
+"""
+
+def _bin(metric, value):
+    value = max(float(value or 0), 0.0)
+    if metric == "match_score":
+        return min(int(value // SCORE_BIN_WIDTH), SCORE_BINS - 1)
+    return min(int(value), EXPERIENCE_BINS - 1)
+
+def _histogram(conn, metric):
+    row = conn.execute("SELECT counts FROM stats_histograms WHERE metric = ?", (metric,)).fetchone()
+    if row is None:
+        return np.zeros(HISTOGRAMS[metric], dtype=np.int64)
+    return np.frombuffer(row[0], dtype='<i8').copy()
+
+def _add_to_histograms(conn, values):
+    """values: {metric: [value, ...]}; one read-modify-write per histogram."""
+    for metric, metric_values in values.items():
+        counts = _histogram(conn, metric)
+        np.add.at(counts, [_bin(metric, v) for v in metric_values], 1)
+        conn.execute("INSERT OR REPLACE INTO stats_histograms (metric, counts) VALUES (?, ?)",
+                     (metric, counts.astype('<i8').tobytes()))
+
+def _add_roles(conn, rows):
+    conn.executemany("INSERT INTO stats_roles (job_role, candidates, score_sum, experience_sum) "
+                     "VALUES (?, ?, ?, ?) ON CONFLICT (job_role) DO UPDATE SET "
+                     "candidates = candidates + excluded.candidates, "
+                     "score_sum = score_sum + excluded.score_sum, "
+                     "experience_sum = experience_sum + excluded.experience_sum", rows)
+
+def record(conn, candidate, skills):
+    """
+    Adds one stored candidate to the aggregates; called inside the insert's
+    transaction. skills are the normalised skills indexed for it.
+    """
+    score = candidate.get('match_score') or 0
+    experience = candidate.get('experience') or 0
+    _add_to_histograms(conn, {"match_score": [score], "experience": [experience]})
+    _add_roles(conn, [(candidate.get('job_role') or '', 1, score, experience)])
+    conn.executemany("INSERT INTO stats_skills (skill, candidates) VALUES (?, 1) "
+                     "ON CONFLICT (skill) DO UPDATE SET candidates = candidates + 1",
+                     [(skill,) for skill in skills])
+
+def reset(conn):
+    conn.execute("DELETE FROM stats_histograms")
+    conn.execute("DELETE FROM stats_roles")
+    conn.execute("DELETE FROM stats_skills")
+
+def rebuild(conn):
+    """Recomputes every aggregate from the candidate tables (for stores that predate them)."""
+    reset(conn)
+    values = {"match_score": [], "experience": []}
+    for row in conn.execute("SELECT match_score, experience FROM candidates"):
+        values["match_score"].append(row[0])
+        values["experience"].append(row[1])
+    _add_to_histograms(conn, values)
+    _add_roles(conn, conn.execute(
+        "SELECT COALESCE(job_role, ''), COUNT(*), COALESCE(SUM(match_score), 0), COALESCE(SUM(experience), 0) "
+        "FROM candidates GROUP BY COALESCE(job_role, '')").fetchall())
+    conn.execute("INSERT INTO stats_skills (skill, candidates) "
+                 "SELECT skill, COUNT(*) FROM candidate_skills GROUP BY skill")
+
+def summary(conn, top_skills=TOP_SKILLS):
+    """
+    Score and experience histograms, per-role counts and averages, and the
+    most common skills, read from the aggregates. Costs the same whatever
+    the number of candidates.
+    """
+    roles = conn.execute("SELECT job_role, candidates, score_sum, experience_sum FROM stats_roles "
+                         "ORDER BY candidates DESC, job_role").fetchall()
+    total = sum(row[1] for row in roles)
+    score_sum = sum(row[2] for row in roles)
+    experience_sum = sum(row[3] for row in roles)
+    skills = conn.execute("SELECT skill, candidates FROM stats_skills ORDER BY candidates DESC, skill LIMIT ?",
+                          (top_skills,)).fetchall()
+    return {
+        "candidates": total,
+        "average_score": round(score_sum / total, 2) if total else 0.0,
+        "average_experience": round(experience_sum / total, 2) if total else 0.0,
+        "score_histogram": {
+            "bin_edges": list(range(0, 101, SCORE_BIN_WIDTH)),
+            "counts": _histogram(conn, "match_score").tolist(),
+        },
+        "experience_histogram": {
+            # Yearly bins; the last one is open-ended, hence the null upper edge
+            "bin_edges": list(range(EXPERIENCE_BINS)) + [None],
+            "counts": _histogram(conn, "experience").tolist(),
+        },
+        "job_roles": [{
+            "job_role": row[0] or None,
+            "candidates": row[1],
+            "average_score": round(row[2] / row[1], 2),
+            "average_experience": round(row[3] / row[1], 2),
+        } for row in roles],
+        "top_skills": [[row[0], row[1]] for row in skills],
+    }
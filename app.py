@@ -1,16 +1,21 @@
-from flask import Flask, render_template, request, flash, redirect, url_for
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, Response, stream_with_context, abort, send_from_directory
 import os
 from werkzeug.utils import secure_filename
-from resume_parser import parse_resume
-from job_matcher import get_match_score, find_matching_skills
-from report_generator import generate_report
-from flask import Flask, render_template, request, redirect, url_for, flash
-from werkzeug.utils import secure_filename
-from resume_parser import parse_resume
-from job_matcher import get_match_score, find_matching_skills
-from report_generator import generate_report
 import db_handler
-import csv
+import ingest
+import resume_parser
+import report_generator
+import exporter
+import candidate_index
+import skill_index
+import scoring
+import metrics
+import archive
+import uploads
+import analytics
+import semantic
+import job_matcher
+import json
 
 app = Flask(__name__)
 app.secret_key = 'supersecretkey' # Change this in production
@@ -18,6 +23,11 @@ app.config['UPLOAD_FOLDER'] = 'static/uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024 # 16MB max size
 
 ALLOWED_EXTENSIONS = {'pdf', 'docx'}
+STREAM_PAGE_SIZE = 500
+MATCHES_DEFAULT_K = 20
+MATCHES_MAX_K = 500
+STATS_MAX_SKILLS = 500
+SKILL_SEARCH_MAX_FACETS = 100
 
 # Ensure upload directory exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -26,11 +36,16 @@ def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def allowed_upload(filename):
+    """Resumes, or ZIP/tar archives of them for bulk ingestion."""
+    return allowed_file(filename) or archive.is_archive(filename)
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
         job_description = request.form.get('job_description')
         files = request.files.getlist('resume')
+        scoring_method = scoring_arg(request.form)
         
         if not job_description:
             flash('Job description is required.')
@@ -40,105 +55,296 @@ def index():
             flash('No files selected.')
             return redirect(request.url)
 
-        results = []
-        
-        # Process each file
+        valid_files = []
         for file in files:
-            if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(filepath)
-                
-                # Parse
-                resume_data = parse_resume(filepath)
-                
-                if resume_data:
-                    # Match
-                    match_score = get_match_score(resume_data['text'], job_description)
-                    matching_skills, missing_skills = find_matching_skills(resume_data['text'], job_description)
-
-                    # Generate Report
-                    report_filename = f"report_{os.path.splitext(filename)[0]}.pdf"
-                    report_path = os.path.join(app.config['UPLOAD_FOLDER'], report_filename)
-                    generate_report(resume_data, match_score, matching_skills, missing_skills, report_path)
-                    
-                    # Save to DB
-                    candidate_entry = {
-                        "name": resume_data.get('name'),
-                        "email": resume_data.get('email'),
-                        "phone": resume_data.get('phone'),
-                        "experience": resume_data.get('experience'),
-                        "match_score": match_score,
-                        "skills": matching_skills,
-                        "education": resume_data.get('education'),
-                        "links": resume_data.get('links'),
-                        "report_file": report_filename,
-                        "job_role": "Batch Analysis"
-                    }
-                    db_handler.add_candidate(candidate_entry)
-                    
-                    # Add to current batch results
-                    candidate_entry['filename'] = filename
-                    candidate_entry['missing_skills'] = missing_skills # Store for single view if needed
-                    results.append(candidate_entry)
-                else:
-                    flash(f'Error parsing resume: {file.filename}')
-            else:
-                if file.filename != '': # Only flash if a file was actually attempted
-                    flash(f'Invalid file type for {file.filename}. Allowed types are PDF, DOCX.')
-
-        if not results:
+            if file and allowed_upload(file.filename):
+                valid_files.append(file)
+            elif file.filename != '': # Only flash if a file was actually attempted
+                flash(f'Invalid file type for {file.filename}. Allowed types are PDF, DOCX, or a ZIP/tar of them.')
+
+        if not valid_files:
             flash('No valid resumes were processed.')
             return redirect(request.url)
 
-        # Sort results by match score (Descending)
-        results.sort(key=lambda x: x['match_score'], reverse=True)
-        
-        # CSV Export Logic
-        csv_filename = None
-        if len(results) > 0:
-            # Use a more robust naming for CSV, e.g., based on timestamp or job description hash
-            csv_filename = f"ranking_{len(results)}_candidates_{os.urandom(4).hex()}.csv" 
-            csv_path = os.path.join(app.config['UPLOAD_FOLDER'], csv_filename)
-            with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['Rank', 'Name', 'Email', 'Match Score', 'Experience', 'Top Skills', 'Report File']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                for idx, res in enumerate(results):
-                    writer.writerow({
-                        'Rank': idx + 1,
-                        'Name': res.get('name', 'N/A'),
-                        'Email': res.get('email', 'N/A'),
-                        'Match Score': f"{res.get('match_score', 0)}%",
-                        'Experience': res.get('experience', 'N/A'),
-                        'Top Skills': ", ".join(res.get('skills', [])[:5]),
-                        'Report File': res.get('report_file', 'N/A')
-                    })
-
-        # Logic for Single vs Bulk
-        if len(results) == 1:
-            # Revert to single view logic for backward compatibility/UX
-            res = results[0]
-            return render_template('index.html', 
-                                   match_score=res['match_score'], 
-                                   resume_data=res,
-                                   matching_skills=res['skills'],
-                                   missing_skills=res['missing_skills'],
-                                   job_description=job_description,
-                                   report_filename=res['report_file'])
+        # Bulk uploads (and archives) go to the background ingestion queue
+        if len(valid_files) > 1 or archive.is_archive(valid_files[0].filename):
+            batch_id = ingest.create_batch(job_description,
+                                           [(secure_filename(f.filename), f.save) for f in valid_files],
+                                           scoring_method=scoring_method,
+                                           profile=bool(request.form.get('profile')))
+            return redirect(url_for('batch_status', batch_id=batch_id))
+
+        # Single resume: parsed straight from the upload stream, never written to disk
+        # unless originals are retained (under a content-addressed name)
+        file = valid_files[0]
+        filename = secure_filename(file.filename)
+        ingest.retain_upload(file.stream, filename)
+        try:
+            with metrics.timed('file'):
+                res = ingest.analyze_resume(file.stream, filename, job_description, scoring_method=scoring_method)
+        except ingest.ParseError as e:
+            metrics.inc('files_total', status='failed')
+            flash(str(e))
+            flash('No valid resumes were processed.')
+            return redirect(request.url)
+        if res.get('duplicate_of'):
+            metrics.inc('files_total', status='duplicate')
+            flash(f"{filename} is already stored as candidate {res['id']} "
+                  f"({res['similarity']:.0%} similar); scored against this job but not stored again.")
         else:
-            # For bulk, use the ranking list view
-            return render_template('index.html', 
-                                   job_description=job_description,
-                                   ranking_list=results,
-                                   csv_file=csv_filename)
+            metrics.inc('files_total', status='done')
+
+        # Single resume: detailed view
+        return render_template('index.html',
+                               match_score=res['match_score'],
+                               resume_data=res,
+                               matching_skills=res['skills'],
+                               missing_skills=res['missing_skills'],
+                               job_description=job_description,
+                               candidate_id=res['id'],
+                               scoring_methods=scoring.METHODS,
+                               scoring_method=scoring_method)
+
+    return render_template('index.html', scoring_methods=scoring.METHODS, scoring_method=scoring.DEFAULT_METHOD)
 
-    return render_template('index.html')
+def scoring_arg(form):
+    method = form.get('scoring')
+    return method if method in scoring.METHODS else scoring.DEFAULT_METHOD
+
+def _float_arg(args, name):
+    value = args.get(name, '').strip()
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+def candidate_filters(args):
+    """Reads the candidate sort/filter query parameters shared by the page and the API."""
+    skills = []
+    for value in args.getlist('skill'):
+        skills.extend(s.strip() for s in value.split(',') if s.strip())
+    sort = args.get('sort', 'date')
+    return {
+        "sort": sort if sort in db_handler.SORT_COLUMNS else 'date',
+        "order": 'asc' if args.get('order') == 'asc' else 'desc',
+        "skills": skills,
+        "min_score": _float_arg(args, 'min_score'),
+        "max_score": _float_arg(args, 'max_score'),
+        "job_role": args.get('job_role') or None,
+    }
 
 @app.route('/candidates')
 def candidates():
-    all_candidates = db_handler.get_candidates()
-    return render_template('candidates.html', candidates=all_candidates)
+    filters = candidate_filters(request.args)
+    try:
+        page, next_cursor = db_handler.query_candidates(cursor=request.args.get('cursor'), **filters)
+    except ValueError:
+        flash('Invalid page cursor, showing the first page.')
+        page, next_cursor = db_handler.query_candidates(**filters)
+
+    # Query string for the next page: current filters plus the new cursor
+    filters_args = request.args.to_dict(flat=False)
+    filters_args.pop('cursor', None)
+    next_args = dict(filters_args, cursor=next_cursor) if next_cursor else None
+    return render_template('candidates.html',
+                           candidates=page,
+                           filters=filters,
+                           job_roles=db_handler.get_job_roles(),
+                           filters_args=filters_args,
+                           next_args=next_args)
+
+@app.route('/candidates/<int:candidate_id>/report.pdf')
+def candidate_report(candidate_id):
+    """The candidate's PDF report, rendered on first request and cached afterwards."""
+    candidate = db_handler.get_candidate_by_id(candidate_id)
+    if not candidate:
+        abort(404)
+    # Candidates analysed before reports were deferred have a pre-rendered file
+    # and no stored missing skills, so serve that file as it was.
+    legacy_file = candidate.get('report_file')
+    if 'missing_skills' not in candidate and legacy_file and \
+            os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], legacy_file)):
+        return send_from_directory(app.config['UPLOAD_FOLDER'], legacy_file)
+    pdf = report_generator.candidate_report(candidate)
+    return Response(pdf, mimetype='application/pdf',
+                    headers={"Content-Disposition": f"inline; filename=report_{candidate_id}.pdf"})
+
+@app.route('/api/candidates')
+def api_candidates():
+    """Streams matching candidates as JSON, paging through the store as it goes."""
+    filters = candidate_filters(request.args)
+    cursor = request.args.get('cursor')
+    limit = request.args.get('limit', type=int)
+    if cursor:
+        try:
+            db_handler.decode_cursor(cursor, filters['sort'])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+    def generate():
+        yield '{"candidates": ['
+        page_cursor = cursor
+        sent = 0
+        while True:
+            size = STREAM_PAGE_SIZE if limit is None else min(STREAM_PAGE_SIZE, limit - sent)
+            if size <= 0:
+                break
+            page, page_cursor = db_handler.query_candidates(cursor=page_cursor, limit=size, **filters)
+            for candidate in page:
+                yield (',' if sent else '') + json.dumps(candidate)
+                sent += 1
+            if page_cursor is None:
+                break
+        # Where a client passing limit should resume; null once the end is reached
+        yield '], "next_cursor": ' + json.dumps(page_cursor) + '}'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+@app.route('/batches', methods=['POST'])
+def create_batch():
+    """Accepts a batch of resumes and returns its id immediately; processing runs in the background."""
+    job_description = request.form.get('job_description')
+    files = [f for f in request.files.getlist('resume') if f and allowed_upload(f.filename)]
+    if not job_description or not files:
+        return jsonify({"error": "job_description and at least one PDF/DOCX resume (or archive) are required."}), 400
+    batch_id = ingest.create_batch(job_description, [(secure_filename(f.filename), f.save) for f in files],
+                                   job_role=request.form.get('job_role') or "Batch Analysis",
+                                   scoring_method=scoring_arg(request.form),
+                                   profile=bool(request.form.get('profile')))
+    return jsonify({"batch_id": batch_id,
+                    "status_url": url_for('api_batch', batch_id=batch_id)}), 202
+
+@app.route('/api/uploads', methods=['POST'])
+def start_upload():
+    """
+    Starts a resumable upload for archives too big for one request. Send the
+    bytes with PUT /api/uploads/<id> in chunks under MAX_CONTENT_LENGTH, then
+    queue the archive with POST /api/uploads/<id>/batch.
+    """
+    filename = secure_filename(request.form.get('filename') or '')
+    size = request.form.get('size', type=int)
+    if not allowed_upload(filename) or not size:
+        return jsonify({"error": "filename (a PDF, DOCX, ZIP or tar) and size are required."}), 400
+    try:
+        upload_id = uploads.start_upload(filename, size)
+    except uploads.UploadError as e:
+        return jsonify({"error": str(e)}), 413
+    return jsonify({"upload_id": upload_id, "offset": 0,
+                    "upload_url": url_for('upload_status', upload_id=upload_id)}), 201
+
+@app.route('/api/uploads/<upload_id>', methods=['GET', 'PUT', 'DELETE'])
+def upload_status(upload_id):
+    """
+    GET reports how many bytes have arrived (where to resume from). PUT
+    appends the request body at the offset given by the Upload-Offset header
+    (or ?offset=); a wrong offset gets 409 with the expected one.
+    """
+    upload = uploads.get_upload(upload_id)
+    if upload is None:
+        return jsonify({"error": "Unknown upload."}), 404
+    if request.method == 'DELETE':
+        uploads.cancel_upload(upload_id)
+        return '', 204
+    if request.method == 'PUT':
+        offset = request.headers.get('Upload-Offset', request.args.get('offset'))
+        if offset is None or not offset.isdigit():
+            return jsonify({"error": "Upload-Offset is required.", "offset": upload['received']}), 400
+        try:
+            uploads.append_chunk(upload_id, int(offset), request.stream)
+        except uploads.UploadError as e:
+            return jsonify({"error": str(e), "offset": e.offset}), 409
+        upload = uploads.get_upload(upload_id)
+    return jsonify(upload)
+
+@app.route('/api/uploads/<upload_id>/batch', methods=['POST'])
+def batch_from_upload(upload_id):
+    """Queues a completed upload (usually an archive) as a batch; same form fields as POST /batches."""
+    job_description = request.form.get('job_description')
+    upload = uploads.get_upload(upload_id)
+    if upload is None:
+        return jsonify({"error": "Unknown upload."}), 404
+    if not job_description:
+        return jsonify({"error": "job_description is required."}), 400
+    if not upload['complete']:
+        return jsonify({"error": "Upload is not complete.", "offset": upload['received']}), 409
+    try:
+        batch_id = ingest.create_batch(job_description,
+                                       [(upload['filename'], lambda path: uploads.take_upload(upload_id, path))],
+                                       job_role=request.form.get('job_role') or "Batch Analysis",
+                                       scoring_method=scoring_arg(request.form),
+                                       profile=bool(request.form.get('profile')))
+    except uploads.UploadError as e:
+        # Another request queued this upload between the check above and the take
+        return jsonify({"error": str(e), "offset": e.offset}), 409
+    return jsonify({"batch_id": batch_id,
+                    "status_url": url_for('api_batch', batch_id=batch_id)}), 202
+
+@app.route('/batches/<batch_id>')
+def batch_status(batch_id):
+    batch = ingest.get_batch(batch_id)
+    if not batch:
+        abort(404)
+    return render_template('batch.html',
+                           batch=batch,
+                           job_description=batch['job_description'],
+                           ranking_list=ingest.get_batch_results(batch_id))
+
+@app.route('/api/batches/<batch_id>')
+def api_batch(batch_id):
+    batch = ingest.get_batch(batch_id)
+    if not batch:
+        return jsonify({"error": "Unknown batch."}), 404
+    return jsonify(batch)
+
+@app.route('/batches/<batch_id>/profile')
+def batch_profile(batch_id):
+    """cProfile report of a batch created with profile=1 (needs TALENTLENS_PROFILING=1)."""
+    if not metrics.PROFILING_ENABLED or not ingest.get_batch(batch_id):
+        abort(404)
+    try:
+        report = metrics.profile_report(batch_id, sort=request.args.get('sort', 'cumulative'),
+                                        limit=request.args.get('limit', 60, type=int))
+    except ValueError as e:
+        return Response(f"{e}. Use one of: {', '.join(metrics.PROFILE_SORT_KEYS)}\n",
+                        status=400, mimetype='text/plain')
+    if report is None:
+        abort(404)
+    return Response(report, mimetype='text/plain')
+
+@app.route('/api/batches/<batch_id>/retry', methods=['POST'])
+def retry_batch(batch_id):
+    if not ingest.get_batch(batch_id):
+        return jsonify({"error": "Unknown batch."}), 404
+    count = ingest.retry_failed(batch_id, request.form.get('file_id', type=int))
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify({"requeued": count})
+    flash(f'Re-queued {count} failed file(s).')
+    return redirect(url_for('batch_status', batch_id=batch_id))
+
+def export_response(entries, fmt, filename):
+    """Streams candidate entries as a CSV/NDJSON/Parquet download."""
+    try:
+        body = exporter.stream_export(
+            entries, fmt, report_url=lambda c_id: url_for('candidate_report', candidate_id=c_id, _external=True))
+    except exporter.ExportError as e:
+        return jsonify({"error": str(e)}), 400
+    return Response(stream_with_context(body), mimetype=exporter.FORMATS[fmt],
+                    headers={"Content-Disposition": f"attachment; filename={filename}.{fmt}"})
+
+@app.route('/batches/<batch_id>/export.<fmt>')
+def export_batch(batch_id, fmt):
+    """A batch's ranking, best match first."""
+    if not ingest.get_batch(batch_id):
+        abort(404)
+    return export_response(ingest.iter_batch_results(batch_id), fmt, f"ranking_{batch_id}")
+
+@app.route('/candidates/export.<fmt>')
+def export_candidates(fmt):
+    """The candidate store, with the same sort and filters as /candidates."""
+    filters = candidate_filters(request.args)
+    return export_response(db_handler.iter_candidates(page_size=STREAM_PAGE_SIZE, **filters), fmt, "candidates")
 
 @app.route('/jobs', methods=['GET', 'POST'])
 def jobs():
@@ -153,16 +359,113 @@ def jobs():
     all_jobs = db_handler.get_jobs()
     return render_template('jobs.html', jobs=all_jobs)
 
+def job_matches(job, k, mode='keyword'):
+    """
+    The k stored candidates best matching a saved job, each with its score
+    for that job. mode 'semantic' ranks by the keyword score blended with
+    LSA similarity (falling back to keywords while there is no model yet).
+    """
+    ranked = semantic.top_matches(job['description'], k) if mode == 'semantic' else None
+    if ranked is None:
+        ranked = candidate_index.top_matches(job['description'], k)
+        details = {}
+    else:
+        details = {c_id: (sem, keyword) for c_id, _, sem, keyword in ranked}
+        ranked = [(c_id, score) for c_id, score, _, _ in ranked]
+    scores = dict(ranked)
+    matches = db_handler.get_candidates_by_ids(c_id for c_id, _ in ranked)
+    for candidate in matches:
+        candidate['job_score'] = round(scores[candidate['id']] * 100, 2)
+        if candidate['id'] in details:
+            candidate['semantic_score'] = round(details[candidate['id']][0] * 100, 2)
+            candidate['keyword_score'] = round(details[candidate['id']][1] * 100, 2)
+    return matches
+
+def _mode_arg(args):
+    return 'semantic' if args.get('mode') == 'semantic' else 'keyword'
+
+def _k_arg(args):
+    k = args.get('k', MATCHES_DEFAULT_K, type=int)
+    return max(1, min(k, MATCHES_MAX_K))
+
+@app.route('/jobs/<int:job_id>/matches')
+def matches(job_id):
+    job = db_handler.get_job_by_id(job_id)
+    if not job:
+        abort(404)
+    mode = _mode_arg(request.args)
+    return render_template('job_matches.html', job=job, mode=mode, semantic_ready=semantic.stats()['trained'],
+                           matches=job_matches(job, _k_arg(request.args), mode))
+
+@app.route('/api/jobs/<int:job_id>/matches')
+def api_matches(job_id):
+    """Top-K candidates from the whole stored pool for a saved job."""
+    job = db_handler.get_job_by_id(job_id)
+    if not job:
+        return jsonify({"error": "Unknown job."}), 404
+    mode = _mode_arg(request.args)
+    return jsonify({"job_id": job_id, "mode": mode, "matches": job_matches(job, _k_arg(request.args), mode)})
+
+@app.route('/api/jobs/scores', methods=['POST'])
+def api_job_scores():
+    """
+    Scores uploaded resumes against every saved job at once (one sparse
+    product over the job index); each resume's jobs come best first.
+    """
+    files = [f for f in request.files.getlist('resume') if f and allowed_file(f.filename)]
+    if not files:
+        return jsonify({"error": "At least one PDF/DOCX resume is required."}), 400
+    parsed = []
+    for f in files:
+        filename = secure_filename(f.filename)
+        resume_data = resume_parser.parse_resume(f.stream, filename)
+        if not resume_data:
+            return jsonify({"error": f"Error parsing resume: {filename}"}), 400
+        parsed.append((filename, resume_data))
+    jobs = {job['id']: job for job in db_handler.get_jobs()}
+    job_ids, scores = job_matcher.get_match_scores([data['text'] for _, data in parsed], list(jobs.values()))
+    results = []
+    for (filename, data), row in zip(parsed, scores):
+        ranked = sorted(zip(job_ids, row), key=lambda item: (-item[1], item[0]))
+        results.append({"filename": filename, "name": data['name'],
+                        "jobs": [{"job_id": job_id, "title": jobs[job_id]['title'], "score": score}
+                                 for job_id, score in ranked]})
+    return jsonify({"results": results})
+
+@app.route('/api/skills/search')
+def api_skill_search():
+    """
+    Boolean skill search over every stored candidate, e.g.
+    ?q=python AND (docker OR kubernetes) AND NOT java&limit=50&facets=10
+    """
+    query = request.args.get('q', '')
+    limit = max(0, min(request.args.get('limit', db_handler.PAGE_SIZE, type=int), MATCHES_MAX_K))
+    facets = max(0, min(request.args.get('facets', 10, type=int), SKILL_SEARCH_MAX_FACETS))
+    try:
+        result = skill_index.search(query, limit=limit, facets=facets)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({
+        "query": query,
+        "count": result['count'],
+        "candidates": db_handler.get_candidates_by_ids(result['candidate_ids']),
+        "facets": [{"skill": skill, "count": count} for skill, count in result['facets']],
+    })
+
+@app.route('/api/skills')
+def api_skills():
+    """Candidate count per skill across the whole store."""
+    facets = skill_index.skill_facets(limit=request.args.get('limit', type=int))
+    return jsonify({"skills": [{"skill": skill, "count": count} for skill, count in facets]})
+
 @app.route('/reports')
 def reports():
-    # List files in uploads directory
-    files = []
-    upload_dir = app.config['UPLOAD_FOLDER']
-    if os.path.exists(upload_dir):
-        for f in os.listdir(upload_dir):
-            if f.endswith('.pdf') and f.startswith('report_'):
-                files.append(f)
-    return render_template('reports.html', files=files)
+    # Every stored candidate has a report (rendered on demand), newest first
+    try:
+        page, next_cursor = db_handler.query_candidates(cursor=request.args.get('cursor'))
+    except ValueError:
+        page, next_cursor = db_handler.query_candidates()
+    return render_template('reports.html', candidates=page, next_cursor=next_cursor)
 
 @app.route('/settings', methods=['GET', 'POST'])
 def settings():
@@ -171,7 +474,48 @@ def settings():
         if action == 'clear_data':
             db_handler.clear_db()
             flash('All data has been cleared.')
-    return render_template('settings.html')
+        elif action == 'clear_cache':
+            if resume_parser.parse_cache:
+                resume_parser.parse_cache.clear()
+            flash('Parse cache has been cleared.')
+        elif action == 'clear_report_cache':
+            if report_generator.report_cache:
+                report_generator.report_cache.clear()
+            flash('Report cache has been cleared.')
+        elif action == 'retrain_semantic':
+            semantic.rebuild()
+            flash(f'The semantic model is being retrained in the background and is used once ready '
+                  f'(it needs at least {semantic.MIN_DOCS} stored resumes).')
+    return render_template('settings.html',
+                           cache_stats=resume_parser.parse_cache_stats(),
+                           report_cache_stats=report_generator.report_cache_stats(),
+                           semantic_stats=semantic.stats())
+
+@app.route('/api/stats')
+def api_stats():
+    """Score/experience histograms, per-role averages and top skills, read from incremental aggregates."""
+    top_skills = min(request.args.get('top_skills', analytics.TOP_SKILLS, type=int), STATS_MAX_SKILLS)
+    return jsonify(db_handler.get_stats(top_skills=max(top_skills, 0)))
+
+@app.route('/api/cache')
+def cache_stats():
+    return jsonify({"parse_cache": resume_parser.parse_cache_stats(),
+                    "report_cache": report_generator.report_cache_stats()})
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """
+    Stage timings, file and cache lookup counters (summed over all worker
+    processes), cache and queue gauges in Prometheus text format.
+    """
+    for cache, stats in (("parse", resume_parser.parse_cache_stats()),
+                         ("report", report_generator.report_cache_stats())):
+        for key in ("entries", "size_bytes"):
+            if key in stats:
+                metrics.set_gauge(f"cache_{key}", stats[key], cache=cache)
+    for status, count in ingest.queue_counts().items():
+        metrics.set_gauge("queue_files", count, status=status)
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 if __name__ == '__main__':
     app.run(debug=True)
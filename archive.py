@@ -0,0 +1,106 @@
+import os
+import tarfile
+import zipfile
+import zlib
+
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+# Entries bigger than this are skipped rather than unpacked
+MAX_ENTRY_MB = int(os.environ.get("TALENTLENS_MAX_ARCHIVE_ENTRY_MB", "20"))
+MAX_ENTRY_BYTES = MAX_ENTRY_MB * 1024 * 1024
+COPY_CHUNK = 1024 * 1024
+
+class ArchiveError(Exception):
+    """The file isn't a ZIP or tar archive we can read."""
+
+class BadEntry(Exception):
+    """One entry can't be unpacked (too large, corrupt, encrypted...); the rest still can."""
+
+# What zipfile/tarfile raise for a single damaged or unsupported entry
+ENTRY_ERRORS = (zipfile.BadZipFile, tarfile.TarError, zlib.error, EOFError, RuntimeError, NotImplementedError)
+
+class _Unreadable:
+    """Stands in for an entry that couldn't be opened; reading it raises the original error."""
+    def __init__(self, error):
+        self.error = error
+
+    def read(self, size=-1):
+        raise self.error
+
+def is_archive(filename):
+    return (filename or '').lower().endswith(ARCHIVE_EXTENSIONS)
+
+def _is_junk(name):
+    # Folders and resource forks added by macOS/Windows archivers, hidden files
+    parts = name.replace('\\', '/').split('/')
+    return '__MACOSX' in parts or os.path.basename(name).startswith('.')
+
+def iter_entries(path):
+    """
+    Yields (name, size, fileobj) for each regular file in a ZIP or tar
+    archive, one at a time and in archive order. fileobj is only valid until
+    the next entry is requested. Tar archives (plain or compressed) are read
+    as a stream in a single pass, so memory stays flat whatever their size.
+    Raises ArchiveError for anything else.
+    """
+    if zipfile.is_zipfile(path):
+        try:
+            zf = zipfile.ZipFile(path)
+        except zipfile.BadZipFile as e:
+            raise ArchiveError(f"Damaged archive: {e}")
+        with zf:
+            for info in zf.infolist():
+                if info.is_dir() or _is_junk(info.filename):
+                    continue
+                try:
+                    f = zf.open(info)
+                except ENTRY_ERRORS as e:
+                    # Encrypted or unsupported compression: reported like any unreadable entry
+                    yield info.filename, info.file_size, _Unreadable(e)
+                    continue
+                with f:
+                    yield info.filename, info.file_size, f
+        return
+    try:
+        is_tar = tarfile.is_tarfile(path)
+    except OSError:
+        is_tar = False
+    if not is_tar:
+        raise ArchiveError("Not a ZIP or tar archive.")
+    try:
+        with tarfile.open(path, mode='r|*') as tf:
+            for member in tf:
+                if not member.isfile() or _is_junk(member.name):
+                    continue
+                f = tf.extractfile(member)
+                if f is None:
+                    continue
+                with f:
+                    yield member.name, member.size, f
+    except (tarfile.TarError, EOFError, zlib.error) as e:
+        # A stream can't skip past damage, so the rest of the archive is lost
+        raise ArchiveError(f"Damaged archive: {e}")
+
+def copy_entry(src, path, limit=MAX_ENTRY_BYTES):
+    """
+    Copies an entry's stream to path in fixed-size chunks. Raises BadEntry
+    (and removes the partial copy) past limit bytes, since the size recorded
+    in the archive isn't trusted, or when the entry can't be read.
+    """
+    copied = 0
+    try:
+        with open(path, 'wb') as dst:
+            while True:
+                try:
+                    chunk = src.read(COPY_CHUNK)
+                except ENTRY_ERRORS as e:
+                    raise BadEntry(f"Unreadable archive entry: {e}")
+                if not chunk:
+                    break
+                copied += len(chunk)
+                if limit and copied > limit:
+                    raise BadEntry(f"Larger than {MAX_ENTRY_MB} MB.")
+                dst.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return copied
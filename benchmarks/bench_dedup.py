@@ -0,0 +1,77 @@
+"""
+Near-duplicate lookups against the persisted LSH index as the number of
+stored signatures grows, plus the cost of computing a signature.
+
+Works on a throwaway database in a temp directory.
+
+Usage: python benchmarks/bench_dedup.py [max_signatures]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db_handler  # noqa: E402
+import minhash  # noqa: E402
+
+WORDS = ("python java sql docker kubernetes team lead delivered built platform data pipelines "
+         "customers cloud aws scaled services reliability mentoring hiring roadmap").split()
+QUERIES = 200
+
+
+def resume_text(rng, n_words=600):
+    return " ".join(rng.choice(WORDS) for _ in range(n_words))
+
+
+def main():
+    max_n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sizes = [n for n in (10_000, 100_000, 1_000_000) if n <= max_n] or [max_n]
+    rng = random.Random(3)
+    np_rng = np.random.default_rng(3)
+
+    text = resume_text(rng)
+    start = time.perf_counter()
+    for _ in range(50):
+        minhash.signature(text)
+    print(f"signature of a 600-word resume: {(time.perf_counter() - start) / 50 * 1000:.2f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_handler.DB_FILE = os.path.join(tmp, "bench.db")
+        stored = 0
+        print(f"{'stored':>10} {'lookup ms (dup)':>16} {'lookup ms (new)':>16}")
+        for size in sizes:
+            with db_handler.transaction() as conn:
+                for candidate_id in range(stored + 1, size + 1):
+                    signature = np_rng.integers(0, 2 ** 32, minhash.NUM_PERM, dtype=np.uint32)
+                    db_handler._index_signature(conn, candidate_id, signature)
+            stored = size
+
+            # Edited copies of stored signatures (10% of positions changed) and unseen ones
+            conn = db_handler.get_connection()
+            picks = [rng.randint(1, stored) for _ in range(QUERIES)]
+            dups = []
+            for candidate_id in picks:
+                blob = conn.execute("SELECT signature FROM resume_signatures WHERE candidate_id = ?",
+                                    (candidate_id,)).fetchone()[0]
+                signature = minhash.from_bytes(blob).copy()
+                changed = np_rng.choice(minhash.NUM_PERM, minhash.NUM_PERM // 10, replace=False)
+                signature[changed] = np_rng.integers(0, 2 ** 32, len(changed), dtype=np.uint32)
+                dups.append(signature)
+            fresh = [np_rng.integers(0, 2 ** 32, minhash.NUM_PERM, dtype=np.uint32) for _ in range(QUERIES)]
+
+            start = time.perf_counter()
+            found = sum(1 for s in dups if db_handler.find_near_duplicate(s, 0.85))
+            dup_ms = (time.perf_counter() - start) / QUERIES * 1000
+            start = time.perf_counter()
+            false = sum(1 for s in fresh if db_handler.find_near_duplicate(s, 0.85))
+            new_ms = (time.perf_counter() - start) / QUERIES * 1000
+            print(f"{stored:>10} {dup_ms:>16.3f} {new_ms:>16.3f}   found {found}/{QUERIES}, false {false}")
+
+
+if __name__ == "__main__":
+    main()
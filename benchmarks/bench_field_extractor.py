@@ -0,0 +1,90 @@
+"""
+Micro-benchmark of the regex field extraction behind parse_resume: the old
+per-call, uncompiled patterns (13 degree scans plus a lowercased copy for
+experience) versus field_extractor.extract_fields.
+
+Usage: python benchmarks/bench_field_extractor.py
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from field_extractor import extract_fields  # noqa: E402
+
+SIZES = [10_000, 100_000, 1_000_000]
+WORDS = (
+    "the team built python services and led delivery of data platforms across regions with "
+    "5 years B.Tech jane@example.com https://github.com/jane +91 9876543210 Master of Science "
+    "MBA 3.5 yrs https://linkedin.com/in/jane Ph.D https://jane.dev"
+).split()
+
+LEGACY_DEGREES = [
+    r'B\.?Tech', r'M\.?Tech', r'B\.?Sc', r'M\.?Sc', r'B\.?E', r'M\.?E',
+    r'Ph\.?D', r'Bachelor', r'Master', r'Diploma', r'MBA', r'BCA', r'MCA'
+]
+
+
+def legacy_extract(text):
+    """The extractors as resume_parser implemented them before field_extractor."""
+    email = re.search(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', text)
+    phone = re.search(r'(\+?\d{1,4}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}', text)
+    years = [float(m[0]) for m in re.findall(r'(\d+(\.\d+)?)\+?\s*(years?|yrs?)', text.lower())]
+    education = []
+    for degree in LEGACY_DEGREES:
+        education.extend(m.strip() for m in re.findall(r'(?i)\b' + degree + r'\b.*?(?=\n|$)', text))
+    links = {"linkedin": None, "github": None, "portfolio": []}
+    for url in re.findall(r'https?://(?:[-\w.]|(?:%[\da-fA-F]{2}))+', text):
+        if "linkedin.com" in url:
+            links["linkedin"] = url
+        elif "github.com" in url:
+            links["github"] = url
+        else:
+            links["portfolio"].append(url)
+    return {
+        "email": email.group() if email else None,
+        "phone": phone.group() if phone else None,
+        "experience": max(years) if years else 0,
+        "education": list(set(education)),
+        "links": links,
+    }
+
+
+def synthetic_text(size, rng):
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        if rng.random() < 0.05:
+            word += "\n"
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rng = random.Random(7)
+    print(f"{'text size':>10} {'legacy ms':>10} {'compiled ms':>12} {'speedup':>8}")
+    for size in SIZES:
+        text = synthetic_text(size, rng)
+        old, new = legacy_extract(text), extract_fields(text)
+        assert sorted(old.pop("education")) == sorted(new.pop("education")) and old == new
+        legacy = timed(lambda: legacy_extract(text))
+        compiled = timed(lambda: extract_fields(text))
+        print(f"{size:>10} {legacy * 1000:>10.2f} {compiled * 1000:>12.2f} {legacy / compiled:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Top-K search of a saved job over a large candidate pool with CandidateIndex:
+building the index from stored term counts, querying it, and adding one
+candidate incrementally.
+
+Usage: python benchmarks/bench_job_matches.py [n_candidates]
+"""
+import itertools
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from candidate_index import CandidateIndex  # noqa: E402
+
+VOCABULARY = 20000
+TERMS_PER_RESUME = 150
+K = 20
+JOB = ("Senior backend engineer: python, django, postgresql, docker and kubernetes on aws. "
+       "Experience with kafka, redis and rest api design; team lead experience is a plus.")
+COMMON = "python java sql docker kubernetes aws django postgresql redis kafka rest api team lead".split()
+
+
+def synthetic_counts(n, rng):
+    """Zipf-ish term counts, so common terms have long postings like real resumes."""
+    terms = COMMON + [f"term{i}" for i in range(VOCABULARY)]
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(terms))))
+    for _ in range(n):
+        counts = {}
+        for term in rng.choices(terms, cum_weights=cum_weights, k=TERMS_PER_RESUME):
+            counts[term] = counts.get(term, 0) + 1
+        yield counts
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    rng = random.Random(42)
+
+    rows = [(seq, seq, counts) for seq, counts in enumerate(synthetic_counts(n, rng), 1)]
+
+    # The same catch-up loop candidate_index runs over the candidate_terms table
+    index = CandidateIndex()
+    start = time.perf_counter()
+    for i in range(0, n, 10000):
+        index.append(rows[i:i + 10000])
+        if index.needs_compaction():
+            index.compact()
+    index.compact()
+    print(f"built index of {len(index)} candidates ({index.base.nnz} terms) in {time.perf_counter() - start:.1f}s")
+
+    timings = []
+    for _ in range(10):
+        start = time.perf_counter()
+        top = index.top_k(JOB, K)
+        timings.append(time.perf_counter() - start)
+    print(f"top-{K} query: best {min(timings) * 1000:.1f} ms, worst {max(timings) * 1000:.1f} ms "
+          f"(best score {top[0][1]:.3f})")
+
+    start = time.perf_counter()
+    index.append([(n + 1, n + 1, next(synthetic_counts(1, rng)))])
+    top = index.top_k(JOB, K)
+    print(f"incremental add + query: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Start-up time and peak RSS of a fresh process: lazy model registry versus
+the old behaviour of two full spacy.load() calls at import time.
+
+Usage: python benchmarks/bench_model_loading.py
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# resource is POSIX-only; elsewhere the peak comes from tracemalloc (Python
+# and numpy allocations only, so it reads lower than RSS)
+PROLOGUE = (
+    "import time, tracemalloc\n"
+    "try:\n"
+    "    import resource\n"
+    "except ImportError:\n"
+    "    resource = None\n"
+    "    tracemalloc.start()\n"
+    "start = time.perf_counter()\n"
+)
+EPILOGUE = (
+    "import json\n"
+    "peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else \\\n"
+    "    tracemalloc.get_traced_memory()[1] / 1024\n"
+    "print(json.dumps({'seconds': time.perf_counter() - start, 'rss_mb': peak_kb / 1024}))\n"
+)
+
+SCENARIOS = {
+    "import app (lazy)": "import app\n",
+    "import app + extract_name (lazy, NER only)": (
+        "import app, resume_parser\nresume_parser.extract_name('Jane Doe, Data Engineer')\n"
+    ),
+    "import app + NER + POS (lazy)": (
+        "import app, resume_parser\nresume_parser.extract_name('Jane Doe, Data Engineer')\n"
+        "resume_parser.extract_skills('Built pipelines in Python')\n"
+    ),
+    "old: two full spacy.load at import": (
+        "import spacy, nlp_models\n"
+        "try:\n"
+        "    a = spacy.load(nlp_models.MODEL_NAME)\n"
+        "    b = spacy.load(nlp_models.MODEL_NAME)\n"
+        "except OSError:\n"
+        "    pass\n"
+        "import app\n"
+    ),
+}
+
+
+def run(code, repeat=3):
+    best = None
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", PROLOGUE + code + EPILOGUE], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+
+def main():
+    print(f"{'scenario':<45} {'seconds':>8} {'peak RSS MB':>12}")
+    for name, code in SCENARIOS.items():
+        result = run(code)
+        print(f"{name:<45} {result['seconds']:>8.2f} {result['rss_mb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Documents per second for name extraction: one nlp() call per resume
+(extract_name) versus batched nlp.pipe (extract_names).
+
+Usage: python benchmarks/bench_nlp_batch.py [n_docs]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nlp_models  # noqa: E402
+from resume_parser import extract_name, extract_names  # noqa: E402
+
+FIRST = ["Priya", "Daniel", "Aisha", "Mateo", "Wei", "Olga", "Kwame", "Sara"]
+LAST = ["Sharma", "Okafor", "Novak", "Garcia", "Chen", "Ivanova", "Mensah", "Lind"]
+
+
+def synthetic_headers(n):
+    return [
+        f"{FIRST[i % len(FIRST)]} {LAST[(i // len(FIRST)) % len(LAST)]}\n"
+        f"Senior Data Engineer | candidate{i}@example.com | +1 555 010 {i % 10000:04d}\n"
+        "Summary: 6 years building data platforms with Python, Spark and AWS."
+        for i in range(n)
+    ]
+
+
+def main():
+    n_docs = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    if nlp_models.get_nlp("ner") is None:
+        print("spaCy model not installed; nothing to benchmark.")
+        return
+    texts = synthetic_headers(n_docs)
+
+    start = time.perf_counter()
+    single = [extract_name(text) for text in texts]
+    elapsed = time.perf_counter() - start
+    print(f"{'per-document nlp()':<32} {n_docs / elapsed:>9.1f} docs/s")
+
+    for batch_size in (16, 64, 256):
+        start = time.perf_counter()
+        batched = extract_names(texts, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        assert batched == single
+        print(f"{f'nlp.pipe batch_size={batch_size}':<32} {n_docs / elapsed:>9.1f} docs/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Measures parse_resumes throughput as the number of worker processes grows
+from 1 to the number of CPU cores.
+
+Usage: python benchmarks/bench_parallel_parse.py [n_files]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fpdf import FPDF  # noqa: E402
+from resume_parser import parse_resumes  # noqa: E402
+
+PARAGRAPH = (
+    "Senior software engineer with 7 years of experience building data pipelines in python, "
+    "sql and docker. Led a team of five, mentored juniors and owned the kubernetes migration. "
+)
+
+
+def write_resume(path, n):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font('Arial', '', 11)
+    pdf.multi_cell(0, 6, f"Jane Candidate {n}\njane{n}@example.com | +1 555-010-{n % 10000:04d}\n"
+                         f"https://github.com/jane{n}\nB.Tech Computer Science\n")
+    for _ in range(3):
+        pdf.add_page()
+        pdf.multi_cell(0, 6, PARAGRAPH * 12)
+    pdf.output(path)
+
+
+def main():
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    cores = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for n in range(n_files):
+            path = os.path.join(tmp, f"resume_{n}.pdf")
+            write_resume(path, n)
+            paths.append(path)
+
+        print(f"{n_files} PDFs, {cores} cores")
+        print(f"{'workers':>8} {'seconds':>8} {'files/s':>8} {'speedup':>8}")
+        baseline = None
+        workers = 1
+        while True:
+            start = time.perf_counter()
+            failed = sum(1 for _, data, _ in parse_resumes(paths, workers=workers) if data is None)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>8.2f} {n_files / elapsed:>8.1f} {baseline / elapsed:>7.2f}x"
+                  + (f"  ({failed} failed)" if failed else ""))
+            if workers >= cores:
+                break
+            workers = min(workers * 2, cores)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Compares the scoring methods in scoring.py on a synthetic pool where the
+relevant resumes are known: latency of scoring the pool against one job, and
+ranking quality (precision@10 and nDCG@10).
+
+Relevant resumes list several of the job's skills; the rest are padded with
+the generic wording job ads and resumes share ("team", "experience",
+"communication"...), which raw-count cosine rewards.
+
+Usage: python benchmarks/bench_scoring.py [n_resumes]
+"""
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scoring import METHODS, corpus_stats, score_batch  # noqa: E402
+
+JOB_SKILLS = ["python", "kubernetes", "postgresql", "kafka", "terraform", "grpc"]
+OTHER_SKILLS = ["java", "react", "angular", "excel", "photoshop", "salesforce", "sap", "tableau",
+                "swift", "unity", "autocad", "figma"]
+BOILERPLATE = ("we are looking for a team player with excellent communication skills and experience "
+               "working in a fast paced environment the candidate will work with the team to deliver "
+               "results and will have strong experience and passion for the role").split()
+JOB = (" ".join(BOILERPLATE) + " required skills: " + ", ".join(JOB_SKILLS)).strip()
+RELEVANT_SHARE = 0.05
+K = 10
+
+
+def synthetic_resume(rng, relevant):
+    words = rng.choices(BOILERPLATE, k=rng.randint(40, 200) if not relevant else rng.randint(20, 80))
+    skills = rng.sample(JOB_SKILLS, rng.randint(3, 6)) if relevant else rng.sample(JOB_SKILLS, rng.randint(0, 1))
+    skills += rng.sample(OTHER_SKILLS, rng.randint(1, 4))
+    words += skills
+    rng.shuffle(words)
+    return " ".join(words)
+
+
+def ndcg(ranked_relevance, k):
+    dcg = sum(rel / math.log2(i + 2) for i, rel in enumerate(ranked_relevance[:k]))
+    ideal = sorted(ranked_relevance, reverse=True)
+    idcg = sum(rel / math.log2(i + 2) for i, rel in enumerate(ideal[:k]))
+    return dcg / idcg if idcg else 0.0
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rng = random.Random(11)
+    relevance = [1 if rng.random() < RELEVANT_SHARE else 0 for _ in range(n)]
+    resumes = [synthetic_resume(rng, rel) for rel in relevance]
+
+    start = time.perf_counter()
+    stats = corpus_stats(resumes)
+    print(f"{n} resumes, {sum(relevance)} relevant; corpus statistics built once in "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms")
+    print(f"{'method':<8} {'total ms':>9} {'us/resume':>10} {'P@10':>6} {'nDCG@10':>8}")
+    for method in METHODS:
+        start = time.perf_counter()
+        scores = score_batch(resumes, JOB, method, stats=stats)
+        elapsed = time.perf_counter() - start
+        order = sorted(range(n), key=lambda i: -scores[i])
+        ranked = [relevance[i] for i in order]
+        print(f"{method:<8} {elapsed * 1000:>9.1f} {elapsed / n * 1e6:>10.1f} "
+              f"{sum(ranked[:K]) / K:>6.2f} {ndcg(ranked, K):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Semantic candidate search: query latency of the IVF index over a
+memory-mapped vector file against an exact scan of every vector, and the
+recall@10 the IVF lists keep, at growing store sizes. Vectors are synthetic
+(clustered unit vectors, as LSA embeddings of resumes from a few fields
+would be), so no resumes need to be parsed or embedded.
+
+Vector files go to a throwaway directory.
+
+Usage: python benchmarks/bench_semantic.py [max_vectors] [nprobe]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import semantic  # noqa: E402
+
+DIM = semantic.DIM
+TOPICS = 2000
+QUERIES = 200
+K = 10
+
+
+def synthetic_vectors(rng, topics, n):
+    """Unit vectors scattered around random topic directions."""
+    out = np.empty((n, DIM), dtype=np.float32)
+    for i in range(0, n, 100_000):
+        m = min(100_000, n - i)
+        chunk = topics[rng.integers(0, len(topics), m)] + rng.normal(0, 0.08, (m, DIM)).astype(np.float32)
+        out[i:i + m] = semantic._normalize_rows(chunk)
+    return out
+
+
+def main():
+    max_n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    nprobe = int(sys.argv[2]) if len(sys.argv) > 2 else semantic.NPROBE
+    rng = np.random.default_rng(11)
+    topics = semantic._normalize_rows(rng.normal(size=(TOPICS, DIM))).astype(np.float32)
+
+    with tempfile.TemporaryDirectory(prefix="talentlens-bench-") as tmp:
+        vectors_path = os.path.join(tmp, "vectors.f32")
+        index = semantic.SemanticIndex("bench", DIM)
+        sizes = [n for n in (10_000, 100_000, 1_000_000) if n <= max_n] or [max_n]
+        stored = 0
+        print(f"dim={DIM} nprobe={nprobe}")
+        print(f"{'vectors':>9} {'add s':>7} {'lists':>6} {'ivf ms p50':>10} {'p99':>7} {'exact ms':>9} {'recall@10':>10}")
+        for n in sizes:
+            start = time.perf_counter()
+            # Added the way semantic._refresh does: fetched in chunks, compacted as the tail grows
+            for i in range(stored, n, semantic.FETCH_ROWS):
+                m = min(semantic.FETCH_ROWS, n - i)
+                index.append([(i + j + 1, i + j) for j in range(m)], synthetic_vectors(rng, topics, m))
+                if index.needs_compaction():
+                    index.compact(vectors_path)
+            index.compact(vectors_path)
+            add_s = time.perf_counter() - start
+            stored = n
+
+            queries = synthetic_vectors(rng, topics, QUERIES)
+            index.search(queries[0], K, nprobe)
+            timings = []
+            found = []
+            for q in queries:
+                start = time.perf_counter()
+                found.append({c_id for c_id, _ in index.search(q, K, nprobe)})
+                timings.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            recall = 0
+            for q, ann in zip(queries, found):
+                sims = np.asarray(index.base @ q)
+                exact = set(index.base_ids[np.argpartition(-sims, K - 1)[:K]].tolist())
+                recall += len(ann & exact) / K
+            exact_ms = (time.perf_counter() - start) / QUERIES * 1000
+
+            lists = len(index.centroids) if index.centroids is not None else 0
+            print(f"{n:>9} {add_s:>7.1f} {lists:>6} {np.percentile(timings, 50):>10.2f} "
+                  f"{np.percentile(timings, 99):>7.2f} {exact_ms:>9.1f} {recall / QUERIES:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
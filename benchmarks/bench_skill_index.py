@@ -0,0 +1,83 @@
+"""
+Boolean skill queries and facet counts with SkillIndex over a synthetic pool,
+compared with scanning every candidate's skill list.
+
+Usage: python benchmarks/bench_skill_index.py [n_candidates]
+"""
+import itertools
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from skill_index import SkillIndex, evaluate, parse_query  # noqa: E402
+
+N_SKILLS = 2000
+SKILLS_PER_CANDIDATE = 8
+QUERIES = [
+    "kubernetes AND python",
+    "python AND (docker OR kubernetes) AND NOT java",
+    "NOT sql",
+    "skill1500 OR skill1999",
+]
+TOP = ["python", "java", "sql", "docker", "kubernetes", "aws", "react", "go"]
+
+
+def synthetic_pool(n, rng):
+    skills = TOP + [f"skill{i}" for i in range(N_SKILLS)]
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) ** 0.8 for rank in range(len(skills))))
+    for candidate_id in range(1, n + 1):
+        yield candidate_id, set(rng.choices(skills, cum_weights=cum_weights, k=SKILLS_PER_CANDIDATE))
+
+
+def scan(pool, node):
+    """Evaluates a parsed query by walking every candidate's skill set."""
+    def matches(skills, node):
+        op = node[0]
+        if op == 'skill':
+            return node[1] in skills
+        if op == 'not':
+            return not matches(skills, node[1])
+        if op == 'and':
+            return matches(skills, node[1]) and matches(skills, node[2])
+        return matches(skills, node[1]) or matches(skills, node[2])
+    return [candidate_id for candidate_id, skills in pool if matches(skills, node)]
+
+
+def best_of(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    pool = list(synthetic_pool(n, random.Random(42)))
+
+    start = time.perf_counter()
+    index = SkillIndex()
+    index.append(pool)
+    index.compact()
+    print(f"indexed {n} candidates ({len(index.positions)} postings) in {time.perf_counter() - start:.1f}s")
+
+    print(f"{'query':<50} {'matches':>9} {'index ms':>9} {'scan ms':>9}")
+    for query in QUERIES:
+        node = parse_query(query)
+        indexed, mask = best_of(lambda: index.candidate_ids(evaluate(index, node)))
+        scanned, expected = best_of(lambda: scan(pool, node), repeat=1)
+        assert mask.tolist() == expected
+        print(f"{query:<50} {len(mask):>9} {indexed * 1000:>9.2f} {scanned * 1000:>9.1f}")
+
+    mask = evaluate(index, parse_query(QUERIES[1]))
+    faceted, facets = best_of(lambda: index.facets(mask, 10))
+    print(f"facet counts over {len(index.skills)} skills within query 2: {faceted * 1000:.1f} ms "
+          f"(top: {facets[0][0]} {facets[0][1]})")
+
+
+if __name__ == "__main__":
+    main()
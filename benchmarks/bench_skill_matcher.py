@@ -0,0 +1,78 @@
+"""
+Compares the precompiled SkillMatcher with the old per-skill substring loop
+as the skills DB and the resume text grow.
+
+Usage: python benchmarks/bench_skill_matcher.py
+"""
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from job_matcher import SKILLS_DB, SkillMatcher  # noqa: E402
+
+DB_SIZES = [1000, 10000, 50000]
+TEXT_SIZES = [2_000, 20_000, 200_000]
+FILLER = "worked on the team and delivered projects with strong results".split()
+
+
+def legacy_find(skills, text):
+    """The substring loop find_matching_skills used before SkillMatcher."""
+    text_lower = text.lower()
+    found = set()
+    for skill in skills:
+        if skill in text_lower:
+            found.add(skill)
+    return found
+
+
+def synthetic_skills(n, rng):
+    skills = list(SKILLS_DB["technical_skills"] + SKILLS_DB["soft_skills"])
+    while len(skills) < n:
+        word = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10)))
+        if rng.random() < 0.3:
+            word += " " + "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 8)))
+        skills.append(word)
+    return skills[:n]
+
+
+def synthetic_text(size, skills, rng):
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(skills) if rng.random() < 0.05 else rng.choice(FILLER)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rng = random.Random(42)
+    print(f"{'skills':>8} {'text':>8} {'build s':>9} {'legacy ms':>10} {'matcher ms':>11} {'speedup':>8}")
+    for db_size in DB_SIZES:
+        skills = synthetic_skills(db_size, rng)
+        start = time.perf_counter()
+        matcher = SkillMatcher(skills)
+        build = time.perf_counter() - start
+        for text_size in TEXT_SIZES:
+            text = synthetic_text(text_size, skills, rng)
+            legacy = timed(lambda: legacy_find(skills, text))
+            compiled = timed(lambda: matcher.find(text))
+            print(f"{db_size:>8} {text_size:>8} {build:>9.2f} {legacy * 1000:>10.1f} "
+                  f"{compiled * 1000:>11.1f} {legacy / compiled:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
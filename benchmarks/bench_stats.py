@@ -0,0 +1,90 @@
+"""
+Dashboard aggregates: db_handler.get_stats (incremental aggregates) against
+computing the same summary from a get_candidates() scan, at growing store
+sizes, plus the extra cost the aggregates add to each insert. Also checks
+that both give the same numbers.
+
+Runs against a throwaway database.
+
+Usage: python benchmarks/bench_stats.py [max_candidates]
+"""
+import collections
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmp = tempfile.TemporaryDirectory(prefix="talentlens-bench-")
+os.environ["TALENTLENS_DB"] = os.path.join(_tmp.name, "bench.db")
+
+import analytics  # noqa: E402
+import db_handler  # noqa: E402
+
+SKILLS = [f"skill{i}" for i in range(500)] + ["python", "java", "sql", "docker", "aws"]
+ROLES = ["Backend Developer", "Data Scientist", "DevOps Engineer", "Batch Analysis", None]
+
+
+def synthetic_candidate(rng):
+    return {
+        "name": "Candidate",
+        "match_score": round(rng.uniform(0, 100), 2),
+        "experience": rng.choice([0, 1, 2, 3, 5, 8, 12, 20, 35]),
+        "job_role": rng.choice(ROLES),
+        "skills": rng.sample(SKILLS, rng.randint(2, 12)),
+    }
+
+
+def scan_summary():
+    """The summary the way a view would build it today: load everything and loop."""
+    candidates = db_handler.get_candidates()
+    scores = [0] * analytics.SCORE_BINS
+    years = [0] * analytics.EXPERIENCE_BINS
+    roles = collections.Counter()
+    skills = collections.Counter()
+    for c in candidates:
+        scores[analytics._bin("match_score", c.get('match_score'))] += 1
+        years[analytics._bin("experience", c.get('experience'))] += 1
+        roles[c.get('job_role') or None] += 1
+        skills.update({db_handler.normalize_skill(s) for s in db_handler.resume_skills(c)})
+    return len(candidates), scores, years, roles, skills
+
+
+def main():
+    max_n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    db_handler.JSON_DB_FILE = os.path.join(_tmp.name, "no-legacy.json")
+    rng = random.Random(7)
+    sizes = [n for n in (1_000, 10_000, 50_000, 200_000) if n <= max_n] or [max_n]
+    stored = 0
+    print(f"{'candidates':>10} {'insert ms':>10} {'stats ms':>9} {'scan ms':>9} {'match':>6}")
+    for n in sizes:
+        batch = [synthetic_candidate(rng) for _ in range(n - stored)]
+        start = time.perf_counter()
+        with db_handler.transaction() as conn:
+            for candidate in batch:
+                db_handler._insert_candidate(conn, candidate)
+        insert_ms = (time.perf_counter() - start) / max(len(batch), 1) * 1000
+        stored = n
+
+        start = time.perf_counter()
+        for _ in range(20):
+            stats = db_handler.get_stats()
+        stats_ms = (time.perf_counter() - start) / 20 * 1000
+
+        start = time.perf_counter()
+        total, scores, years, roles, skills = scan_summary()
+        scan_ms = (time.perf_counter() - start) * 1000
+
+        top = [count for _, count in skills.most_common(analytics.TOP_SKILLS)]
+        match = (stats["candidates"] == total
+                 and stats["score_histogram"]["counts"] == scores
+                 and stats["experience_histogram"]["counts"] == years
+                 and {r["job_role"]: r["candidates"] for r in stats["job_roles"]} == dict(roles)
+                 and [count for _, count in stats["top_skills"]] == top)
+        print(f"{n:>10} {insert_ms:>10.3f} {stats_ms:>9.3f} {scan_ms:>9.1f} {'yes' if match else 'NO':>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+Generates a reproducible synthetic corpus of resumes (PDF and DOCX) and job
+descriptions for the benchmark suite. The same seed always produces the same
+texts, so runs on different commits measure the same inputs.
+
+Resumes have the sections the parser looks for: a name line, contact details,
+profile links, a summary, dated experience, education and a skills list drawn
+from data/skills_db.json. Lengths vary from a half-page to several pages.
+
+Usage: python benchmarks/corpus.py out_dir [n_resumes] [n_jobs] [seed]
+"""
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document  # noqa: E402
+from fpdf import FPDF  # noqa: E402
+from job_matcher import SKILLS_DB  # noqa: E402
+
+FIRST_NAMES = ["Aarav", "Maria", "James", "Priya", "Chen", "Fatima", "Lucas", "Amara", "Noah", "Sofia",
+               "Kenji", "Olivia", "Mateo", "Zara", "Ethan", "Ananya", "Liam", "Ingrid", "Omar", "Elena"]
+LAST_NAMES = ["Sharma", "Garcia", "Smith", "Patel", "Wang", "Khan", "Silva", "Okafor", "Johnson", "Rossi",
+              "Tanaka", "Brown", "Lopez", "Ahmed", "Miller", "Iyer", "Wilson", "Larsen", "Haddad", "Petrova"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Analytics", "Stark Industries", "Wayne Enterprises",
+             "Hooli", "Vandelay Imports", "Soylent Systems", "Tyrell Labs"]
+TITLES = ["Software Engineer", "Data Analyst", "Backend Developer", "DevOps Engineer", "Data Scientist",
+          "Frontend Developer", "Product Manager", "QA Engineer", "Machine Learning Engineer", "Tech Lead"]
+DEGREES = ["B.Tech in Computer Science", "Bachelor of Science in Mathematics", "Master of Science in Data Science",
+           "MBA", "M.Tech in Software Systems", "BCA", "MCA", "Ph.D in Statistics", "Diploma in Electronics"]
+VERBS = ["Built", "Designed", "Led", "Maintained", "Migrated", "Optimised", "Automated", "Shipped", "Scaled",
+         "Mentored"]
+OBJECTS = ["a billing service", "the data pipeline", "internal dashboards", "the CI/CD setup", "a recommendation model",
+           "customer-facing APIs", "the reporting stack", "a mobile checkout flow", "the search backend",
+           "monitoring and alerting"]
+OUTCOMES = ["cutting latency by {n}%", "serving {n}k daily users", "saving {n} hours a week",
+            "reducing costs by {n}%", "with {n}% fewer incidents", "across {n} teams"]
+FILLER = ("Worked closely with product and design to deliver features on schedule. Took part in code reviews, "
+          "on-call rotations and planning. Wrote documentation and onboarding guides for new hires.")
+JOB_INTROS = ["We are hiring a {title} to join our growing team.",
+              "{company} is looking for an experienced {title}.",
+              "Join {company} as a {title} and help us scale our platform."]
+
+TECHNICAL = SKILLS_DB.get("technical_skills") or ["python", "sql", "docker"]
+SOFT = SKILLS_DB.get("soft_skills") or ["communication", "teamwork"]
+
+
+def resume_text(rng, n):
+    """Plain text of the n-th synthetic resume, as a list of lines."""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    handle = f"{first}.{last}{n}".lower()
+    years = rng.randint(0, 20)
+    skills = rng.sample(TECHNICAL, rng.randint(4, 14)) + rng.sample(SOFT, rng.randint(1, 4))
+    lines = [
+        f"{first} {last}",
+        f"{handle}@example.com | +1 555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+        f"https://linkedin.com/in/{handle} | https://github.com/{handle}",
+        "",
+        "SUMMARY",
+        f"{rng.choice(TITLES)} with {years} years of experience in {', '.join(skills[:3])}.",
+        "",
+        "EXPERIENCE",
+    ]
+    year = 2025
+    for _ in range(rng.randint(1, 6)):
+        start = year - rng.randint(1, 5)
+        lines.append(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)} ({start} - {year})")
+        for _ in range(rng.randint(2, 6)):
+            outcome = rng.choice(OUTCOMES).format(n=rng.randint(5, 90))
+            used = ", ".join(rng.sample(skills, min(2, len(skills))))
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {used}, {outcome}.")
+        lines.extend([FILLER] * rng.randint(0, 3))
+        year = start
+    lines += ["", "EDUCATION"] + rng.sample(DEGREES, rng.randint(1, 2))
+    lines += ["", "SKILLS", ", ".join(skills)]
+    return lines
+
+
+def job_text(rng):
+    title, company = rng.choice(TITLES), rng.choice(COMPANIES)
+    required = rng.sample(TECHNICAL, rng.randint(3, 8))
+    nice = rng.sample(TECHNICAL, rng.randint(1, 4)) + rng.sample(SOFT, rng.randint(1, 3))
+    return " ".join([
+        rng.choice(JOB_INTROS).format(title=title, company=company),
+        f"You will have {rng.randint(1, 8)}+ years of experience.",
+        f"Required skills: {', '.join(required)}.",
+        f"Nice to have: {', '.join(nice)}.",
+        FILLER,
+    ])
+
+
+def write_pdf(path, lines):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font('Arial', '', 11)
+    for line in lines:
+        # The core PDF fonts are latin-1 only
+        pdf.multi_cell(0, 6, line.encode('latin-1', 'replace').decode('latin-1') or " ")
+    pdf.output(path)
+
+
+def write_docx(path, lines):
+    doc = Document()
+    for line in lines:
+        doc.add_paragraph(line)
+    doc.save(path)
+
+
+def generate(out_dir, n_resumes=200, n_jobs=20, seed=42, docx_share=0.3):
+    """
+    Writes resume_<n>.pdf/.docx files and jobs.json into out_dir. Returns
+    (resume paths, job descriptions). About docx_share of the resumes are DOCX.
+    """
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for n in range(n_resumes):
+        lines = resume_text(rng, n)
+        if rng.random() < docx_share:
+            path = os.path.join(out_dir, f"resume_{n}.docx")
+            write_docx(path, lines)
+        else:
+            path = os.path.join(out_dir, f"resume_{n}.pdf")
+            write_pdf(path, lines)
+        paths.append(path)
+    jobs = [job_text(rng) for _ in range(n_jobs)]
+    with open(os.path.join(out_dir, "jobs.json"), 'w') as f:
+        json.dump(jobs, f, indent=1)
+    return paths, jobs
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__.strip())
+        sys.exit(1)
+    out_dir = sys.argv[1]
+    n_resumes = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    n_jobs = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else 42
+    paths, jobs = generate(out_dir, n_resumes, n_jobs, seed)
+    print(f"Wrote {len(paths)} resumes and {len(jobs)} job descriptions to {out_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,283 @@
+"""
+Concurrent load test of the web app. Starts the app under a multi-worker
+server, then many simulated recruiters send a mix of requests for a fixed
+time: single resume uploads (multipart POST /), candidate list pages,
+report list pages (first and deep pages), and individual PDF reports.
+Prints throughput, p50/p95/p99 latency and error rate per request type.
+
+The server runs from a throwaway directory with its own database, caches
+and index files, seeded with --candidates stored candidates so list pages
+and reports have data. Resumes to upload come from the synthetic corpus
+(corpus.py). By default it uses gunicorn with gunicorn.conf.py, the
+production profile. If gunicorn isn't installed, it uses werkzeug's forking
+server, which forks each request from the preloaded wsgi module. Use --url
+to load an already running server instead.
+
+Usage: python benchmarks/load_test.py [--users 50] [--duration 30] [--workers N] [--candidates N]
+                                      [--resumes N] [--server gunicorn|werkzeug] [--url URL] [--output FILE]
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# The app keeps its database, caches and index snapshots under the working
+# directory; run (and seed) everything from a throwaway one
+_cwd = os.getcwd()
+_tmp = tempfile.TemporaryDirectory(prefix="talentlens-load-")
+os.chdir(_tmp.name)
+os.environ["TALENTLENS_DB"] = os.path.join(_tmp.name, "data", "talentlens.db")
+
+import corpus  # noqa: E402
+import db_handler  # noqa: E402
+
+# Relative weights of the request types each simulated user picks from
+MIX = {
+    "upload": 2,
+    "candidates": 4,
+    "reports": 3,
+    "report_pdf": 1,
+}
+ROLES = ["Backend Developer", "Data Scientist", "DevOps Engineer", "Frontend Developer", None]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+def seed_candidates(n, seed):
+    """Stores n synthetic candidates; returns their ids."""
+    rng = random.Random(seed)
+    skills = [f"skill{i}" for i in range(300)] + ["python", "java", "sql", "docker", "aws"]
+    ids = []
+    with db_handler.transaction() as conn:
+        for i in range(n):
+            ids.append(db_handler._insert_candidate(conn, {
+                "name": f"Candidate {i}",
+                "email": f"candidate{i}@example.com",
+                "match_score": round(rng.uniform(0, 100), 2),
+                "experience": rng.randint(0, 25),
+                "job_role": rng.choice(ROLES),
+                "skills": rng.sample(skills, rng.randint(3, 12)),
+                "missing_skills": rng.sample(skills, 3),
+            }))
+    return ids
+
+
+def multipart(fields, files):
+    """(body, content type) of a multipart/form-data request."""
+    boundary = f"----talentlens{random.getrandbits(64):x}"
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, data) in files.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                     f'Content-Type: application/octet-stream\r\n\r\n'.encode() + data + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(kind, port, workers):
+    env = dict(os.environ,
+               PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""),
+               TALENTLENS_BIND=f"127.0.0.1:{port}",
+               TALENTLENS_WEB_WORKERS=str(workers),
+               # Every upload does the full parse/score/store work
+               TALENTLENS_PARSE_CACHE_MB="0",
+               TALENTLENS_DEDUP_THRESHOLD="0")
+    if kind == "gunicorn":
+        cmd = [sys.executable, "-m", "gunicorn", "-c", os.path.join(ROOT, "gunicorn.conf.py"), "wsgi:app"]
+    else:
+        cmd = [sys.executable, "-c",
+               "import wsgi\nfrom werkzeug.serving import run_simple\n"
+               f"run_simple('127.0.0.1', {port}, wsgi.app, processes={workers})"]
+    log = open(os.path.join(_tmp.name, "server.log"), "wb")
+    proc = subprocess.Popen(cmd, env=env, stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            break
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                return proc
+        except OSError:
+            time.sleep(0.5)
+    stop_server(proc)
+    with open(log.name, errors="replace") as f:
+        sys.exit(f"Server didn't start:\n{f.read()[-3000:]}")
+
+
+def stop_server(proc):
+    if proc.poll() is None:
+        os.killpg(proc.pid, signal.SIGTERM)
+        try:
+            proc.wait(30)
+        except subprocess.TimeoutExpired:
+            os.killpg(proc.pid, signal.SIGKILL)
+
+
+class User(threading.Thread):
+    """One simulated recruiter sending requests back to back until the deadline."""
+
+    def __init__(self, n, url, deadline, resumes, jobs, candidate_ids):
+        super().__init__(daemon=True)
+        self.rng = random.Random(n)
+        self.url = url
+        self.deadline = deadline
+        self.resumes = resumes
+        self.jobs = jobs
+        self.candidate_ids = candidate_ids
+        self.results = []
+        self.conn = None
+
+    def request(self, method, path, body=None, headers=None):
+        if self.conn is None:
+            self.conn = http.client.HTTPConnection(self.url.hostname, self.url.port or 80, timeout=300)
+        try:
+            self.conn.request(method, path, body=body, headers=headers or {})
+            response = self.conn.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = None
+            raise
+
+    def send(self, kind):
+        if kind == "upload":
+            filename, data = self.rng.choice(self.resumes)
+            body, content_type = multipart({"job_description": self.rng.choice(self.jobs)},
+                                           {"resume": (filename, data)})
+            return self.request("POST", "/", body, {"Content-Type": content_type})
+        if kind == "candidates":
+            sort = self.rng.choice(["date", "match_score", "experience"])
+            return self.request("GET", f"/candidates?sort={sort}&order=desc")
+        if kind == "reports":
+            path = "/reports"
+            if self.candidate_ids and self.rng.random() < 0.5:
+                # A deep page: the keyset cursor of a random stored candidate
+                c_id = self.rng.choice(self.candidate_ids)
+                path += "?cursor=" + db_handler.encode_cursor(c_id, c_id)
+            return self.request("GET", path)
+        return self.request("GET", f"/candidates/{self.rng.choice(self.candidate_ids)}/report.pdf")
+
+    def run(self):
+        kinds = list(MIX)
+        weights = [MIX[k] for k in kinds]
+        if not self.candidate_ids:
+            weights[kinds.index("report_pdf")] = 0
+        while time.time() < self.deadline:
+            kind = self.rng.choices(kinds, weights)[0]
+            start = time.perf_counter()
+            try:
+                ok = self.send(kind) < 400
+            except (OSError, http.client.HTTPException):
+                ok = False
+            self.results.append((kind, time.perf_counter() - start, ok))
+
+
+def summarize(name, results, elapsed):
+    latencies = sorted(latency for _, latency, _ in results)
+    errors = sum(1 for _, _, ok in results if not ok)
+    return {
+        "name": name,
+        "requests": len(results),
+        "errors": errors,
+        "error_rate": round(errors / len(results), 4) if results else 0.0,
+        "rps": round(len(results) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50, help="concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="server worker processes")
+    parser.add_argument("--candidates", type=int, default=10_000, help="candidates stored before the run")
+    parser.add_argument("--resumes", type=int, default=50, help="distinct resume files to upload")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--server", choices=["gunicorn", "werkzeug"],
+                        default="gunicorn" if shutil.which("gunicorn") else "werkzeug")
+    parser.add_argument("--url", help="load this running server instead of starting one (no seeding)")
+    parser.add_argument("--output", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    paths, jobs = corpus.generate(os.path.join(_tmp.name, "corpus"), args.resumes, 10, args.seed)
+    resumes = []
+    for path in paths:
+        with open(path, "rb") as f:
+            resumes.append((os.path.basename(path), f.read()))
+
+    proc = None
+    if args.url:
+        url = urllib.parse.urlsplit(args.url)
+        candidate_ids = []
+    else:
+        print(f"Seeding {args.candidates} candidates...")
+        candidate_ids = seed_candidates(args.candidates, args.seed)
+        port = free_port()
+        print(f"Starting {args.server} with {args.workers} workers...")
+        proc = start_server(args.server, port, args.workers)
+        url = urllib.parse.urlsplit(f"http://127.0.0.1:{port}")
+
+    try:
+        print(f"{args.users} users for {args.duration:g}s against {url.geturl()}")
+        deadline = time.time() + args.duration
+        users = [User(n, url, deadline, resumes, jobs, candidate_ids) for n in range(args.users)]
+        start = time.perf_counter()
+        for user in users:
+            user.start()
+        for user in users:
+            user.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        if proc is not None:
+            stop_server(proc)
+
+    results = [r for user in users for r in user.results]
+    rows = [summarize(kind, [r for r in results if r[0] == kind], elapsed) for kind in MIX]
+    rows.append(summarize("all", results, elapsed))
+    print(f"{'request':<11} {'count':>7} {'err %':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8}")
+    for row in rows:
+        print(f"{row['name']:<11} {row['requests']:>7} {row['error_rate'] * 100:>6.2f} {row['rps']:>7.2f} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}")
+    if args.output:
+        with open(os.path.join(_cwd, args.output), "w") as f:
+            json.dump({"meta": {"users": args.users, "duration": args.duration, "workers": args.workers,
+                                "server": None if args.url else args.server, "candidates": len(candidate_ids)},
+                       "results": rows}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+"""
+End-to-end benchmark suite over a synthetic corpus (see corpus.py). Measures
+every pipeline stage separately: PDF/DOCX parsing, match scoring, skill
+matching, report rendering, database inserts and queries, and duplicate
+lookups. Reports throughput, p50/p99 latency and peak traced memory per
+stage, and writes everything to a JSON file so runs on different commits can
+be compared. Runs offline against a throwaway database; the parse and report
+caches are disabled so every call does the full work.
+
+Usage: python benchmarks/run_suite.py [--resumes N] [--jobs N] [--seed N] [--corpus DIR] [--output FILE]
+       python benchmarks/run_suite.py --compare BASE.json NEW.json [--threshold PCT]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+try:
+    import resource
+except ImportError:
+    # Windows: the run's peak memory comes from the traced stage peaks instead
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Uncached, isolated runs: must be set before the app modules are imported
+_tmp = tempfile.TemporaryDirectory(prefix="talentlens-bench-")
+os.environ["TALENTLENS_DB"] = os.path.join(_tmp.name, "bench.db")
+os.environ["TALENTLENS_PARSE_CACHE_MB"] = "0"
+os.environ["TALENTLENS_REPORT_CACHE_MB"] = "0"
+
+import corpus  # noqa: E402
+import db_handler  # noqa: E402
+import minhash  # noqa: E402
+import resume_parser  # noqa: E402
+import scoring  # noqa: E402
+from job_matcher import find_matching_skills, get_match_score  # noqa: E402
+from report_generator import render_report  # noqa: E402
+
+# Peak memory is traced over this many calls per stage; tracemalloc slows
+# calls down too much to run it during the timed pass.
+MEMORY_SAMPLE = 20
+QUERY_PAGES = 50
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+def run_stage(name, fn, items):
+    """Calls fn(item) for every item; returns (results, stats)."""
+    if items:
+        # Untimed warm-up so one-off costs (model loading, first connection) stay out of p99
+        fn(items[0])
+    results = []
+    latencies = []
+    start = time.perf_counter()
+    for item in items:
+        t = time.perf_counter()
+        results.append(fn(item))
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    peak = 0
+    for item in items[:MEMORY_SAMPLE]:
+        tracemalloc.reset_peak()
+        fn(item)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    latencies.sort()
+    stats = {
+        "count": len(items),
+        "seconds": round(elapsed, 4),
+        "per_second": round(len(items) / elapsed, 2) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "peak_kb": round(peak / 1024, 1),
+    }
+    print(f"{name:>14} {stats['count']:>6} {stats['per_second'] or 0:>10.1f} "
+          f"{stats['p50_ms']:>9.3f} {stats['p99_ms']:>9.3f} {stats['peak_kb']:>9.1f}")
+    return results, stats
+
+
+def peak_memory(stages):
+    """("max_rss_kb", peak RSS of the run), or the largest traced stage peak where RSS isn't available."""
+    if resource is not None:
+        return "max_rss_kb", resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return "peak_traced_kb", max((stage["peak_kb"] for stage in stages.values()), default=0.0)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run(args):
+    corpus_dir = args.corpus or os.path.join(_tmp.name, "corpus")
+    start = time.perf_counter()
+    paths, jobs = corpus.generate(corpus_dir, args.resumes, args.jobs, args.seed)
+    print(f"Corpus: {len(paths)} resumes, {len(jobs)} jobs in {time.perf_counter() - start:.1f}s\n")
+
+    db_handler.JSON_DB_FILE = os.path.join(_tmp.name, "no-legacy.json")
+    stages = {}
+    print(f"{'stage':>14} {'n':>6} {'per sec':>10} {'p50 ms':>9} {'p99 ms':>9} {'peak KB':>9}")
+
+    parsed = []
+    for ext in ('pdf', 'docx'):
+        subset = [p for p in paths if p.endswith('.' + ext)]
+        results, stages[f"parse_{ext}"] = run_stage(f"parse_{ext}", resume_parser.parse_resume, subset)
+        parsed.extend(r for r in results if r)
+    texts = [r['text'] for r in parsed]
+    pairs = [(text, jobs[i % len(jobs)]) for i, text in enumerate(texts)]
+
+    scores, stages["match_score"] = run_stage("match_score", lambda p: get_match_score(*p), pairs)
+    stats = scoring.corpus_stats(texts)
+    _, stages["score_bm25"] = run_stage("score_bm25",
+                                        lambda p: scoring.match_score(p[0], p[1], "bm25", stats), pairs)
+    skills, stages["skills"] = run_stage("skills", lambda p: find_matching_skills(*p), pairs)
+
+    entries = []
+    for data, score, (matching, missing) in zip(parsed, scores, skills):
+        entry = {k: data.get(k) for k in ('name', 'email', 'phone', 'experience', 'education', 'links')}
+        entry.update(match_score=score, skills=matching, missing_skills=missing, job_role="Benchmark")
+        entries.append(entry)
+    _, stages["render_report"] = run_stage(
+        "render_report", lambda e: render_report(e, e['match_score'], e['skills'], e['missing_skills']), entries)
+
+    signatures = [minhash.signature(text) for text in texts]
+    inserts = list(zip(entries, texts, signatures))
+    # The warm-up and memory passes insert a few extra copies; harmless for the timings
+    _, stages["db_insert"] = run_stage(
+        "db_insert", lambda r: db_handler.add_candidate(dict(r[0]), resume_text=r[1], signature=r[2]), inserts)
+    _, stages["dedup_lookup"] = run_stage(
+        "dedup_lookup", lambda s: db_handler.find_near_duplicate(s, 0.85), [s for s in signatures if s is not None])
+
+    def query_page(_):
+        return db_handler.query_candidates(sort='match_score', limit=25)
+    _, stages["db_query"] = run_stage("db_query", query_page, list(range(QUERY_PAGES)))
+
+    memory_key, memory = peak_memory(stages)
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "resumes": args.resumes,
+            "jobs": args.jobs,
+            "seed": args.seed,
+            memory_key: memory,
+        },
+        "stages": stages,
+    }
+
+
+def compare(base_path, new_path, threshold):
+    """Prints the change per stage; returns True if any p50 got slower by more than threshold %."""
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"base {base['meta'].get('commit')}  ->  new {new['meta'].get('commit')}\n")
+    print(f"{'stage':>14} {'p50 ms':>17} {'change':>8} {'p99 ms':>17} {'change':>8}")
+    regressed = False
+    for name, after in new['stages'].items():
+        before = base['stages'].get(name)
+        if not before:
+            print(f"{name:>14}  (new stage)")
+            continue
+        changes = []
+        for key in ('p50_ms', 'p99_ms'):
+            change = (after[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            changes.append(change)
+        flag = ""
+        if changes[0] > threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print(f"{name:>14} {before['p50_ms']:>8.3f}->{after['p50_ms']:<8.3f} {changes[0]:>+7.1f}% "
+              f"{before['p99_ms']:>8.3f}->{after['p99_ms']:<8.3f} {changes[1]:>+7.1f}%{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TalentLens pipeline benchmark suite")
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--corpus", help="write (and reuse) the synthetic corpus here instead of a temp dir")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"))
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="p50 slowdown (%%) reported as a regression by --compare")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+
+    results = run(args)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
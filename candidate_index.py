@@ -0,0 +1,193 @@
+import json
+import os
+import threading
+import numpy as np
+from scipy import sparse
+import db_handler
+from job_index import count_terms
+
+INDEX_FILE = os.path.join("data", "candidate_index.npz")
+# Rows appended since the last snapshot are kept in a small CSR "tail"; once it
+# holds this many (or a quarter of the base, whichever is more) it is folded
+# into the base matrix and a new snapshot is saved.
+COMPACT_ROWS = 5000
+FETCH_ROWS = 10000
+
+class CandidateIndex:
+    """
+    Term vectors of every stored resume, L2-normalised over a shared
+    vocabulary. The bulk lives in a CSC "base" matrix, so a query only reads
+    the columns of its own terms; recent candidates sit in a CSR tail until
+    the next compaction. Both are built from the candidate_terms table, which
+    db_handler fills in the same transaction as the candidate.
+    """
+    def __init__(self):
+        self.vocabulary = {}
+        self.generation = 0
+        self.last_seq = 0
+        self.base_ids = np.zeros(0, dtype=np.int64)
+        self.base = sparse.csc_matrix((0, 0), dtype=np.float64)
+        self.tail_ids = []
+        self.tail = sparse.csr_matrix((0, 0), dtype=np.float64)
+
+    def __len__(self):
+        return len(self.base_ids) + len(self.tail_ids)
+
+    def append(self, rows):
+        """Adds (seq, candidate_id, counts) rows, in seq order, to the tail."""
+        if not rows:
+            return
+        indptr = [0]
+        indices = []
+        data = []
+        for seq, candidate_id, counts in rows:
+            norm = np.sqrt(sum(c * c for c in counts.values())) or 1.0
+            for token, count in counts.items():
+                col = self.vocabulary.get(token)
+                if col is None:
+                    col = self.vocabulary[token] = len(self.vocabulary)
+                indices.append(col)
+                data.append(count / norm)
+            indptr.append(len(indices))
+            self.tail_ids.append(candidate_id)
+            self.last_seq = seq
+        width = len(self.vocabulary)
+        rows_matrix = sparse.csr_matrix(
+            (np.array(data, dtype=np.float64), np.array(indices, dtype=np.int64), indptr),
+            shape=(len(rows), width))
+        tail = self.tail
+        tail.resize((tail.shape[0], width))
+        self.tail = sparse.vstack([tail, rows_matrix], format='csr')
+
+    def needs_compaction(self):
+        return len(self.tail_ids) >= max(COMPACT_ROWS, len(self.base_ids) // 4)
+
+    def compact(self):
+        """Folds the tail into the base matrix."""
+        if not self.tail_ids:
+            return
+        width = len(self.vocabulary)
+        base = self.base
+        base.resize((base.shape[0], width))
+        tail = self.tail
+        tail.resize((tail.shape[0], width))
+        self.base = sparse.vstack([base, tail], format='csc')
+        self.base_ids = np.concatenate([self.base_ids, np.array(self.tail_ids, dtype=np.int64)])
+        self.tail_ids = []
+        self.tail = sparse.csr_matrix((0, width), dtype=np.float64)
+
+    def scores(self, text):
+        """
+        Cosine similarity of the text against every indexed candidate, as
+        (candidate_ids, scores) arrays. Equal to get_match_score / 100.
+        """
+        counts = count_terms(text)
+        ids = np.concatenate([self.base_ids, np.array(self.tail_ids, dtype=np.int64)])
+        scores = np.zeros(len(ids), dtype=np.float64)
+        if not counts:
+            return ids, scores
+        # The norm includes terms no candidate has, as a pairwise fit would
+        norm = np.sqrt(sum(c * c for c in counts.values()))
+        terms = [(self.vocabulary[t], c / norm) for t, c in counts.items() if t in self.vocabulary]
+        if not terms:
+            return ids, scores
+        cols = np.array([col for col, _ in terms], dtype=np.int64)
+        weights = np.array([w for _, w in terms], dtype=np.float64)
+
+        n_base = len(self.base_ids)
+        in_base = cols < self.base.shape[1]
+        if n_base and in_base.any():
+            scores[:n_base] = self.base[:, cols[in_base]] @ weights[in_base]
+        if self.tail_ids:
+            scores[n_base:] = self.tail[:, cols] @ weights
+        return ids, scores
+
+    def top_k(self, text, k):
+        """The k best-scoring candidates as [(candidate_id, score)], best first, skipping zero scores."""
+        ids, scores = self.scores(text)
+        if k <= 0 or not len(ids):
+            return []
+        if k < len(scores):
+            # Partial selection: O(n) to find the k best, then sort only those
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.lexsort((ids[top], -scores[top]))]
+        return [(int(ids[i]), float(scores[i])) for i in top if scores[i] > 0]
+
+    def save(self, path=INDEX_FILE):
+        self.compact()
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f,
+                     terms=np.array(terms, dtype=str),
+                     candidate_ids=self.base_ids,
+                     data=self.base.data,
+                     indices=self.base.indices,
+                     indptr=self.base.indptr,
+                     state=np.array([self.generation, self.last_seq], dtype=np.int64))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        index = cls()
+        with np.load(path) as f:
+            index.vocabulary = {term: i for i, term in enumerate(f['terms'].tolist())}
+            index.base_ids = f['candidate_ids']
+            index.base = sparse.csc_matrix(
+                (f['data'], f['indices'], f['indptr']),
+                shape=(len(index.base_ids), len(index.vocabulary)))
+            index.generation, index.last_seq = (int(v) for v in f['state'])
+        index.tail = sparse.csr_matrix((0, len(index.vocabulary)), dtype=np.float64)
+        return index
+
+_index = None
+_lock = threading.Lock()
+
+def _load(generation):
+    if os.path.exists(INDEX_FILE):
+        try:
+            index = CandidateIndex.load()
+            if index.generation == generation:
+                return index
+            # Snapshot of a store that has since been cleared
+            os.remove(INDEX_FILE)
+        except Exception as e:
+            print(f"Warning: Could not load candidate index, rebuilding: {e}")
+    index = CandidateIndex()
+    index.generation = generation
+    return index
+
+def _refresh():
+    """Catches the shared index up with candidate_terms rows added since it was last read."""
+    global _index
+    conn = db_handler.get_connection()
+    generation = db_handler.candidates_generation(conn)
+    if _index is None or _index.generation != generation:
+        # First use, or the store was cleared since
+        _index = _load(generation)
+
+    compacted = False
+    while True:
+        rows = conn.execute("SELECT seq, candidate_id, counts FROM candidate_terms WHERE seq > ? "
+                            "ORDER BY seq LIMIT ?", (_index.last_seq, FETCH_ROWS)).fetchall()
+        _index.append([(row['seq'], row['candidate_id'], json.loads(row['counts'])) for row in rows])
+        if _index.needs_compaction():
+            _index.compact()
+            compacted = True
+        if len(rows) < FETCH_ROWS:
+            break
+
+    if compacted:
+        _index.save()
+    return _index
+
+def get_index():
+    with _lock:
+        return _refresh()
+
+def top_matches(text, k=20):
+    """The k stored candidates whose resumes best match the text, as [(candidate_id, score)]."""
+    with _lock:
+        return _refresh().top_k(text, k)
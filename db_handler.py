@@ -1,76 +1,587 @@
+import base64
 import json
 import os
+import sqlite3
+import threading
 from datetime import datetime
+import analytics
+import job_index
+import minhash
 
-DB_FILE = os.path.join("data", "database.json")
+DB_FILE = os.environ.get("TALENTLENS_DB", os.path.join("data", "talentlens.db"))
+# Legacy flat-file store, imported once into SQLite by init_db
+JSON_DB_FILE = os.path.join("data", "database.json")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    name TEXT,
+    email TEXT,
+    match_score REAL,
+    experience REAL,
+    job_role TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    date TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS candidate_skills (
+    skill TEXT NOT NULL,
+    candidate_id INTEGER NOT NULL,
+    PRIMARY KEY (skill, candidate_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS candidate_terms (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    candidate_id INTEGER NOT NULL,
+    counts TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS term_stats (
+    term TEXT PRIMARY KEY,
+    df INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS resume_signatures (
+    candidate_id INTEGER PRIMARY KEY,
+    signature BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lsh_buckets (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    candidate_id INTEGER NOT NULL,
+    PRIMARY KEY (band, bucket, candidate_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_candidate_skills_candidate ON candidate_skills (candidate_id);
+CREATE INDEX IF NOT EXISTS idx_candidate_terms_candidate ON candidate_terms (candidate_id);
+CREATE INDEX IF NOT EXISTS idx_candidates_score ON candidates (match_score, id);
+CREATE INDEX IF NOT EXISTS idx_candidates_experience ON candidates (experience, id);
+CREATE INDEX IF NOT EXISTS idx_candidates_role ON candidates (job_role, id);
+CREATE INDEX IF NOT EXISTS idx_candidates_role_score ON candidates (job_role, match_score, id);
+CREATE INDEX IF NOT EXISTS idx_candidates_role_experience ON candidates (job_role, experience, id);
+"""
+
+# Sortable columns for query_candidates. Ids grow with insertion time, so
+# "date" pages over the primary key.
+SORT_COLUMNS = {
+    'date': 'id',
+    'match_score': 'match_score',
+    'experience': 'experience',
+}
+PAGE_SIZE = 50
+# Types a cursor's sort value may have per sort (scores and experience may be NULL)
+CURSOR_VALUE_TYPES = {
+    'date': (int,),
+    'match_score': (int, float, type(None)),
+    'experience': (int, float, type(None)),
+}
+# Skill-filtered queries on other sorts are driven from candidate_skills (and
+# then sorted) when the rarest requested skill has at most this many candidates
+SELECTIVE_SKILL_ROWS = 5000
+
+_local = threading.local()
+
+class DuplicateCandidate(Exception):
+    """A near-identical resume is already stored (candidate_id, similarity)."""
+    def __init__(self, candidate_id, similarity):
+        super().__init__(f"Near-duplicate of candidate {candidate_id} ({similarity:.0%} similar)")
+        self.candidate_id = candidate_id
+        self.similarity = similarity
+
+def get_connection():
+    """
+    Returns this thread's connection, opening (and initialising) it on first use.
+    Connections are never shared across threads or forked processes.
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and _local.pid == os.getpid() and _local.path == DB_FILE:
+        return conn
+
+    db_dir = os.path.dirname(DB_FILE)
+    if db_dir and not os.path.exists(db_dir):
+        os.makedirs(db_dir, exist_ok=True)
+    # isolation_level=None: transactions are opened explicitly with BEGIN IMMEDIATE
+    conn = sqlite3.connect(DB_FILE, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    _local.conn = conn
+    _local.pid = os.getpid()
+    _local.path = DB_FILE
+    _init_schema(conn)
+    return conn
+
+class transaction:
+    """
+    Write transaction that takes the database write lock up front, so
+    concurrent workers queue up instead of failing half way through.
+    """
+    def __enter__(self):
+        self.conn = get_connection()
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.execute("COMMIT")
+        else:
+            self.conn.execute("ROLLBACK")
+        return False
+
+def _init_schema(conn):
+    conn.executescript(SCHEMA)
+    conn.executescript(analytics.SCHEMA)
+    _backfill_skill_index(conn)
+    _backfill_term_stats(conn)
+    _backfill_stats(conn)
+    migrated = conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone()
+    if not migrated and os.path.exists(JSON_DB_FILE):
+        _migrate_json(conn)
+
+def _backfill_skill_index(conn):
+    """Indexes rows written before candidate_skills and the sort columns existed."""
+    if conn.execute("SELECT 1 FROM meta WHERE key = 'skills_indexed'").fetchone():
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if not conn.execute("SELECT 1 FROM meta WHERE key = 'skills_indexed'").fetchone():
+            conn.execute("UPDATE candidates SET match_score = 0 WHERE match_score IS NULL")
+            conn.execute("UPDATE candidates SET experience = 0 WHERE experience IS NULL")
+            for row in conn.execute("SELECT id, data FROM candidates").fetchall():
+                _index_skills(conn, row['id'], resume_skills(json.loads(row['data'])))
+            conn.execute("INSERT INTO meta (key, value) VALUES ('skills_indexed', '1')")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+def _backfill_term_stats(conn):
+    """Counts document frequencies for resumes indexed before term_stats existed."""
+    if conn.execute("SELECT 1 FROM meta WHERE key = 'term_stats_indexed'").fetchone():
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if not conn.execute("SELECT 1 FROM meta WHERE key = 'term_stats_indexed'").fetchone():
+            for row in conn.execute("SELECT counts FROM candidate_terms").fetchall():
+                _add_term_stats(conn, json.loads(row['counts']))
+            conn.execute("INSERT INTO meta (key, value) VALUES ('term_stats_indexed', '1')")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+def _backfill_stats(conn):
+    """Builds the dashboard aggregates for candidates stored before they existed."""
+    if conn.execute("SELECT 1 FROM meta WHERE key = 'stats_indexed'").fetchone():
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if not conn.execute("SELECT 1 FROM meta WHERE key = 'stats_indexed'").fetchone():
+            analytics.rebuild(conn)
+            conn.execute("INSERT INTO meta (key, value) VALUES ('stats_indexed', '1')")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+def _migrate_json(conn):
+    """One-shot import of the legacy database.json, guarded by a meta flag."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        done = conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone()
+        if not done:
+            try:
+                with open(JSON_DB_FILE, 'r') as f:
+                    legacy = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Warning: Could not migrate {JSON_DB_FILE}: {e}")
+                legacy = {}
+            # The JSON lists are newest first; insert oldest first so ids keep that order
+            for candidate in reversed(legacy.get('candidates', [])):
+                _insert_candidate(conn, candidate)
+            for job in reversed(legacy.get('jobs', [])):
+                _insert_job(conn, job)
+            conn.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', ?)",
+                         (datetime.now().strftime("%Y-%m-%d %H:%M:%S"),))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+def _insert_row(conn, table, columns, row_id):
+    """Inserts keeping row_id when it is free, otherwise lets SQLite issue a new one."""
+    names = list(columns)
+    if row_id is not None:
+        clash = conn.execute(f"SELECT 1 FROM {table} WHERE id = ?", (row_id,)).fetchone()
+        if not clash:
+            names.append('id')
+            columns = dict(columns, id=row_id)
+    placeholders = ", ".join("?" for _ in names)
+    cur = conn.execute(f"INSERT INTO {table} ({', '.join(names)}) VALUES ({placeholders})",
+                       [columns[n] for n in names])
+    return cur.lastrowid
+
+def _insert_candidate(conn, candidate_data, resume_text=None, signature=None):
+    if not candidate_data.get('date'):
+        candidate_data['date'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    candidate_id = _insert_row(conn, 'candidates', {
+        'date': candidate_data['date'],
+        'name': candidate_data.get('name'),
+        'email': candidate_data.get('email'),
+        'match_score': candidate_data.get('match_score') or 0,
+        'experience': candidate_data.get('experience') or 0,
+        'job_role': candidate_data.get('job_role'),
+        'data': '{}',
+    }, candidate_data.get('id'))
+    candidate_data['id'] = candidate_id
+    conn.execute("UPDATE candidates SET data = ? WHERE id = ?",
+                 (json.dumps(candidate_data), candidate_id))
+    skills = resume_skills(candidate_data)
+    _index_skills(conn, candidate_id, skills)
+    analytics.record(conn, candidate_data, {normalize_skill(skill) for skill in skills})
+    if resume_text:
+        _index_terms(conn, candidate_id, resume_text)
+    if signature is not None:
+        _index_signature(conn, candidate_id, signature)
+    return candidate_id
+
+def resume_skills(candidate):
+    """
+    Every skill found on the candidate's resume. Entries stored before these
+    were kept separately only have the skills that matched their job
+    description ("skills"), so those stand in.
+    """
+    skills = candidate.get('resume_skills')
+    if skills is None:
+        skills = candidate.get('skills') or []
+    return skills
+
+def normalize_skill(skill):
+    return " ".join(str(skill).lower().split())
+
+def _index_skills(conn, candidate_id, skills):
+    conn.executemany("INSERT OR IGNORE INTO candidate_skills (skill, candidate_id) VALUES (?, ?)",
+                     [(normalize_skill(skill), candidate_id) for skill in skills or []])
+
+def _index_terms(conn, candidate_id, resume_text):
+    """Stores the resume's term counts; candidate_index picks them up incrementally by seq."""
+    counts = job_index.count_terms(resume_text)
+    if counts:
+        conn.execute("INSERT INTO candidate_terms (candidate_id, counts) VALUES (?, ?)",
+                     (candidate_id, json.dumps(counts)))
+        _add_term_stats(conn, counts)
+
+def _index_signature(conn, candidate_id, signature):
+    conn.execute("INSERT OR REPLACE INTO resume_signatures (candidate_id, signature) VALUES (?, ?)",
+                 (candidate_id, minhash.to_bytes(signature)))
+    conn.executemany("INSERT OR IGNORE INTO lsh_buckets (band, bucket, candidate_id) VALUES (?, ?, ?)",
+                     [(band, key, candidate_id) for band, key in enumerate(minhash.band_keys(signature))])
+
+def find_near_duplicate(signature, threshold, conn=None):
+    """
+    The stored candidate whose resume is most similar to the signature, as
+    (candidate_id, similarity), if that similarity reaches threshold.
+    Only candidates sharing an LSH bucket are compared, so the cost doesn't
+    grow with the size of the store.
+    """
+    conn = conn or get_connection()
+    keys = list(enumerate(minhash.band_keys(signature)))
+    # One primary-key lookup per band
+    buckets = " UNION ".join("SELECT candidate_id FROM lsh_buckets WHERE band = ? AND bucket = ?" for _ in keys)
+    rows = conn.execute(
+        f"SELECT candidate_id, signature FROM resume_signatures WHERE candidate_id IN ({buckets})",
+        [value for key in keys for value in key])
+    best = None
+    for row in rows:
+        similarity = minhash.similarity(signature, minhash.from_bytes(row['signature']))
+        if similarity >= threshold and (best is None or similarity > best[1]):
+            best = (row['candidate_id'], similarity)
+    return best
+
+def _bump_meta(conn, key, amount):
+    conn.execute("INSERT INTO meta (key, value) VALUES (?, ?) "
+                 "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + excluded.value",
+                 (key, amount))
+
+def _add_term_stats(conn, counts):
+    """Adds one resume to the corpus statistics used by the TF-IDF and BM25 scorers."""
+    conn.executemany("INSERT INTO term_stats (term, df) VALUES (?, 1) "
+                     "ON CONFLICT (term) DO UPDATE SET df = df + 1", [(term,) for term in counts])
+    _bump_meta(conn, 'corpus_docs', 1)
+    _bump_meta(conn, 'corpus_length', sum(counts.values()))
+
+def get_term_stats(terms):
+    """
+    Corpus statistics over every indexed resume: (document count, total
+    token count, {term: document frequency}) for the given terms.
+    """
+    conn = get_connection()
+    totals = dict(conn.execute("SELECT key, value FROM meta WHERE key IN ('corpus_docs', 'corpus_length')"))
+    terms = list(terms)
+    df = {}
+    # Chunked to stay under SQLite's bound-parameter limit
+    for i in range(0, len(terms), 500):
+        chunk = terms[i:i + 500]
+        df.update(conn.execute(f"SELECT term, df FROM term_stats WHERE term IN ({', '.join('?' for _ in chunk)})",
+                               chunk).fetchall())
+    return int(totals.get('corpus_docs', 0)), int(totals.get('corpus_length', 0)), df
+
+def get_term_counts(ids):
+    """{candidate_id: {term: count}} of the indexed resumes for the given candidate ids."""
+    conn = get_connection()
+    ids = list(ids)
+    counts = {}
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        for row in conn.execute(f"SELECT candidate_id, counts FROM candidate_terms "
+                                f"WHERE candidate_id IN ({', '.join('?' for _ in chunk)})", chunk):
+            counts[row['candidate_id']] = json.loads(row['counts'])
+    return counts
+
+def get_stats(top_skills=analytics.TOP_SKILLS):
+    """Dashboard aggregates over every stored candidate (see analytics.summary)."""
+    return analytics.summary(get_connection(), top_skills)
+
+def candidates_generation(conn=None):
+    """Bumped by clear_db, so in-memory candidate indexes know to start over."""
+    row = (conn or get_connection()).execute(
+        "SELECT value FROM meta WHERE key = 'candidates_generation'").fetchone()
+    return int(row[0]) if row else 0
+
+def _insert_job(conn, job):
+    job_id = _insert_row(conn, 'jobs', {
+        'title': job.get('title', ''),
+        'description': job.get('description', ''),
+        'date': job.get('date') or datetime.now().strftime("%Y-%m-%d"),
+    }, job.get('id'))
+    job['id'] = job_id
+    return job_id
+
+def _candidate_from_row(row):
+    return json.loads(row['data'])
+
+def _job_from_row(row):
+    return {"id": row['id'], "title": row['title'], "description": row['description'], "date": row['date']}
 
 def init_db():
-    """Initialize the database file if it doesn't exist."""
-    if not os.path.exists("data"):
-        os.makedirs("data")
-    if not os.path.exists(DB_FILE):
-        with open(DB_FILE, 'w') as f:
-            json.dump({"candidates": [], "jobs": []}, f)
+    """Initialize the database (schema and legacy JSON import) if needed."""
+    get_connection()
 
 def load_db():
     """Load the database content."""
-    init_db()
-    try:
-        with open(DB_FILE, 'r') as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        return {"candidates": [], "jobs": []}
+    return {"candidates": get_candidates(), "jobs": get_jobs()}
 
 def save_db(data):
-    """Save data to the database."""
-    with open(DB_FILE, 'w') as f:
-        json.dump(data, f, indent=4)
-
-def add_candidate(candidate_data):
-    """Add a new candidate entry."""
-    db = load_db()
-    # Create a unique ID (simple timestamp based)
-    candidate_id = int(datetime.now().timestamp())
-    candidate_data['id'] = candidate_id
+    """Replace the whole database content in one transaction."""
+    with transaction() as conn:
+        _delete_all(conn)
+        for candidate in reversed(data.get('candidates', [])):
+            _insert_candidate(conn, candidate)
+        for job in reversed(data.get('jobs', [])):
+            _insert_job(conn, job)
+    job_index.clear()
+
+def add_candidate(candidate_data, resume_text=None, signature=None, dedup_threshold=None):
+    """
+    Add a new candidate entry. With resume_text, the resume also goes into the
+    candidate term index used by job searches (see candidate_index). A MinHash
+    signature is stored for duplicate detection; with dedup_threshold set, the
+    insert is refused with DuplicateCandidate if a stored resume is at least
+    that similar (checked under the write lock, so concurrent uploads can't
+    both get in).
+    """
+    # The id is issued by SQLite, so it is unique even for same-second uploads
+    candidate_data.pop('id', None)
     candidate_data['date'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # Prepend to list to show newest first
-    db['candidates'].insert(0, candidate_data)
-    save_db(db)
+    with transaction() as conn:
+        if signature is not None and dedup_threshold:
+            duplicate = find_near_duplicate(signature, dedup_threshold, conn)
+            if duplicate:
+                raise DuplicateCandidate(*duplicate)
+        candidate_id = _insert_candidate(conn, candidate_data, resume_text, signature)
     return candidate_id
 
 def get_candidates():
-    """Get all candidates."""
-    db = load_db()
-    return db.get('candidates', [])
+    """Get all candidates, newest first."""
+    rows = get_connection().execute("SELECT data FROM candidates ORDER BY id DESC")
+    return [_candidate_from_row(row) for row in rows]
 
 def get_candidate_by_id(c_id):
     """Get specific candidate by ID."""
-    candidates = get_candidates()
-    for c in candidates:
-        if c.get('id') == c_id:
-            return c
-    return None
+    row = get_connection().execute("SELECT data FROM candidates WHERE id = ?", (c_id,)).fetchone()
+    return _candidate_from_row(row) if row else None
+
+def get_candidates_by_ids(ids):
+    """Candidates for the given ids, in the same order; unknown ids are skipped."""
+    ids = list(ids)
+    if not ids:
+        return []
+    rows = get_connection().execute(
+        f"SELECT id, data FROM candidates WHERE id IN ({', '.join('?' for _ in ids)})", ids)
+    found = {row['id']: _candidate_from_row(row) for row in rows}
+    return [found[c_id] for c_id in ids if c_id in found]
+
+def encode_cursor(value, row_id):
+    raw = json.dumps([value, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor, sort='date'):
+    """(sort value, row id) of a cursor; ValueError unless both fit the sort column."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, row_id = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    # bool is an int subclass, but no column holds one
+    if type(row_id) is not int or type(value) not in CURSOR_VALUE_TYPES[sort]:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return value, row_id
+
+def _skill_count(conn, skill):
+    row = conn.execute("SELECT candidates FROM stats_skills WHERE skill = ?", (skill,)).fetchone()
+    return row[0] if row else 0
+
+def query_candidates(sort='date', order='desc', cursor=None, limit=PAGE_SIZE,
+                     skills=None, min_score=None, max_score=None, job_role=None):
+    """
+    One page of candidates using keyset pagination over the secondary indexes.
+    Returns (candidates, next_cursor); next_cursor is None on the last page.
+    """
+    if sort not in SORT_COLUMNS:
+        raise ValueError(f"Unknown sort column: {sort}")
+    column = SORT_COLUMNS[sort]
+    descending = order != 'asc'
+    conn = get_connection()
+
+    skills = [normalize_skill(skill) for skill in skills or []]
+    driver = None
+    if skills:
+        # Read the rarest skill's run of the (skill, candidate_id) key instead of
+        # walking the sort index: that run is already in id order for the date
+        # sort, and small enough to sort for the others
+        counts = {skill: _skill_count(conn, skill) for skill in skills}
+        rarest = min(skills, key=counts.get)
+        if column == 'id' or counts[rarest] <= SELECTIVE_SKILL_ROWS:
+            driver = rarest
+
+    where = []
+    params = []
+    if driver:
+        source = "candidate_skills s CROSS JOIN candidates ON candidates.id = s.candidate_id"
+        where.append("s.skill = ?")
+        params.append(driver)
+        if column == 'id':
+            column = 's.candidate_id'
+    else:
+        source = "candidates"
+    for skill in skills:
+        if skill == driver:
+            continue
+        # Correlated probe of the (skill, candidate_id) key
+        where.append("EXISTS (SELECT 1 FROM candidate_skills cs "
+                     "WHERE cs.skill = ? AND cs.candidate_id = candidates.id)")
+        params.append(skill)
+    if min_score is not None:
+        where.append("match_score >= ?")
+        params.append(min_score)
+    if max_score is not None:
+        where.append("match_score <= ?")
+        params.append(max_score)
+    if job_role:
+        where.append("job_role = ?")
+        params.append(job_role)
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort)
+        if column == 's.candidate_id':
+            where.append(f"s.candidate_id {'<' if descending else '>'} ?")
+            params.append(row_id)
+        else:
+            where.append(f"({column}, candidates.id) {'<' if descending else '>'} (?, ?)")
+            params.extend([value, row_id])
+
+    direction = 'DESC' if descending else 'ASC'
+    sql = f"SELECT candidates.id AS id, {column} AS sort_value, data FROM {source}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if column == 's.candidate_id':
+        sql += f" ORDER BY s.candidate_id {direction} LIMIT ?"
+    else:
+        sql += f" ORDER BY {column} {direction}, candidates.id {direction} LIMIT ?"
+    # Fetch one extra row to know whether another page follows
+    rows = conn.execute(sql, params + [limit + 1]).fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['sort_value'], rows[-1]['id'])
+    return [_candidate_from_row(row) for row in rows], next_cursor
+
+def iter_candidates(limit=None, page_size=500, **filters):
+    """Yields every candidate matching the filters, one keyset page at a time."""
+    cursor = filters.pop('cursor', None)
+    sent = 0
+    while True:
+        size = page_size if limit is None else min(page_size, limit - sent)
+        if size <= 0:
+            return
+        page, cursor = query_candidates(cursor=cursor, limit=size, **filters)
+        for candidate in page:
+            yield candidate
+        sent += len(page)
+        if cursor is None:
+            return
+
+def get_job_roles():
+    """Distinct job roles, hopping through the job_role index one role at a time."""
+    conn = get_connection()
+    roles = []
+    role = conn.execute("SELECT MIN(job_role) FROM candidates").fetchone()[0]
+    while role is not None:
+        roles.append(role)
+        role = conn.execute("SELECT MIN(job_role) FROM candidates WHERE job_role > ?", (role,)).fetchone()[0]
+    return roles
 
 def add_job(title, description):
     """Save a job description."""
-    db = load_db()
-    job_id = int(datetime.now().timestamp())
-    new_job = {
-        "id": job_id,
-        "title": title,
-        "description": description,
-        "date": datetime.now().strftime("%Y-%m-%d")
-    }
-    db['jobs'].insert(0, new_job)
-    save_db(db)
+    with transaction() as conn:
+        job_id = _insert_job(conn, {"title": title, "description": description})
+    job_index.add_job(job_id, description)
     return job_id
 
 def get_jobs():
-    """Get all saved jobs."""
-    db = load_db()
-    return db.get('jobs', [])
+    """Get all saved jobs, newest first."""
+    rows = get_connection().execute("SELECT * FROM jobs ORDER BY id DESC")
+    return [_job_from_row(row) for row in rows]
+
+def get_job_by_id(job_id):
+    """Get specific job by ID."""
+    row = get_connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return _job_from_row(row) if row else None
+
+def _delete_all(conn):
+    """Empties the candidate and job tables, with every aggregate and index derived from them."""
+    conn.execute("DELETE FROM candidates")
+    conn.execute("DELETE FROM candidate_skills")
+    conn.execute("DELETE FROM candidate_terms")
+    conn.execute("DELETE FROM term_stats")
+    conn.execute("DELETE FROM resume_signatures")
+    conn.execute("DELETE FROM lsh_buckets")
+    analytics.reset(conn)
+    conn.execute("DELETE FROM meta WHERE key IN ('corpus_docs', 'corpus_length')")
+    conn.execute("DELETE FROM jobs")
+    # In-memory indexes of the old rows notice the new generation and start over
+    conn.execute("INSERT INTO meta (key, value) VALUES ('candidates_generation', ?) "
+                 "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                 (str(candidates_generation(conn) + 1),))
 
 def clear_db():
     """Clear all data."""
-    save_db({"candidates": [], "jobs": []})
+    with transaction() as conn:
+        _delete_all(conn)
+    job_index.clear()
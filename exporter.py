@@ -0,0 +1,110 @@
+import csv
+import io
+import json
+
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+FIELDS = ['rank', 'id', 'name', 'email', 'phone', 'match_score', 'experience', 'job_role',
+          'skills', 'missing_skills', 'education', 'date', 'report_url']
+LIST_FIELDS = ('skills', 'missing_skills', 'education')
+
+# Rows per Parquet row group; the only rows held in memory at once
+PARQUET_ROW_GROUP = 2000
+
+class ExportError(Exception):
+    """The requested export format can't be produced here."""
+
+def export_records(entries, report_url=None):
+    """Flattens candidate entries into export rows, numbering them in the given order."""
+    for rank, entry in enumerate(entries, 1):
+        record = {name: entry.get(name) for name in FIELDS}
+        record['rank'] = rank
+        for name in LIST_FIELDS:
+            record[name] = list(record[name] or [])
+        if report_url and entry.get('id') is not None:
+            record['report_url'] = report_url(entry['id'])
+        yield record
+
+def stream_csv(records):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FIELDS)
+    writer.writeheader()
+    for record in records:
+        for name in LIST_FIELDS:
+            record[name] = ", ".join(record[name])
+        writer.writerow(record)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only when there were no rows
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def stream_ndjson(records):
+    for record in records:
+        yield json.dumps(record) + "\n"
+
+def _parquet_schema(pa):
+    text_list = pa.list_(pa.string())
+    return pa.schema([
+        ('rank', pa.int64()), ('id', pa.int64()), ('name', pa.string()), ('email', pa.string()),
+        ('phone', pa.string()), ('match_score', pa.float64()), ('experience', pa.float64()),
+        ('job_role', pa.string()), ('skills', text_list), ('missing_skills', text_list),
+        ('education', text_list), ('date', pa.string()), ('report_url', pa.string()),
+    ])
+
+def stream_parquet(records, row_group_size=PARQUET_ROW_GROUP):
+    """Writes one row group at a time and yields the bytes as they are produced."""
+    # pyarrow is optional; only this format needs it
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema(pa)
+    sink = io.BytesIO()
+    writer = pq.ParquetWriter(sink, schema)
+
+    def drain():
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    group = []
+    for record in records:
+        group.append(record)
+        if len(group) >= row_group_size:
+            writer.write_table(pa.Table.from_pylist(group, schema=schema))
+            group = []
+            yield drain()
+    if group:
+        writer.write_table(pa.Table.from_pylist(group, schema=schema))
+    writer.close()
+    yield drain()
+
+def parquet_available():
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def stream_export(entries, fmt, report_url=None):
+    """
+    Generator of the export body for candidate entries in the given format.
+    entries can be any iterable (e.g. db_handler.iter_candidates), so memory
+    use doesn't grow with the number of rows.
+    """
+    if fmt not in FORMATS:
+        raise ExportError(f"Unknown export format: {fmt}")
+    if fmt == 'parquet' and not parquet_available():
+        raise ExportError("Parquet export needs pyarrow (pip install pyarrow).")
+    records = export_records(entries, report_url)
+    if fmt == 'csv':
+        return stream_csv(records)
+    if fmt == 'ndjson':
+        return stream_ndjson(records)
+    return stream_parquet(records)
@@ -0,0 +1,103 @@
+import re
+
+# Every pattern is compiled once, at import.
+EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+
+# Matches formats like +91-9876543210, 9876543210, 123-456-7890
+PHONE_RE = re.compile(r'(?:\+?\d{1,4}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+
+# "X years", "X+ years", "X.Y yrs" in any case, without lowercasing a copy of the text.
+# Spelled-out case classes keep the leading \d prefix scan fast.
+EXPERIENCE_RE = re.compile(r'(\d+(?:\.\d+)?)\+?\s*(?:[yY][eE][aA][rR][sS]?|[yY][rR][sS]?)')
+
+URL_RE = re.compile(r'https?://(?:[-\w.]|(?:%[\da-fA-F]{2}))+')
+
+DEGREES = [
+    r'B\.?Tech', r'M\.?Tech', r'B\.?Sc', r'M\.?Sc', r'B\.?E', r'M\.?E',
+    r'Ph\.?D', r'Bachelor', r'Master', r'Diploma', r'MBA', r'BCA', r'MCA'
+]
+
+def _degree_pattern(degrees):
+    """
+    One alternation for all degrees, with a named group per degree so each
+    match says which one it was. Every degree starts with b/m/p/d, so the
+    pattern leads with that character class (letting the engine skip ahead
+    quickly) and checks the word boundary before it with a lookbehind; each
+    branch then re-checks its own first letter the same way.
+    """
+    branches = [f'(?P<d{i}>(?<={degree[0]}){degree[1:]})' for i, degree in enumerate(degrees)]
+    first = "".join(sorted({degree[0].lower() for degree in degrees}))
+    return re.compile(rf'(?i)[{first}](?<=\b[{first}])(?:{"|".join(branches)})\b')
+
+DEGREE_RE = _degree_pattern(DEGREES)
+
+def extract_email(text):
+    match = EMAIL_RE.search(text)
+    return match.group() if match else None
+
+def extract_phone(text):
+    match = PHONE_RE.search(text)
+    return match.group() if match else None
+
+def extract_experience(text):
+    """Highest "N years" figure in the text, or 0."""
+    years = [float(value) for value in EXPERIENCE_RE.findall(text)]
+    return max(years) if years else 0
+
+def extract_education(text):
+    """
+    Each degree mention with the rest of its line, first mention of each
+    degree per line, in order of appearance.
+    """
+    education = {}
+    line_end = {}
+    for match in DEGREE_RE.finditer(text):
+        start = match.start()
+        # Only the first mention of the same degree on a line counts
+        if start < line_end.get(match.lastgroup, -1):
+            continue
+        end = text.find('\n', start)
+        if end < 0:
+            end = len(text)
+        line_end[match.lastgroup] = end
+        education.setdefault(text[start:end].strip(), None)
+    return list(education)
+
+def extract_links(text):
+    links = {
+        "linkedin": None,
+        "github": None,
+        "portfolio": []
+    }
+    for url in URL_RE.findall(text):
+        if "linkedin.com" in url:
+            links["linkedin"] = url
+        elif "github.com" in url:
+            links["github"] = url
+        else:
+            links["portfolio"].append(url)
+    return links
+
+def extract_fields(text, header=None):
+    """
+    All regex-derived resume fields in one call: one scan per field over the
+    text. With header (the first page), the contact fields (email, phone,
+    links) come from it alone and only fall back to the full text when it
+    has none.
+    """
+    contact = text if header is None else header
+    email = extract_email(contact)
+    phone = extract_phone(contact)
+    links = extract_links(contact)
+    if header is not None:
+        email = email or extract_email(text)
+        phone = phone or extract_phone(text)
+        if not (links["linkedin"] or links["github"] or links["portfolio"]):
+            links = extract_links(text)
+    return {
+        "email": email,
+        "phone": phone,
+        "experience": extract_experience(text),
+        "education": extract_education(text),
+        "links": links
+    }
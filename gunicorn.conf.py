@@ -0,0 +1,30 @@
+import multiprocessing
+import os
+
+# Production serving profile: gunicorn -c gunicorn.conf.py wsgi:app
+bind = os.environ.get("TALENTLENS_BIND", "0.0.0.0:8000")
+# Parsing and scoring are CPU-bound, so one process per core; the threads
+# keep page loads moving while a worker's other requests parse uploads
+workers = int(os.environ.get("TALENTLENS_WEB_WORKERS", multiprocessing.cpu_count()))
+worker_class = "gthread"
+threads = int(os.environ.get("TALENTLENS_WEB_THREADS", "4"))
+# Load wsgi.py (and the models it preloads) once in the master and fork
+preload_app = True
+# Large single uploads are parsed inside the request
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then so fragmented heaps don't keep growing
+max_requests = 2000
+max_requests_jitter = 200
+
+def post_worker_init(worker):
+    # The ingest queue lives in SQLite; start this worker's consumers (and,
+    # with TALENTLENS_PARSE_PROCESSES, its spawned parse pool) so batches
+    # queued before a restart carry on without waiting for a new upload
+    import ingest
+    import semantic
+    ingest.start_workers()
+    # Trains the semantic model in the background once enough resumes are
+    # stored; the workers share a lock, so only one of them does the work
+    semantic.start_trainer()
@@ -0,0 +1,552 @@
+import contextlib
+import itertools
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+from werkzeug.utils import secure_filename
+import archive
+import db_handler
+from resume_parser import parse_resume, parse_resume_batch, parse_resumes, start_pool, pool_running, content_hash, file_type
+from job_matcher import SKILL_MATCHER, find_matching_skills
+import scoring
+import minhash
+import metrics
+
+# Spooled batches and retained originals are private to the app: they live
+# under instance/, which Flask doesn't serve (unlike static/)
+UPLOAD_FOLDER = os.path.join('instance', 'uploads')
+INGEST_FOLDER = os.path.join(UPLOAD_FOLDER, 'ingest')
+# Original uploads are kept only when this is set, named by content hash
+# (RETAIN_FOLDER/ab/abcdef...pdf) so identical files are stored once and
+# different files with the same name never overwrite each other
+RETAIN_UPLOADS = os.environ.get("TALENTLENS_RETAIN_UPLOADS") == "1"
+RETAIN_FOLDER = os.path.join(UPLOAD_FOLDER, 'originals')
+WORKERS = int(os.environ.get("TALENTLENS_INGEST_WORKERS", "4"))
+# Files whose worker crashed mid-way are reclaimed after this long
+STALE_SECONDS = 600
+# Attempts before an unexpected error marks a file as failed
+MAX_ATTEMPTS = 3
+POLL_SECONDS = 1.0
+# A worker claims up to this many queued resumes at once and parses them
+# together, so their names come out of one batched NER pass
+PARSE_BATCH = int(os.environ.get("TALENTLENS_PARSE_BATCH", "8"))
+# With this set, the claimed resumes are parsed on a pool of that many
+# spawned processes instead (resume_parser.parse_resumes), which also
+# enforces a per-file time budget (TALENTLENS_PARSE_TIMEOUT)
+PARSE_PROCESSES = int(os.environ.get("TALENTLENS_PARSE_PROCESSES", "0"))
+# Estimated Jaccard similarity (of word 5-gram sets) above which an upload
+# counts as a re-upload of a stored resume; 0 turns the check off
+DEDUP_THRESHOLD = float(os.environ.get("TALENTLENS_DEDUP_THRESHOLD", "0.85"))
+RESUME_TYPES = ('.pdf', '.docx')
+# Archive entries are queued in groups of this many (one transaction each)
+UNPACK_FLUSH = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingest_batches (
+    id TEXT PRIMARY KEY,
+    job_description TEXT NOT NULL,
+    job_role TEXT,
+    scoring TEXT,
+    profile INTEGER NOT NULL DEFAULT 0,
+    created TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ingest_files (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch_id TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    path TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    stage TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    candidate_id INTEGER,
+    result TEXT,
+    kind TEXT NOT NULL DEFAULT 'resume',
+    archive_id INTEGER,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ingest_files_status ON ingest_files (status, id);
+CREATE INDEX IF NOT EXISTS idx_ingest_files_batch ON ingest_files (batch_id, id);
+"""
+
+STATUSES = ('queued', 'running', 'done', 'failed', 'duplicate', 'skipped')
+
+class ParseError(Exception):
+    """The file could be read but not parsed as a resume; retrying won't help."""
+
+def analyze_resume(filepath, filename, job_description, job_role="Batch Analysis", on_stage=None,
+                   scoring_method=scoring.DEFAULT_METHOD, resume_data=None):
+    """
+    Runs one resume through parse -> dedup -> match -> persist and returns the
+    stored candidate entry (plus filename). filepath may be a path or a
+    seekable binary file object (e.g. the upload stream); filename gives its type.
+    resume_data, when already parsed (see parse_resume_batch), skips the parse.
+    A near-identical resume that is already stored is still scored against
+    this job description, but not stored again: the entry then carries the
+    stored candidate's id plus "duplicate_of" and "similarity". The PDF report isn't rendered here; it is
+    rendered on first request (see report_generator.candidate_report).
+    The resume text goes into the candidate term index for job searches.
+    """
+    def stage(name):
+        if on_stage:
+            on_stage(name)
+
+    if resume_data is None:
+        stage('parse')
+        with metrics.timed('parse'):
+            resume_data = parse_resume(filepath, filename)
+    if not resume_data:
+        raise ParseError(f'Error parsing resume: {filename}')
+
+    stage('dedup')
+    with metrics.timed('dedup'):
+        signature = minhash.signature(resume_data['text'])
+        duplicate = None
+        if signature is not None and DEDUP_THRESHOLD > 0:
+            duplicate = db_handler.find_near_duplicate(signature, DEDUP_THRESHOLD)
+
+    stage('match')
+    with metrics.timed(f'score_{scoring_method}'):
+        match_score = scoring.match_score(resume_data['text'], job_description, scoring_method)
+    with metrics.timed('skills'):
+        # Every skill on the resume (what skill search indexes), and which of the JD's it covers
+        resume_skills = SKILL_MATCHER.find(resume_data['text'])
+        matching_skills, missing_skills = find_matching_skills(resume_data['text'], job_description, resume_skills)
+
+    candidate_entry = {
+        "name": resume_data.get('name'),
+        "email": resume_data.get('email'),
+        "phone": resume_data.get('phone'),
+        "experience": resume_data.get('experience'),
+        "match_score": match_score,
+        "scoring": scoring_method,
+        "skills": matching_skills,
+        "missing_skills": missing_skills,
+        "resume_skills": resume_skills,
+        "education": resume_data.get('education'),
+        "links": resume_data.get('links'),
+        "job_role": job_role
+    }
+    if not duplicate:
+        stage('persist')
+        try:
+            with metrics.timed('persist'):
+                db_handler.add_candidate(candidate_entry, resume_text=resume_data['text'],
+                                         signature=signature, dedup_threshold=DEDUP_THRESHOLD)
+        except db_handler.DuplicateCandidate as e:
+            # Stored by a concurrent upload since the check above
+            duplicate = (e.candidate_id, e.similarity)
+    if duplicate:
+        candidate_entry['id'], candidate_entry['similarity'] = duplicate
+        candidate_entry['duplicate_of'] = duplicate[0]
+
+    candidate_entry['filename'] = filename
+    return candidate_entry
+
+def retain_upload(source, filename, move=False):
+    """
+    Keeps an original upload (a path or binary file object) under its content
+    hash in RETAIN_FOLDER and returns the stored path, or None when retention
+    is off. With move, a path source is moved there instead of copied.
+    """
+    if not RETAIN_UPLOADS:
+        return None
+    digest = content_hash(source)
+    path = os.path.join(RETAIN_FOLDER, digest[:2], digest + file_type(source, filename))
+    if os.path.exists(path):
+        if move:
+            os.remove(source)
+        return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if move:
+        os.replace(source, path)
+        return path
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if isinstance(source, str):
+        shutil.copyfile(source, tmp_path)
+    else:
+        with open(tmp_path, 'wb') as f:
+            shutil.copyfileobj(source, f)
+        source.seek(0)
+    os.replace(tmp_path, path)
+    return path
+
+def _release_spool(path, filename, retain=True):
+    """Drops (or retains) a queued file's spooled copy once it won't be read again."""
+    try:
+        if not retain or retain_upload(path, filename, move=True) is None:
+            os.remove(path)
+    except OSError as e:
+        print(f"Warning: Could not release {path}: {e}")
+    try:
+        # The batch folder goes once its last file is done
+        os.rmdir(os.path.dirname(path))
+    except OSError:
+        pass
+
+_schema_ready = set()
+
+def _connection():
+    conn = db_handler.get_connection()
+    key = (os.getpid(), db_handler.DB_FILE)
+    if key not in _schema_ready:
+        conn.executescript(SCHEMA)
+        # Queues created before batches chose a scoring method or could be profiled
+        columns = [row['name'] for row in conn.execute("PRAGMA table_info(ingest_batches)")]
+        if 'scoring' not in columns:
+            conn.execute("ALTER TABLE ingest_batches ADD COLUMN scoring TEXT")
+        if 'profile' not in columns:
+            conn.execute("ALTER TABLE ingest_batches ADD COLUMN profile INTEGER NOT NULL DEFAULT 0")
+        # ...and before archives were accepted
+        columns = [row['name'] for row in conn.execute("PRAGMA table_info(ingest_files)")]
+        if 'kind' not in columns:
+            conn.execute("ALTER TABLE ingest_files ADD COLUMN kind TEXT NOT NULL DEFAULT 'resume'")
+            conn.execute("ALTER TABLE ingest_files ADD COLUMN archive_id INTEGER")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_ingest_files_archive ON ingest_files (archive_id) "
+                     "WHERE archive_id IS NOT NULL")
+        _schema_ready.add(key)
+    return conn
+
+def create_batch(job_description, files, job_role="Batch Analysis", scoring_method=scoring.DEFAULT_METHOD,
+                 profile=False):
+    """
+    Spools the uploaded files to disk and queues them; the workers need them
+    to outlive the request. files is a list of (filename, save) pairs, where
+    save(path) writes the upload. A file's spooled copy is removed (or kept
+    under RETAIN_FOLDER) once it is done or found to be a duplicate, and
+    removed once it turns out not to be a readable resume or archive; files
+    that failed for other reasons stay so they can be retried.
+    ZIP/tar archives (see archive.is_archive) are queued whole; a worker
+    streams their entries into the queue one at a time, so workers start on
+    the first resumes while the rest is still being unpacked.
+    Returns the batch id straight away; workers do the rest. With profile
+    (and TALENTLENS_PROFILING=1) each file is processed under cProfile.
+    """
+    batch_id = uuid.uuid4().hex
+    batch_dir = os.path.join(INGEST_FOLDER, batch_id)
+    os.makedirs(batch_dir, exist_ok=True)
+
+    spooled = []
+    try:
+        for n, (filename, save) in enumerate(files):
+            # Prefix with batch and position so same-named uploads (and their reports) don't collide
+            path = os.path.join(batch_dir, f"{batch_id[:8]}_{n}_{filename}")
+            save(path)
+            spooled.append((filename, path))
+    except Exception:
+        # Nothing is queued yet, so the spooled copies would never be cleaned up
+        shutil.rmtree(batch_dir, ignore_errors=True)
+        raise
+
+    _connection()
+    now = time.time()
+    with db_handler.transaction() as conn:
+        conn.execute("INSERT INTO ingest_batches (id, job_description, job_role, scoring, profile, created) "
+                     "VALUES (?, ?, ?, ?, ?, ?)",
+                     (batch_id, job_description, job_role, scoring_method,
+                      int(bool(profile) and metrics.PROFILING_ENABLED),
+                      datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        conn.executemany("INSERT INTO ingest_files (batch_id, filename, path, kind, updated) VALUES (?, ?, ?, ?, ?)",
+                         [(batch_id, filename, path, 'archive' if archive.is_archive(filename) else 'resume', now)
+                          for filename, path in spooled])
+    start_workers()
+    _wakeup.set()
+    return batch_id
+
+def get_batch(batch_id):
+    """Batch progress: counts per status plus the status of every file."""
+    conn = _connection()
+    batch = conn.execute("SELECT * FROM ingest_batches WHERE id = ?", (batch_id,)).fetchone()
+    if not batch:
+        return None
+    files = []
+    counts = dict.fromkeys(STATUSES, 0)
+    unpacking = False
+    for row in conn.execute("SELECT * FROM ingest_files WHERE batch_id = ? ORDER BY id", (batch_id,)):
+        # Archives are listed but not counted; their entries are
+        if row['kind'] == 'archive':
+            unpacking = unpacking or row['status'] in ('queued', 'running')
+        else:
+            counts[row['status']] += 1
+        files.append({
+            "id": row['id'],
+            "filename": row['filename'],
+            "kind": row['kind'],
+            "status": row['status'],
+            "stage": row['stage'],
+            "attempts": row['attempts'],
+            "error": row['error'],
+            "candidate_id": row['candidate_id'],
+        })
+    return {
+        "id": batch['id'],
+        "job_description": batch['job_description'],
+        "job_role": batch['job_role'],
+        "scoring": batch['scoring'] or scoring.DEFAULT_METHOD,
+        "profiled": bool(batch['profile']),
+        "created": batch['created'],
+        "total": sum(counts.values()),
+        "counts": counts,
+        "unpacking": unpacking,
+        "finished": counts['queued'] == 0 and counts['running'] == 0 and not unpacking,
+        "files": files,
+    }
+
+def iter_batch_results(batch_id):
+    """
+    Yields the candidate entries of the finished files in a batch, best match
+    first. SQLite does the sorting, so rows are read one at a time.
+    """
+    rows = _connection().execute(
+        "SELECT result FROM ingest_files WHERE batch_id = ? AND status IN ('done', 'duplicate') "
+        "AND kind = 'resume' AND result IS NOT NULL "
+        "ORDER BY json_extract(result, '$.match_score') DESC, id", (batch_id,))
+    for row in rows:
+        yield json.loads(row['result'])
+
+def get_batch_results(batch_id):
+    """Candidate entries of the finished files in a batch, best match first."""
+    return list(iter_batch_results(batch_id))
+
+def retry_failed(batch_id, file_id=None):
+    """
+    Puts failed files of a batch (or a single one) back on the queue. Returns
+    how many. Files that couldn't be parsed are gone and aren't retried.
+    """
+    sql = "UPDATE ingest_files SET status = 'queued', error = NULL, stage = NULL, updated = ? " \
+          "WHERE batch_id = ? AND status = 'failed' AND path != ''"
+    params = [time.time(), batch_id]
+    if file_id is not None:
+        sql += " AND id = ?"
+        params.append(file_id)
+    _connection()
+    with db_handler.transaction() as conn:
+        count = conn.execute(sql, params).rowcount
+    if count:
+        start_workers()
+        _wakeup.set()
+    return count
+
+def _claim(limit=1):
+    """
+    Atomically takes the oldest queued (or abandoned) files off the queue:
+    one archive, or up to limit resumes. Returns [(row, batch)].
+    Abandoned files that already used up MAX_ATTEMPTS (each claim counts, so
+    a file that keeps crashing or killing its worker is among them) are
+    marked failed instead of being reclaimed.
+    """
+    _connection()
+    now = time.time()
+    with db_handler.transaction() as conn:
+        abandoned = conn.execute(
+            "UPDATE ingest_files SET status = 'failed', stage = NULL, error = ?, updated = ? "
+            "WHERE status = 'running' AND updated < ? AND attempts >= ?",
+            (f"Gave up after {MAX_ATTEMPTS} attempts: the worker crashed or stalled on this file",
+             now, now - STALE_SECONDS, MAX_ATTEMPTS)).rowcount
+        if abandoned:
+            metrics.inc('files_total', abandoned, status='failed')
+        # Leave some of a small queue to the other workers
+        queued = conn.execute("SELECT COUNT(*) FROM ingest_files WHERE status = 'queued'").fetchone()[0]
+        limit = max(1, min(limit, queued // WORKERS))
+        rows = conn.execute(
+            "SELECT * FROM ingest_files WHERE status = 'queued' "
+            "OR (status = 'running' AND updated < ?) ORDER BY id LIMIT ?",
+            (now - STALE_SECONDS, limit)).fetchall()
+        if not rows:
+            return []
+        if rows[0]['kind'] == 'archive':
+            rows = rows[:1]
+        else:
+            rows = list(itertools.takewhile(lambda row: row['kind'] == 'resume', rows))
+        conn.executemany("UPDATE ingest_files SET status = 'running', stage = NULL, "
+                         "attempts = attempts + 1, updated = ? WHERE id = ?", [(now, row['id']) for row in rows])
+        batches = {}
+        for row in rows:
+            if row['batch_id'] not in batches:
+                batches[row['batch_id']] = conn.execute("SELECT * FROM ingest_batches WHERE id = ?",
+                                                        (row['batch_id'],)).fetchone()
+    return [(row, batches[row['batch_id']]) for row in rows]
+
+def _update(file_id, **fields):
+    fields['updated'] = time.time()
+    columns = ", ".join(f"{name} = ?" for name in fields)
+    with db_handler.transaction() as conn:
+        conn.execute(f"UPDATE ingest_files SET {columns} WHERE id = ?", list(fields.values()) + [file_id])
+
+def _unpack(row, batch):
+    """
+    Streams an archive's entries into the queue and returns how many there
+    were. Supported entries are copied to the batch folder one at a time;
+    unsupported, oversized or unreadable ones are recorded as skipped. A
+    retried archive (e.g. after a crash) resumes after the entries already
+    queued; entry n always gets the same spool name, so a half-written copy
+    is simply overwritten.
+    """
+    file_id = row['id']
+    batch_dir = os.path.dirname(row['path'])
+    conn = _connection()
+    queued = conn.execute("SELECT COUNT(*) FROM ingest_files WHERE archive_id = ?", (file_id,)).fetchone()[0]
+
+    pending = []
+    count = 0
+
+    def flush():
+        with db_handler.transaction() as conn:
+            conn.executemany("INSERT INTO ingest_files (batch_id, filename, path, status, error, archive_id, updated) "
+                             "VALUES (?, ?, ?, ?, ?, ?, ?)", pending)
+            # Also the heartbeat that keeps other workers from reclaiming the archive
+            conn.execute("UPDATE ingest_files SET stage = ?, updated = ? WHERE id = ?",
+                         (f"unpacking ({count} entries)", time.time(), file_id))
+        pending.clear()
+        _wakeup.set()
+
+    for n, (name, size, f) in enumerate(archive.iter_entries(row['path'])):
+        count = n + 1
+        if n < queued:
+            continue
+        filename = secure_filename(os.path.basename(name)) or f"entry_{n}"
+        path = os.path.join(batch_dir, f"{batch['id'][:8]}_{file_id}_{n}_{filename}")
+        status, error = 'queued', None
+        if file_type(filename) not in RESUME_TYPES:
+            status, error = 'skipped', "Unsupported file type."
+        elif size > archive.MAX_ENTRY_BYTES:
+            status, error = 'skipped', f"Larger than {archive.MAX_ENTRY_MB} MB."
+        else:
+            try:
+                archive.copy_entry(f, path)
+            except archive.BadEntry as e:
+                status, error = 'skipped', str(e)
+        pending.append((batch['id'], filename, path if status == 'queued' else '', status, error, file_id,
+                        time.time()))
+        if len(pending) >= UNPACK_FLUSH:
+            flush()
+    flush()
+    return count
+
+def _process_archive(row, batch):
+    file_id = row['id']
+    try:
+        count = _unpack(row, batch)
+    except archive.ArchiveError as e:
+        _update(file_id, status='failed', stage=None, error=str(e), path='')
+        _release_spool(row['path'], row['filename'], retain=False)
+    except Exception as e:
+        print(f"Error unpacking {row['filename']}: {e}")
+        retry = row['attempts'] + 1 < MAX_ATTEMPTS
+        _update(file_id, status='queued' if retry else 'failed', error=str(e))
+    else:
+        _update(file_id, status='done', stage=f"{count} entries", error=None)
+        try:
+            os.remove(row['path'])
+        except OSError as e:
+            print(f"Warning: Could not remove {row['path']}: {e}")
+
+def _parse_claimed(rows):
+    """
+    Parses the claimed resumes together: on the parse pool when it runs,
+    else with one batched NER pass. Returns (resume_data, error) per row;
+    resume_data None (without an error) marks a file to parse on its own, so
+    its error is reported like a single upload's.
+    """
+    paths = [row['path'] for row in rows]
+    if PARSE_PROCESSES > 0:
+        # Replaces a pool that broke (e.g. a worker killed by a crashing PDF library)
+        start_pool(PARSE_PROCESSES)
+    try:
+        if pool_running():
+            parsed = {path: (resume_data, error) for path, resume_data, error in parse_resumes(paths)}
+            return [parsed[path] for path in paths]
+        return [(resume_data, None) for resume_data in parse_resume_batch(paths)]
+    except Exception as e:
+        print(f"Batch parse failed, parsing files one at a time: {e}")
+        return [(None, None)] * len(rows)
+
+def _process_resume(row, batch, resume_data, parse_error=None):
+    file_id = row['id']
+    profile = metrics.profiled(batch['id'], str(file_id)) if batch['profile'] else contextlib.nullcontext()
+    try:
+        if parse_error:
+            # Failed, timed out or crashed in a pool worker: retried like any other error
+            raise RuntimeError(parse_error)
+        with profile, metrics.timed('file'):
+            entry = analyze_resume(row['path'], row['filename'], batch['job_description'], batch['job_role'],
+                                   on_stage=lambda name: _update(file_id, stage=name),
+                                   scoring_method=batch['scoring'] or scoring.DEFAULT_METHOD,
+                                   resume_data=resume_data)
+    except ParseError as e:
+        metrics.inc('files_total', status='failed')
+        _update(file_id, status='failed', error=str(e), path='')
+        _release_spool(row['path'], row['filename'], retain=False)
+    except Exception as e:
+        print(f"Error ingesting {row['filename']}: {e}")
+        retry = row['attempts'] + 1 < MAX_ATTEMPTS
+        metrics.inc('files_total', status='retried' if retry else 'failed')
+        _update(file_id, status='queued' if retry else 'failed', error=str(e))
+    else:
+        # Duplicates are ranked like any other file, but link to the stored candidate
+        status = 'duplicate' if entry.get('duplicate_of') else 'done'
+        metrics.inc('files_total', status=status)
+        _update(file_id, status=status, stage=None,
+                error=f"Near-duplicate of candidate {entry['id']} ({entry['similarity']:.0%} similar); not stored again"
+                if status == 'duplicate' else None,
+                candidate_id=entry['id'], result=json.dumps(entry))
+        _release_spool(row['path'], row['filename'])
+
+def process_next():
+    """
+    Processes the next queued resumes (up to PARSE_BATCH, parsed together)
+    or unpacks one archive. Returns False when the queue is empty.
+    """
+    claimed = _claim(PARSE_BATCH)
+    if not claimed:
+        return False
+    if claimed[0][0]['kind'] == 'archive':
+        _process_archive(*claimed[0])
+        return True
+    parsed = _parse_claimed([row for row, _ in claimed])
+    for (row, batch), (resume_data, error) in zip(claimed, parsed):
+        _process_resume(row, batch, resume_data, error)
+    return True
+
+def queue_counts():
+    """Files per status across every batch."""
+    rows = _connection().execute("SELECT status, COUNT(*) FROM ingest_files WHERE kind = 'resume' GROUP BY status")
+    counts = dict.fromkeys(STATUSES, 0)
+    counts.update((row[0], row[1]) for row in rows)
+    return counts
+
+_wakeup = threading.Event()
+_workers = []
+_workers_pid = None
+_workers_lock = threading.Lock()
+
+def _worker_loop():
+    while True:
+        try:
+            busy = process_next()
+        except Exception as e:
+            print(f"Ingest worker error: {e}")
+            busy = False
+        if not busy:
+            # Woken early by local enqueues; the timeout picks up other processes' batches
+            _wakeup.wait(POLL_SECONDS)
+            _wakeup.clear()
+
+def start_workers(count=None):
+    """Starts this process's background workers (and parse pool, if configured) once (again after a fork)."""
+    global _workers, _workers_pid
+    with _workers_lock:
+        if _workers_pid == os.getpid() and _workers:
+            return
+        if PARSE_PROCESSES > 0:
+            start_pool(PARSE_PROCESSES)
+        _workers = []
+        _workers_pid = os.getpid()
+        for n in range(count or WORKERS):
+            worker = threading.Thread(target=_worker_loop, name=f"ingest-{n}", daemon=True)
+            worker.start()
+            _workers.append(worker)
@@ -0,0 +1,155 @@
+import os
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+INDEX_FILE = os.path.join("data", "job_index.npz")
+
+# The exact tokenisation CountVectorizer uses inside get_match_score
+analyze = CountVectorizer().build_analyzer()
+
+def count_terms(text):
+    counts = {}
+    for token in analyze(text):
+        counts[token] = counts.get(token, 0) + 1
+    return counts
+
+def vectorize(texts, vocabulary, grow=False):
+    """
+    Builds an L2-normalised CSR matrix of term counts over a shared vocabulary.
+    Row norms always include terms missing from the vocabulary, so a dot
+    product with another normalised row is the same cosine a pairwise
+    CountVectorizer fit would give.
+    """
+    indptr = [0]
+    indices = []
+    data = []
+    for text in texts:
+        counts = count_terms(text)
+        norm = np.sqrt(sum(c * c for c in counts.values()))
+        for token, count in counts.items():
+            col = vocabulary.get(token)
+            if col is None:
+                if not grow:
+                    continue
+                col = vocabulary[token] = len(vocabulary)
+            indices.append(col)
+            data.append(count / norm)
+        indptr.append(len(indices))
+    return sparse.csr_matrix(
+        (np.array(data, dtype=np.float64), np.array(indices, dtype=np.int64), indptr),
+        shape=(len(texts), len(vocabulary)),
+    )
+
+class JobIndex:
+    """
+    Saved job descriptions vectorised once, as CSR rows over a shared vocabulary.
+    """
+    def __init__(self):
+        self.vocabulary = {}
+        self.job_ids = []
+        self.matrix = sparse.csr_matrix((0, 0), dtype=np.float64)
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    def add(self, job_id, description):
+        if job_id in self.job_ids:
+            self.remove(job_id)
+        row = vectorize([description], self.vocabulary, grow=True)
+        width = len(self.vocabulary)
+        matrix = self.matrix
+        matrix.resize((matrix.shape[0], width))
+        self.matrix = sparse.vstack([matrix, row], format='csr')
+        self.job_ids.append(job_id)
+
+    def remove(self, job_id):
+        if job_id not in self.job_ids:
+            return
+        keep = [i for i, j in enumerate(self.job_ids) if j != job_id]
+        self.matrix = self.matrix[keep]
+        self.job_ids = [self.job_ids[i] for i in keep]
+
+    def sync(self, jobs):
+        """Makes the index hold exactly the given jobs. Returns True if it changed."""
+        wanted = {job['id']: job['description'] for job in jobs}
+        stale = [j for j in self.job_ids if j not in wanted]
+        for job_id in stale:
+            self.remove(job_id)
+        missing = [j for j in wanted if j not in self.job_ids]
+        for job_id in missing:
+            self.add(job_id, wanted[job_id])
+        return bool(stale or missing)
+
+    def score(self, resume_texts):
+        """
+        Cosine similarity of every resume against every indexed job, as an
+        (n_resumes, n_jobs) array, computed with one sparse matrix product.
+        """
+        resumes = vectorize(resume_texts, self.vocabulary)
+        return (resumes @ self.matrix.T).toarray()
+
+    def save(self, path=INDEX_FILE):
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f,
+                     terms=np.array(terms, dtype=str),
+                     job_ids=np.array(self.job_ids, dtype=np.int64),
+                     data=self.matrix.data,
+                     indices=self.matrix.indices,
+                     indptr=self.matrix.indptr)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        index = cls()
+        with np.load(path) as f:
+            index.vocabulary = {term: i for i, term in enumerate(f['terms'].tolist())}
+            index.job_ids = f['job_ids'].tolist()
+            index.matrix = sparse.csr_matrix(
+                (f['data'], f['indices'], f['indptr']),
+                shape=(len(index.job_ids), len(index.vocabulary)),
+            )
+        return index
+
+_index = None
+_index_mtime = None
+
+def get_index():
+    """Returns the shared job index, reloading it if another process saved a newer one."""
+    global _index, _index_mtime
+    mtime = os.path.getmtime(INDEX_FILE) if os.path.exists(INDEX_FILE) else None
+    if _index is None or mtime != _index_mtime:
+        try:
+            _index = JobIndex.load() if mtime is not None else JobIndex()
+        except Exception as e:
+            print(f"Warning: Could not load job index, rebuilding: {e}")
+            _index = JobIndex()
+        _index_mtime = mtime
+    return _index
+
+def _save(index):
+    global _index_mtime
+    index.save()
+    _index_mtime = os.path.getmtime(INDEX_FILE)
+
+def add_job(job_id, description):
+    """Vectorises a newly saved job into the index."""
+    index = get_index()
+    index.add(job_id, description)
+    _save(index)
+
+def sync(jobs):
+    """Brings the index in line with the stored jobs (e.g. jobs saved before the index existed)."""
+    index = get_index()
+    if index.sync(jobs):
+        _save(index)
+    return index
+
+def clear():
+    global _index, _index_mtime
+    if os.path.exists(INDEX_FILE):
+        os.remove(INDEX_FILE)
+    _index = JobIndex()
+    _index_mtime = None
@@ -1,15 +1,11 @@
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
-import spacy
 import json
 import os
-
-# Load spaCy model
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    print("Model 'en_core_web_sm' not found. Please download it using: python -m spacy download en_core_web_sm")
-    nlp = None
+import re
+import db_handler
+import job_index
+import nlp_models
 
 # Load Skills Database
 SKILLS_DB = {"technical_skills": [], "soft_skills": []}
@@ -28,7 +24,25 @@ def get_match_score(resume_text, job_description):
     match_percentage = cosine_similarity(count_matrix)[0][1] * 100
     return round(match_percentage, 2)
 
+def get_match_scores(resume_texts, jobs=None):
+    """
+    Scores a batch of resumes against every saved job with a single sparse
+    matrix product over the pre-vectorized job index.
+    Returns (job_ids, scores) where scores[i][j] equals
+    get_match_score(resume_texts[i], <description of job_ids[j]>).
+    """
+    if jobs is None:
+        jobs = db_handler.get_jobs()
+    index = job_index.sync(jobs)
+    if not resume_texts or not len(index):
+        return list(index.job_ids), [[] for _ in resume_texts]
+
+    similarity = index.score(resume_texts)
+    scores = [[round(float(value) * 100, 2) for value in row] for row in similarity]
+    return list(index.job_ids), scores
+
 def extract_keywords(text):
+    nlp = nlp_models.get_nlp("pos")
     if not nlp:
         return []
     
@@ -42,38 +56,95 @@ def extract_keywords(text):
     return list(set(keywords))
 
 def normalize_skill(skill):
-    return skill.lower().strip()
+    return " ".join(skill.lower().split())
+
+# Characters that may not touch a skill on either side. Including '+' and '#'
+# keeps "c" from matching inside "c++" and "java" from matching "javascript".
+SKILL_BOUNDARY = r'[\w+#]'
 
-def find_matching_skills(resume_text, job_description):
+def _build_trie(phrases):
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = True
+    return trie
+
+def _trie_to_regex(node):
+    """
+    Turns a character trie into a regex where shared prefixes are factored
+    out, so the engine walks the alternatives like an automaton instead of
+    retrying every skill at every position.
+    """
+    terminal = '' in node
+    branches = []
+    for char in sorted(c for c in node if c):
+        atom = r'\s+' if char == ' ' else re.escape(char)
+        branches.append(atom + _trie_to_regex(node[char]))
+
+    if not branches:
+        return ''
+    if len(branches) == 1 and not terminal:
+        return branches[0]
+    pattern = '(?:' + '|'.join(branches) + ')'
+    # Greedy optional group: the longest skill is tried first
+    return pattern + '?' if terminal else pattern
+
+class SkillMatcher:
+    """
+    Finds every known skill (or alias of one) in a text with a single
+    precompiled regex pass.
+    """
+    def __init__(self, skills, aliases=None):
+        self.canonical = {}
+        for skill in skills:
+            skill = normalize_skill(skill)
+            if skill:
+                self.canonical[skill] = skill
+        for skill, names in (aliases or {}).items():
+            skill = normalize_skill(skill)
+            for name in names:
+                name = normalize_skill(name)
+                if name:
+                    self.canonical.setdefault(name, skill)
+
+        self.pattern = None
+        if self.canonical:
+            body = _trie_to_regex(_build_trie(self.canonical))
+            self.pattern = re.compile(
+                r'(?<!' + SKILL_BOUNDARY + ')' + body + r'(?!' + SKILL_BOUNDARY + ')'
+            )
+
+    @classmethod
+    def from_skills_db(cls, skills_db):
+        skills = skills_db.get("technical_skills", []) + skills_db.get("soft_skills", [])
+        return cls(skills, skills_db.get("aliases", {}))
+
+    def find(self, text):
+        """Returns the canonical skills found in text, in order of first appearance."""
+        found = {}
+        if self.pattern is None or not text:
+            return []
+        for match in self.pattern.finditer(text.lower()):
+            skill = self.canonical[" ".join(match.group().split())]
+            found.setdefault(skill, None)
+        return list(found)
+
+SKILL_MATCHER = SkillMatcher.from_skills_db(SKILLS_DB)
+
+def find_matching_skills(resume_text, job_description, resume_skills=None):
     """
     Extracts skills from JD and Resume using the predefined Skills DB
-    and finds matches/missing skills.
+    and finds matches/missing skills. resume_skills, if the caller already
+    has SKILL_MATCHER.find(resume_text), saves scanning the resume again.
     """
-    if not nlp:
-        return [], []
+    # Find required skills in JD, and skills present in Resume
+    required_skills = SKILL_MATCHER.find(job_description)
+    resume_skills = set(SKILL_MATCHER.find(resume_text) if resume_skills is None else resume_skills)
 
-    resume_text_lower = resume_text.lower()
-    jd_lower = job_description.lower()
+    # Calculate match, keeping the order skills appear in the JD
+    matched_skills = [skill for skill in required_skills if skill in resume_skills]
+    missing_skills = [skill for skill in required_skills if skill not in resume_skills]
 
-    # Flatten skills list for easy checking
-    all_known_skills = set(SKILLS_DB["technical_skills"] + SKILLS_DB["soft_skills"])
-    
-    # Find required skills in JD
-    required_skills = set()
-    for skill in all_known_skills:
-        # Simple substring match (can be improved with regex word boundaries)
-        if skill in jd_lower:
-            required_skills.add(skill)
-            
-    # Find skills present in Resume
-    resume_skills = set()
-    for skill in all_known_skills:
-        if skill in resume_text_lower:
-            resume_skills.add(skill)
-    
-    # Calculate match
-    matched_skills = list(required_skills.intersection(resume_skills))
-    missing_skills = list(required_skills.difference(resume_skills))
-    
     return matched_skills, missing_skills
-
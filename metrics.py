@@ -0,0 +1,262 @@
+import atexit
+import bisect
+import cProfile
+import glob
+import io
+import json
+import multiprocessing.util
+import os
+import pstats
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+import db_handler
+
+PREFIX = "talentlens"
+# Upper bounds (seconds) of the stage timing histogram buckets
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Per-batch cProfile dumps are only allowed when this is set; profiling
+# slows processing down a lot and the reports expose code internals.
+PROFILING_ENABLED = os.environ.get("TALENTLENS_PROFILING") == "1"
+PROFILE_FOLDER = os.path.join("data", "profiles")
+# Orders profile_report accepts (pstats.SortKey values plus their legacy aliases)
+PROFILE_SORT_KEYS = ("calls", "cumulative", "cumtime", "file", "filename", "line", "module", "name",
+                     "ncalls", "nfl", "pcalls", "stdname", "time", "tottime")
+
+# Counters and histograms are summed across processes (gunicorn workers,
+# ingest threads) in SQLite; each process buffers its increments and adds
+# them to the shared totals at most this often, and on every render
+FLUSH_SECONDS = float(os.environ.get("TALENTLENS_METRICS_FLUSH", "1"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metric_values (
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    labels TEXT NOT NULL,
+    slot INTEGER NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (kind, name, labels, slot)
+) WITHOUT ROWID;
+"""
+# Slot of a histogram's running sum; slots 0..len(BUCKETS) hold bucket counts
+SUM_SLOT = -1
+
+HELP = {
+    "stage_seconds": "Time spent in each processing stage.",
+    "files_total": "Resumes processed by the pipeline, by outcome.",
+    "cache_lookups_total": "Parse/report cache lookups, by result.",
+}
+
+_lock = threading.Lock()
+# Increments not yet added to the shared totals
+_histograms = {}
+_counters = {}
+# Gauges stay per process: they are set from shared state just before rendering
+_gauges = {}
+_flusher_pid = None
+_schema_ready = set()
+
+def _key(name, labels):
+    return (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+
+def _start_flusher():
+    """Called with _lock held; starts this process's flush thread once."""
+    global _flusher_pid
+    if _flusher_pid == os.getpid():
+        return
+    if _flusher_pid is not None:
+        # Forked: the parent's buffered increments are its own to flush
+        _histograms.clear()
+        _counters.clear()
+    _flusher_pid = os.getpid()
+    threading.Thread(target=_flush_loop, daemon=True).start()
+    # multiprocessing children (the parse pool) leave through os._exit, which
+    # skips atexit but runs these finalizers
+    multiprocessing.util.Finalize(None, flush, exitpriority=0)
+
+def _flush_loop():
+    while True:
+        time.sleep(FLUSH_SECONDS)
+        flush()
+
+def observe(name, value, **labels):
+    """Records one value in a histogram."""
+    key = _key(name, labels)
+    slot = bisect.bisect_left(BUCKETS, value)
+    with _lock:
+        _start_flusher()
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [[0] * (len(BUCKETS) + 1), 0.0]
+        histogram[0][slot] += 1
+        histogram[1] += value
+
+@contextmanager
+def timed(stage):
+    """Times the enclosed block into the stage_seconds histogram."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe("stage_seconds", time.perf_counter() - start, stage=stage)
+
+def inc(name, amount=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _start_flusher()
+        _counters[key] = _counters.get(key, 0) + amount
+
+def set_gauge(name, value, **labels):
+    """Gauges are point-in-time values, set just before rendering (e.g. cache sizes)."""
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+def _connection():
+    conn = db_handler.get_connection()
+    key = (os.getpid(), db_handler.DB_FILE)
+    if key not in _schema_ready:
+        conn.executescript(SCHEMA)
+        _schema_ready.add(key)
+    return conn
+
+def flush():
+    """Adds this process's buffered increments to the shared totals."""
+    with _lock:
+        if _flusher_pid != os.getpid():
+            return
+        histograms, counters = dict(_histograms), dict(_counters)
+        _histograms.clear()
+        _counters.clear()
+    if not histograms and not counters:
+        return
+    rows = []
+    for (name, labels), (counts, total) in histograms.items():
+        labels = json.dumps(labels)
+        rows.extend(("histogram", name, labels, slot, count) for slot, count in enumerate(counts) if count)
+        rows.append(("histogram", name, labels, SUM_SLOT, total))
+    rows.extend(("counter", name, json.dumps(labels), 0, value) for (name, labels), value in counters.items())
+    try:
+        _connection()
+        with db_handler.transaction() as conn:
+            conn.executemany("""
+                INSERT INTO metric_values (kind, name, labels, slot, value) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (kind, name, labels, slot) DO UPDATE SET value = value + excluded.value
+            """, rows)
+    except sqlite3.Error as e:
+        print(f"Warning: Could not flush metrics: {e}")
+        # Keep the increments for the next flush
+        with _lock:
+            for key, (counts, total) in histograms.items():
+                histogram = _histograms.setdefault(key, [[0] * (len(BUCKETS) + 1), 0.0])
+                histogram[0] = [a + b for a, b in zip(histogram[0], counts)]
+                histogram[1] += total
+            for key, value in counters.items():
+                _counters[key] = _counters.get(key, 0) + value
+
+atexit.register(flush)
+
+def _totals():
+    """Shared histograms and counters, summed over every process."""
+    histograms, counters = {}, {}
+    rows = _connection().execute("SELECT kind, name, labels, slot, value FROM metric_values").fetchall()
+    for kind, name, labels, slot, value in rows:
+        key = (name, tuple(tuple(pair) for pair in json.loads(labels)))
+        if kind == "counter":
+            counters[key] = int(value) if value == int(value) else value
+            continue
+        histogram = histograms.setdefault(key, [[0] * (len(BUCKETS) + 1), 0.0])
+        if slot == SUM_SLOT:
+            histogram[1] = value
+        else:
+            histogram[0][slot] = int(value)
+    return histograms, counters
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(pairs, extra=()):
+    pairs = list(pairs) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+def _format(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    flush()
+    histograms, counters = _totals()
+    with _lock:
+        gauges = dict(_gauges)
+
+    lines = []
+    seen = set()
+
+    def header(name, kind):
+        if name not in seen:
+            seen.add(name)
+            if name in HELP:
+                lines.append(f"# HELP {PREFIX}_{name} {HELP[name]}")
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+
+    for (name, labels), (counts, total) in sorted(histograms.items()):
+        header(name, "histogram")
+        cumulative = 0
+        for bound, count in zip(BUCKETS, counts):
+            cumulative += count
+            lines.append(f"{PREFIX}_{name}_bucket{_labels(labels, [('le', bound)])} {cumulative}")
+        cumulative += counts[-1]
+        lines.append(f"{PREFIX}_{name}_bucket{_labels(labels, [('le', '+Inf')])} {cumulative}")
+        lines.append(f"{PREFIX}_{name}_sum{_labels(labels)} {_format(total)}")
+        lines.append(f"{PREFIX}_{name}_count{_labels(labels)} {cumulative}")
+    for (name, labels), value in sorted(counters.items()):
+        header(name, "counter")
+        lines.append(f"{PREFIX}_{name}{_labels(labels)} {_format(value)}")
+    for (name, labels), value in sorted(gauges.items()):
+        header(name, "gauge")
+        lines.append(f"{PREFIX}_{name}{_labels(labels)} {_format(value)}")
+    return "\n".join(lines) + "\n"
+
+def reset():
+    """Zeroes every metric, including the totals shared with other processes."""
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+        _gauges.clear()
+    _connection()
+    with db_handler.transaction() as conn:
+        conn.execute("DELETE FROM metric_values")
+
+@contextmanager
+def profiled(batch_id, name):
+    """
+    Runs the block under cProfile and saves the stats as
+    data/profiles/<batch_id>/<name>.prof (see profile_report).
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        folder = os.path.join(PROFILE_FOLDER, batch_id)
+        os.makedirs(folder, exist_ok=True)
+        profiler.dump_stats(os.path.join(folder, f"{name}.prof"))
+
+def profile_report(batch_id, sort="cumulative", limit=60):
+    """
+    Text report of every profile saved for a batch, merged; None if there are none.
+    Raises ValueError for a sort order not in PROFILE_SORT_KEYS.
+    """
+    if sort not in PROFILE_SORT_KEYS:
+        raise ValueError(f"Unknown sort order: {sort}")
+    files = sorted(glob.glob(os.path.join(PROFILE_FOLDER, batch_id, "*.prof")))
+    if not files:
+        return None
+    out = io.StringIO()
+    stats = pstats.Stats(*files, stream=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return f"{len(files)} file(s) profiled\n" + out.getvalue()
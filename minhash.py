@@ -0,0 +1,59 @@
+import hashlib
+import re
+import zlib
+import numpy as np
+
+NUM_PERM = 128
+# 16 bands of 8 rows: two resumes share a bucket with ~60% odds at 0.7
+# Jaccard similarity and >99% at 0.85
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 5
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# Fixed seed: signatures are stored, so the permutations must never change
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, _MAX_HASH, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, _MAX_HASH, size=NUM_PERM, dtype=np.uint64)
+
+WORD_RE = re.compile(r'\w+')
+
+def shingles(text):
+    """Overlapping word 5-grams of the lowercased text."""
+    words = WORD_RE.findall(text.lower())
+    if len(words) <= SHINGLE_WORDS:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+def signature(text):
+    """
+    MinHash signature of the text as NUM_PERM uint32 values, or None for
+    text without any words. The share of equal positions between two
+    signatures estimates the Jaccard similarity of their shingle sets.
+    """
+    grams = shingles(text)
+    if not grams:
+        return None
+    hashes = np.array([zlib.crc32(g.encode()) for g in grams], dtype=np.uint64)
+    # (a * x + b) mod p per permutation; 32-bit x and a keep the product inside uint64
+    permuted = (np.outer(hashes, _A) + _B) % _PRIME & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+def to_bytes(sig):
+    return sig.astype('<u4').tobytes()
+
+def from_bytes(blob):
+    return np.frombuffer(blob, dtype='<u4')
+
+def band_keys(sig):
+    """One signed 64-bit bucket key per band (SQLite INTEGER range)."""
+    raw = sig.astype('<u4').tobytes()
+    size = ROWS * 4
+    return [int.from_bytes(hashlib.blake2b(raw[i * size:(i + 1) * size], digest_size=8).digest(),
+                           'little', signed=True)
+            for i in range(BANDS)]
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
@@ -0,0 +1,69 @@
+import json
+import os
+import threading
+from importlib import metadata
+
+MODEL_NAME = os.environ.get("TALENTLENS_SPACY_MODEL", "en_core_web_sm")
+
+# Pipeline components of en_core_web_sm
+ALL_COMPONENTS = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner", "senter"]
+
+# What each caller actually runs. In en_core_web_sm "ner" has its own
+# embedding layer, so name extraction needs nothing else.
+TASK_COMPONENTS = {
+    "ner": ["ner"],
+    "pos": ["tok2vec", "tagger", "attribute_ruler"],
+}
+
+_models = {}
+_lock = threading.Lock()
+_missing = False
+
+def get_nlp(task="ner"):
+    """
+    Returns the spaCy pipeline for a task, loading it on first use with every
+    component the task doesn't need excluded. Returns None if the model isn't installed.
+    """
+    global _missing
+    nlp = _models.get(task)
+    if nlp is not None or _missing:
+        return nlp
+
+    with _lock:
+        if task in _models or _missing:
+            return _models.get(task)
+        needed = TASK_COMPONENTS[task]
+        # spaCy itself is imported here, not at module import, to keep app start-up light
+        import spacy
+        try:
+            nlp = spacy.load(MODEL_NAME, exclude=[c for c in ALL_COMPONENTS if c not in needed])
+        except OSError:
+            print(f"Model '{MODEL_NAME}' not found. Please download it using: python -m spacy download {MODEL_NAME}")
+            _missing = True
+            return None
+        _models[task] = nlp
+        return nlp
+
+def preload(tasks=tuple(TASK_COMPONENTS)):
+    """Loads the pipelines up front, e.g. in a server master before forking workers."""
+    for task in tasks:
+        get_nlp(task)
+
+def loaded_tasks():
+    return sorted(_models)
+
+def model_version():
+    """
+    Identifies the installed model without loading it (used in cache keys).
+    Returns "no-model" when it isn't installed.
+    """
+    try:
+        return f"{MODEL_NAME}-{metadata.version(MODEL_NAME)}"
+    except metadata.PackageNotFoundError:
+        pass
+    meta_path = os.path.join(MODEL_NAME, "meta.json")
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        return f"{meta.get('name')}-{meta.get('version')}"
+    return "no-model"
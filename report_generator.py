@@ -1,5 +1,17 @@
 from fpdf import FPDF
+import hashlib
+import json
 import os
+import sqlite3
+from disk_cache import DiskCache
+import metrics
+
+REPORT_CACHE_FILE = os.path.join("data", "cache", "report_cache.db")
+REPORT_CACHE_MAX_MB = int(os.environ.get("TALENTLENS_REPORT_CACHE_MB", "128"))
+
+# Candidate fields that end up in a report; a change to any of them re-renders it
+REPORT_FIELDS = ('name', 'email', 'phone', 'experience', 'links', 'education',
+                 'match_score', 'skills', 'missing_skills')
 
 class PDFReport(FPDF):
     def header(self):
@@ -20,7 +32,8 @@ class PDFReport(FPDF):
         self.multi_cell(0, 6, body)
         self.ln()
 
-def generate_report(resume_data, match_score, matching_skills, missing_skills, filepath):
+def render_report(resume_data, match_score, matching_skills, missing_skills):
+    """Renders the analysis report and returns the PDF bytes."""
     pdf = PDFReport()
     pdf.add_page()
     
@@ -82,6 +95,53 @@ def generate_report(resume_data, match_score, matching_skills, missing_skills, f
     else:
         pdf.chapter_body("No critical skills missing.")
         
-    # Save
-    pdf.output(filepath)
+    output = pdf.output(dest='S')
+    # FPDF 1.7 returns a latin-1 str, fpdf2 a bytearray
+    return output.encode('latin-1') if isinstance(output, str) else bytes(output)
+
+def generate_report(resume_data, match_score, matching_skills, missing_skills, filepath):
+    with open(filepath, 'wb') as f:
+        f.write(render_report(resume_data, match_score, matching_skills, missing_skills))
     return filepath
+
+def _template_version():
+    """Changes whenever this module (the report layout) changes, invalidating cached reports."""
+    with open(os.path.abspath(__file__), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+TEMPLATE_VERSION = _template_version()
+report_cache = DiskCache(REPORT_CACHE_FILE, REPORT_CACHE_MAX_MB * 1024 * 1024) if REPORT_CACHE_MAX_MB > 0 else None
+
+def _report_key(candidate):
+    fields = {name: candidate.get(name) for name in REPORT_FIELDS}
+    digest = hashlib.sha256(json.dumps(fields, sort_keys=True, default=str).encode()).hexdigest()
+    return f"{candidate.get('id')}:{digest}:{TEMPLATE_VERSION}"
+
+def candidate_report(candidate):
+    """
+    PDF report for a stored candidate, rendered on first request and served
+    from the report cache until the candidate's data or the layout changes.
+    """
+    key = _report_key(candidate)
+    if report_cache is not None:
+        try:
+            cached = report_cache.get(key)
+        except sqlite3.Error as e:
+            print(f"Warning: report cache unavailable: {e}")
+            cached = None
+        metrics.inc("cache_lookups_total", cache="report", result="miss" if cached is None else "hit")
+        if cached is not None:
+            return cached
+
+    with metrics.timed("render_report"):
+        pdf = render_report(candidate, candidate.get('match_score') or 0,
+                            candidate.get('skills') or [], candidate.get('missing_skills') or [])
+    if report_cache is not None:
+        try:
+            report_cache.set(key, pdf)
+        except sqlite3.Error as e:
+            print(f"Warning: Could not cache report: {e}")
+    return pdf
+
+def report_cache_stats():
+    return report_cache.stats() if report_cache else {"enabled": False}
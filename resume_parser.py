@@ -1,60 +1,100 @@
-import spacy
 from PyPDF2 import PdfReader
 import docx
-import re
-
-# Load spaCy model
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    # If model is not downloaded yet, we might want to handle it or expect it to be handled during setup
-    # For now, we assume it will be available when running
-    print("Model 'en_core_web_sm' not found. Please download it using: python -m spacy download en_core_web_sm")
-    nlp = None
-
-def extract_text_from_pdf(pdf_path):
-    text = ""
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+import hashlib
+import json
+import multiprocessing
+import os
+import signal
+import sqlite3
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from disk_cache import DiskCache
+import field_extractor
+import metrics
+import nlp_models
+
+# Bump when parse_resume's output changes in a way the source hash can't see
+PARSER_VERSION = "2"
+PARSE_CACHE_FILE = os.path.join("data", "cache", "parse_cache.db")
+PARSE_CACHE_MAX_MB = int(os.environ.get("TALENTLENS_PARSE_CACHE_MB", "256"))
+HASH_CHUNK = 1024 * 1024
+# Time budget per file in parse_resumes' worker processes (POSIX only)
+PARSE_TIMEOUT = int(os.environ.get("TALENTLENS_PARSE_TIMEOUT", "60"))
+
+# nlp.pipe batch size for the batched name extraction
+NLP_BATCH_SIZE = int(os.environ.get("TALENTLENS_NLP_BATCH_SIZE", "64"))
+
+# Pages read from a PDF; anything beyond is ignored (0 = no cap)
+MAX_PDF_PAGES = int(os.environ.get("TALENTLENS_MAX_PDF_PAGES", "50"))
+# DOCX has no pages: this much leading text stands in for "page 1"
+DOCX_HEADER_CHARS = 3000
+
+def iter_pdf_pages(pdf_path, max_pages=None):
+    """Yields the text of each page lazily, stopping at max_pages or the first unreadable page."""
+    if max_pages is None:
+        max_pages = MAX_PDF_PAGES
     try:
         reader = PdfReader(pdf_path)
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
+        for n, page in enumerate(reader.pages):
+            if max_pages and n >= max_pages:
+                break
+            yield page.extract_text()
     except Exception as e:
         print(f"Error reading PDF: {e}")
-    return text
 
-def extract_text_from_docx(docx_path):
-    text = ""
+def iter_docx_paragraphs(docx_path):
+    """Yields the text of each top-level paragraph lazily."""
     try:
         doc = docx.Document(docx_path)
-        for para in doc.paragraphs:
-            text += para.text + "\n"
+        for p in doc.element.body.iterchildren(qn('w:p')):
+            yield Paragraph(p, doc._body).text
     except Exception as e:
         print(f"Error reading DOCX: {e}")
-    return text
 
-def extract_contact_info(text):
-    email = None
-    phone = None
+def extract_text_from_pdf(pdf_path, max_pages=None):
+    return "".join(page + "\n" for page in iter_pdf_pages(pdf_path, max_pages))
+
+def extract_text_from_docx(docx_path):
+    return "".join(para + "\n" for para in iter_docx_paragraphs(docx_path))
+
+def file_type(source, filename=None):
+    """
+    '.pdf', '.docx' or another lowercased extension, taken from filename, the
+    path itself, or a file object's name attribute.
+    """
+    name = filename or (source if isinstance(source, str) else getattr(source, 'name', None)) or ''
+    return os.path.splitext(str(name))[1].lower()
 
-    # Email Regex
-    email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    email_match = re.search(email_pattern, text)
-    if email_match:
-        email = email_match.group()
+def _sha256(f):
+    digest = hashlib.sha256()
+    while True:
+        chunk = f.read(HASH_CHUNK)
+        if not chunk:
+            return digest.hexdigest()
+        digest.update(chunk)
 
-    # Phone Regex (Simple pattern, can be improved)
-    # Matches formats like +91-9876543210, 9876543210, 123-456-7890
-    phone_pattern = r'(\+?\d{1,4}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-    phone_match = re.search(phone_pattern, text)
-    if phone_match:
-        phone = phone_match.group()
+def content_hash(source):
+    """sha256 hex digest of a file path or a seekable binary file object (rewound afterwards)."""
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            return _sha256(f)
+    source.seek(0)
+    digest = _sha256(source)
+    source.seek(0)
+    return digest
 
-    return email, phone
+def extract_contact_info(text):
+    return field_extractor.extract_email(text), field_extractor.extract_phone(text)
 
 def extract_name(text):
     # This is a heuristic based approach. 
     # Usually name is at the top. We can use spacy PERSON entity, 
     # but it might pick up other names.
+    nlp = nlp_models.get_nlp("ner")
     if not nlp:
         return "Unknown"
         
@@ -64,12 +104,27 @@ def extract_name(text):
             return ent.text
     return "Unknown"
 
+def extract_names(texts, batch_size=None):
+    """extract_name for many texts through one nlp.pipe call; results keep input order."""
+    nlp = nlp_models.get_nlp("ner")
+    if not nlp:
+        return ["Unknown"] * len(texts)
+
+    names = []
+    # Single process: n_process > 1 would fork from the threaded ingest
+    # workers; parse_resumes spreads parsing over (spawned) processes instead
+    docs = nlp.pipe((text[:200] for text in texts), batch_size=batch_size or NLP_BATCH_SIZE)
+    for doc in docs:
+        names.append(next((ent.text for ent in doc.ents if ent.label_ == "PERSON"), "Unknown"))
+    return names
+
 def extract_skills(text):
     # In a real app, we would have a predefined list of skills or use a more advanced NER.
     # Here we can look for noun chunks or specific keywords if we had a database.
     # For this MVP, we will rely on the matcher to find skills from the job description in the resume.
     # This function returns a raw list of potential skills based on NOUN/PROPN, 
     # but better logic is in the matching phase.
+    nlp = nlp_models.get_nlp("pos")
     if not nlp:
         return []
         
@@ -90,82 +145,62 @@ def extract_experience(text):
     Heuristic to extract years of experience.
     Looks for patterns like '5+ years', '10 years of experience'.
     """
-    # Regex for "X years", "X+ years", "X.Y years"
-    # We look for digits followed by 'year' or 'yrs'
-    pattern = r'(\d+(\.\d+)?)\+?\s*(years?|yrs?)'
-    matches = re.findall(pattern, text.lower())
-    
-    years = []
-    for match in matches:
-        try:
-            val = float(match[0])
-            years.append(val)
-        except ValueError:
-            pass
-            
-    if years:
-        return max(years) # Return the highest number found as potential total experience
-    if years:
-        return max(years) # Return the highest number found as potential total experience
-    return 0
+    return field_extractor.extract_experience(text)
 
 def extract_education(text):
     """
     Extracts education degrees and universities.
     """
-    education = []
-    
-    # Common degrees
-    degrees = [
-        r'B\.?Tech', r'M\.?Tech', r'B\.?Sc', r'M\.?Sc', r'B\.?E', r'M\.?E', 
-        r'Ph\.?D', r'Bachelor', r'Master', r'Diploma', r'MBA', r'BCA', r'MCA'
-    ]
-    
-    for degree in degrees:
-        pattern = r'(?i)\b' + degree + r'\b.*?(?=\n|$)'
-        matches = re.findall(pattern, text)
-        for match in matches:
-            education.append(match.strip())
-            
-    return list(set(education))
+    return field_extractor.extract_education(text)
 
 def extract_links(text):
     """
     Extracts URLs and specifically identifies LinkedIn and GitHub.
     """
-    links = {
-        "linkedin": None,
-        "github": None,
-        "portfolio": []
-    }
-    
-    # Regex for URLs
-    url_pattern = r'https?://(?:[-\w.]|(?:%[\da-fA-F]{2}))+'
-    urls = re.findall(url_pattern, text)
-    
-    for url in urls:
-        if "linkedin.com" in url:
-            links["linkedin"] = url
-        elif "github.com" in url:
-            links["github"] = url
-        else:
-            links["portfolio"].append(url)
-            
-    return links
-
-def parse_resume(file_path):
-    if file_path.endswith('.pdf'):
-        text = extract_text_from_pdf(file_path)
-    elif file_path.endswith('.docx'):
-        text = extract_text_from_docx(file_path)
-    else:
-        return None
+    return field_extractor.extract_links(text)
+
+def _parser_fingerprint():
+    """Changes whenever the parser source or the skills DB changes, invalidating old entries."""
+    digest = hashlib.sha256(PARSER_VERSION.encode())
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    sources = [os.path.abspath(__file__), field_extractor.__file__, os.path.join(base_path, 'data', 'skills_db.json')]
+    for name in sources:
+        try:
+            with open(name, 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            pass
+    return digest.hexdigest()[:16]
+
+PARSER_FINGERPRINT = _parser_fingerprint()
+MODEL_VERSION = nlp_models.model_version()
+parse_cache = DiskCache(PARSE_CACHE_FILE, PARSE_CACHE_MAX_MB * 1024 * 1024) if PARSE_CACHE_MAX_MB > 0 else None
+
+def _read_text(file_path, filename=None):
+    """
+    (full text, first page) of a resume, read in one pass; None for an
+    unsupported file. For DOCX, the first DOCX_HEADER_CHARS stand in for the page.
+    """
+    kind = file_type(file_path, filename)
+    with metrics.timed("extract_text"):
+        if kind == '.pdf':
+            pages = [page + "\n" for page in iter_pdf_pages(file_path)]
+            return "".join(pages), pages[0] if pages else ""
+        elif kind == '.docx':
+            paras = []
+            header_end = 0
+            size = 0
+            for para in iter_docx_paragraphs(file_path):
+                paras.append(para + "\n")
+                if size < DOCX_HEADER_CHARS:
+                    size += len(para) + 1
+                    header_end = len(paras)
+            return "".join(paras), "".join(paras[:header_end])
+    return None
 
-    email, phone = extract_contact_info(text)
-    name = extract_name(text)
-    experience = extract_experience(text)
-    education = extract_education(text)
-    links = extract_links(text)
+def _build_result(text, header, name):
+    with metrics.timed("fields"):
+        fields = field_extractor.extract_fields(text, header)
     
     # We clean the text for further processing
     clean_text = " ".join(text.split())
@@ -173,9 +208,192 @@ def parse_resume(file_path):
     return {
         "text": clean_text,
         "name": name,
-        "email": email,
-        "phone": phone,
-        "experience": experience,
-        "education": education,
-        "links": links
+        "email": fields["email"],
+        "phone": fields["phone"],
+        "experience": fields["experience"],
+        "education": fields["education"],
+        "links": fields["links"]
     }
+
+def _parse_resume(file_path, filename=None):
+    read = _read_text(file_path, filename)
+    if read is None:
+        return None
+    text, header = read
+    with metrics.timed("ner"):
+        name = extract_name(header)
+    return _build_result(text, header, name)
+
+def _cache_key(file_path, filename=None):
+    """Cache key for a file, or None when the file can't be cached."""
+    kind = file_type(file_path, filename)
+    if parse_cache is None or kind not in ('.pdf', '.docx'):
+        return None
+    try:
+        digest = content_hash(file_path)
+    except (OSError, ValueError) as e:
+        print(f"Error reading resume: {e}")
+        return None
+    # The NER model decides extract_name's output, so it is part of the key too
+    return f"{digest}:{kind}:{PARSER_FINGERPRINT}:{MODEL_VERSION}"
+
+def _cache_get(key):
+    if key is None:
+        return None
+    try:
+        cached = parse_cache.get(key)
+    except sqlite3.Error as e:
+        print(f"Warning: parse cache unavailable: {e}")
+        return None
+    metrics.inc("cache_lookups_total", cache="parse", result="miss" if cached is None else "hit")
+    return json.loads(zlib.decompress(cached)) if cached is not None else None
+
+def _cache_set(key, resume_data):
+    if key is None or not resume_data:
+        return
+    try:
+        parse_cache.set(key, zlib.compress(json.dumps(resume_data).encode()))
+    except sqlite3.Error as e:
+        print(f"Warning: Could not cache parse result: {e}")
+
+def parse_resume(file_path, filename=None):
+    """
+    Parses a resume, reusing the cached result when the same file bytes were
+    parsed before by the same parser version.
+
+    file_path may also be a seekable binary file object, such as an upload's
+    spooled stream, so uploads can be parsed without saving them first. The
+    type then comes from filename (or the object's name attribute).
+    """
+    key = _cache_key(file_path, filename)
+    resume_data = _cache_get(key)
+    if resume_data is None:
+        resume_data = _parse_resume(file_path, filename)
+        _cache_set(key, resume_data)
+    return resume_data
+
+def parse_resume_batch(file_paths, batch_size=None):
+    """
+    Parses several resumes with one batched NER pass (nlp.pipe) over all of
+    their header snippets instead of one pipeline call per file.
+    Returns results in input order (None for unsupported files).
+    """
+    results = [None] * len(file_paths)
+    pending = []
+    for i, file_path in enumerate(file_paths):
+        key = _cache_key(file_path)
+        results[i] = _cache_get(key)
+        if results[i] is None:
+            read = _read_text(file_path)
+            if read is not None:
+                pending.append((i, key, read))
+
+    with metrics.timed("ner"):
+        names = extract_names([header for _, _, (_, header) in pending], batch_size)
+    for (i, key, (text, header)), name in zip(pending, names):
+        results[i] = _build_result(text, header, name)
+        _cache_set(key, results[i])
+    return results
+
+def parse_cache_stats():
+    return parse_cache.stats() if parse_cache else {"enabled": False}
+
+class ParseTimeout(BaseException):
+    """
+    Raised inside a worker when a file exceeds its time budget. A BaseException
+    so the broad `except Exception` handlers in the extractors can't swallow it.
+    """
+
+def _on_timeout(signum, frame):
+    raise ParseTimeout()
+
+def _init_worker():
+    # Loaded once per worker process
+    nlp_models.get_nlp("ner")
+
+def _parse_one(file_path, timeout):
+    use_alarm = timeout and hasattr(signal, 'SIGALRM')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return file_path, parse_resume(file_path), None
+    except ParseTimeout:
+        return file_path, None, f"Timed out after {timeout}s"
+    except Exception as e:
+        return file_path, None, str(e)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+def _new_pool(workers):
+    # Spawned, not forked: callers run in threaded processes (the web server,
+    # the ingest workers), and a forked child could inherit a lock that another
+    # thread happened to hold
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_worker)
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+def start_pool(workers):
+    """Starts this process's shared parse pool once (again after a fork); parse_resumes uses it."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = _new_pool(workers)
+            _pool_pid = os.getpid()
+
+def pool_running():
+    return _pool is not None and _pool_pid == os.getpid()
+
+def _discard_pool(pool):
+    # A worker died (e.g. a crashing PDF library) and took the pool with it;
+    # the next start_pool call replaces it
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def parse_resumes(paths, workers=None, timeout=PARSE_TIMEOUT):
+    """
+    Parses many resumes on a pool of worker processes: the shared pool (see
+    start_pool) unless workers is given, else a pool of that many processes
+    for this call. Yields (path, resume_data, error) tuples in completion
+    order; resume_data is None when the file failed, was unsupported or took
+    longer than timeout seconds (POSIX only).
+    """
+    paths = list(paths)
+    if not paths:
+        return
+    shared = _pool if workers is None and pool_running() else None
+    pool = shared or _new_pool(min(workers or os.cpu_count() or 1, len(paths)))
+    futures = {}
+    try:
+        try:
+            for path in paths:
+                futures[pool.submit(_parse_one, path, timeout)] = path
+        except BrokenProcessPool as e:
+            if shared:
+                _discard_pool(shared)
+            for future in futures:
+                future.cancel()
+            for path in paths:
+                yield path, None, str(e)
+            return
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                if shared and isinstance(e, BrokenProcessPool):
+                    _discard_pool(shared)
+                yield futures[future], None, str(e)
+    finally:
+        # Don't keep parsing if the caller stopped consuming results
+        if shared:
+            for future in futures:
+                future.cancel()
+        else:
+            pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,121 @@
+import math
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+import db_handler
+import semantic
+from job_index import count_terms
+from job_matcher import get_match_score
+
+# "cosine" is the original raw-count CountVectorizer score
+METHODS = {
+    "cosine": "Keyword overlap",
+    "tfidf": "TF-IDF",
+    "bm25": "BM25",
+    "semantic": "Semantic (LSA) + keywords",
+}
+DEFAULT_METHOD = "cosine"
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+def content_terms(counts):
+    """Term counts without English stop words."""
+    return {t: c for t, c in counts.items() if t not in ENGLISH_STOP_WORDS}
+
+def corpus_stats(texts):
+    """
+    (document count, total token count, {term: document frequency}) for a
+    list of texts, in the shape db_handler.get_term_stats returns. Mostly for
+    scoring against a corpus other than the stored resumes (e.g. benchmarks).
+    """
+    df = {}
+    length = 0
+    for text in texts:
+        counts = count_terms(text)
+        length += sum(counts.values())
+        for term in counts:
+            df[term] = df.get(term, 0) + 1
+    return len(texts), length, df
+
+def _tfidf_idf(term, n_docs, df):
+    # Smoothed, as in sklearn's TfidfTransformer
+    return math.log((1 + n_docs) / (1 + df.get(term, 0))) + 1
+
+def _bm25_idf(term, n_docs, df):
+    n = df.get(term, 0)
+    return math.log(1 + (n_docs - n + 0.5) / (n + 0.5))
+
+def _tfidf_score(resume, job, stats):
+    n_docs, _, df = stats
+    job_vec = {t: c * _tfidf_idf(t, n_docs, df) for t, c in job.items()}
+    job_norm = math.sqrt(sum(w * w for w in job_vec.values()))
+    resume_norm = math.sqrt(sum((c * _tfidf_idf(t, n_docs, df)) ** 2 for t, c in resume.items()))
+    if not job_norm or not resume_norm:
+        return 0.0
+    dot = sum(w * resume[t] * _tfidf_idf(t, n_docs, df) for t, w in job_vec.items() if t in resume)
+    return dot / (job_norm * resume_norm)
+
+def _bm25_score(resume, job, stats, doc_length):
+    """
+    BM25 of the resume for the job's terms, divided by the most any resume
+    could score for them, so results fall in 0..1 like the other methods.
+    """
+    n_docs, total_length, df = stats
+    avg_length = total_length / n_docs if n_docs else doc_length or 1
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_length / avg_length)
+    score = 0.0
+    best = 0.0
+    for term in job:
+        idf = _bm25_idf(term, n_docs, df)
+        best += idf * (BM25_K1 + 1)
+        tf = resume.get(term)
+        if tf:
+            score += idf * tf * (BM25_K1 + 1) / (tf + norm)
+    return score / best if best else 0.0
+
+def score_batch(resume_texts, job_description, method=DEFAULT_METHOD, stats=None):
+    """
+    Scores many resumes against one job description with the chosen method,
+    as percentages rounded like get_match_score. Corpus statistics come from
+    every stored resume (kept up to date by db_handler on insert) unless
+    stats is given, and are read once for the whole batch.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown scoring method: {method}")
+    if method in ("cosine", "semantic"):
+        scores = [get_match_score(text, job_description) for text in resume_texts]
+        if method == "semantic":
+            # Keyword cosine blended with the latent-space similarity; plain
+            # cosine until there are enough resumes to train the projection
+            similarities = semantic.similarities(resume_texts, job_description)
+            if similarities is not None:
+                scores = [round(semantic.blend(score / 100, sim) * 100, 2)
+                          for score, sim in zip(scores, similarities)]
+        return scores
+
+    job = content_terms(count_terms(job_description))
+    resumes = []
+    lengths = []
+    for text in resume_texts:
+        counts = count_terms(text)
+        resumes.append(content_terms(counts))
+        # BM25 document length counts every token, as the stored corpus totals do
+        lengths.append(sum(counts.values()))
+    if stats is None:
+        terms = set(job)
+        if method == "tfidf":
+            # The resume norms need every resume term's weight too
+            for resume in resumes:
+                terms.update(resume)
+        stats = db_handler.get_term_stats(terms)
+
+    scores = []
+    for resume, length in zip(resumes, lengths):
+        if method == "tfidf":
+            score = _tfidf_score(resume, job, stats)
+        else:
+            score = _bm25_score(resume, job, stats, length)
+        scores.append(round(score * 100, 2))
+    return scores
+
+def match_score(resume_text, job_description, method=DEFAULT_METHOD, stats=None):
+    return score_batch([resume_text], job_description, method, stats)[0]
@@ -0,0 +1,511 @@
+import contextlib
+import json
+import math
+import os
+import threading
+import uuid
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+import numpy as np
+from scipy import sparse
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+import db_handler
+from job_index import count_terms
+
+MODEL_FILE = os.path.join("data", "semantic_model.npz")
+# Vector index files are per model (formatted with its model_id), so workers
+# still on an older model never read or overwrite a newer one's vectors
+INDEX_FILE = os.path.join("data", "semantic_index.{}.npz")
+VECTORS_FILE = os.path.join("data", "semantic_vectors.{}.f32")
+TRAIN_LOCK_FILE = os.path.join("data", "semantic_train.lock")
+DIM = int(os.environ.get("TALENTLENS_SEMANTIC_DIM", "128"))
+# Share of the semantic similarity in blended scores; the rest is the keyword cosine
+WEIGHT = float(os.environ.get("TALENTLENS_SEMANTIC_WEIGHT", "0.5"))
+# Inverted lists searched per query; more is slower but misses fewer neighbours
+NPROBE = int(os.environ.get("TALENTLENS_SEMANTIC_NPROBE", "32"))
+# Too few resumes to learn anything useful below this; semantic scores are then skipped
+MIN_DOCS = 50
+TRAIN_DOCS = 100000
+# How often the background trainer checks whether a model is due
+TRAIN_POLL_SECONDS = 60
+MIN_DF = 2
+MAX_VOCAB = 50000
+# Below this many vectors an exact scan is as fast as the IVF lists
+IVF_MIN_ROWS = 20000
+KMEANS_ITERATIONS = 8
+KMEANS_SAMPLE_PER_LIST = 64
+# Vectors added since the last snapshot stay in memory (and are scanned
+# exactly) until there are this many, or a quarter of the base
+COMPACT_ROWS = 20000
+FETCH_ROWS = 10000
+# ANN neighbours fetched per requested match, then re-ranked by the blended score
+SHORTLIST = 10
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+class SemanticModel:
+    """
+    LSA projection: sublinear TF-IDF over a fixed vocabulary, reduced with
+    TruncatedSVD to DIM dimensions and L2-normalised, so a dot product is the
+    cosine similarity of two documents in the latent space. Terms that keep
+    appearing together ("ml", "machine", "learning") end up close, which lets
+    resumes match job descriptions that word the same skill differently.
+    """
+    def __init__(self, terms, idf, components, model_id=None, generation=0):
+        self.terms = list(terms)
+        self.vocabulary = {term: i for i, term in enumerate(self.terms)}
+        self.idf = np.asarray(idf, dtype=np.float32)
+        self.components = np.ascontiguousarray(components, dtype=np.float32)
+        self.model_id = model_id or uuid.uuid4().hex
+        # candidates_generation of the store it was trained on
+        self.generation = generation
+
+    @property
+    def dim(self):
+        return self.components.shape[0]
+
+    def _tfidf(self, counts_list):
+        indptr = [0]
+        indices = []
+        data = []
+        for counts in counts_list:
+            for term, count in counts.items():
+                col = self.vocabulary.get(term)
+                if col is not None:
+                    indices.append(col)
+                    data.append((1.0 + math.log(count)) * self.idf[col])
+            indptr.append(len(indices))
+        matrix = sparse.csr_matrix((np.array(data, dtype=np.float32), np.array(indices, dtype=np.int64), indptr),
+                                   shape=(len(counts_list), len(self.terms)))
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.diags(1.0 / norms).dot(matrix).astype(np.float32)
+
+    def embed(self, counts_list):
+        """Unit-length float32 vectors (n x dim) for term-count dicts; all-zero for unknown vocabulary."""
+        if not counts_list:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        projected = np.asarray(self._tfidf(counts_list) @ self.components.T, dtype=np.float32)
+        return _normalize_rows(projected)
+
+    def embed_texts(self, texts):
+        return self.embed([count_terms(text) for text in texts])
+
+    @classmethod
+    def train(cls, counts_list, dim=DIM):
+        """Fits the vocabulary, IDF weights and projection on a sample of resumes."""
+        df = {}
+        for counts in counts_list:
+            for term in counts:
+                df[term] = df.get(term, 0) + 1
+        candidates = [t for t, n in df.items()
+                      if n >= MIN_DF and t not in ENGLISH_STOP_WORDS and not t.isdigit()]
+        terms = sorted(candidates, key=lambda t: (-df[t], t))[:MAX_VOCAB]
+        n_docs = len(counts_list)
+        idf = np.array([math.log((1 + n_docs) / (1 + df[t])) + 1 for t in terms], dtype=np.float32)
+        model = cls(terms, idf, np.zeros((0, len(terms)), dtype=np.float32))
+        matrix = model._tfidf(counts_list)
+        n_components = max(1, min(dim, matrix.shape[0] - 1, matrix.shape[1] - 1))
+        svd = TruncatedSVD(n_components=n_components, algorithm='randomized', n_iter=5, random_state=0)
+        svd.fit(matrix)
+        model.components = svd.components_.astype(np.float32)
+        return model
+
+    def save(self, path=MODEL_FILE):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, terms=np.array(self.terms, dtype=str), idf=self.idf, components=self.components,
+                     model_id=np.array(self.model_id), generation=np.array(self.generation))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=MODEL_FILE):
+        with np.load(path) as f:
+            return cls(f['terms'].tolist(), f['idf'], f['components'], str(f['model_id']), int(f['generation']))
+
+def _kmeans(vectors, n_lists, rng):
+    """Spherical k-means on unit vectors; returns unit-length centroids."""
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        empty = ~sums.any(axis=1)
+        # Re-seed empty lists with random vectors so every list stays in use
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        centroids = _normalize_rows(sums).astype(np.float32)
+    return centroids
+
+class SemanticIndex:
+    """
+    Candidate vectors for nearest-neighbour search. The bulk ("base") lives in
+    a memory-mapped float32 file, grouped into IVF lists by nearest k-means
+    centroid, so a query only reads the vectors of the NPROBE lists closest
+    to it. Vectors added since the last snapshot sit in a small in-memory
+    tail that is scanned exactly, until the next compaction rewrites the file.
+    """
+    def __init__(self, model_id, dim):
+        self.model_id = model_id
+        self.dim = dim
+        self.last_seq = 0
+        self.base_ids = np.zeros(0, dtype=np.int64)
+        self.base = np.zeros((0, dim), dtype=np.float32)
+        self.centroids = None
+        self.assign = np.zeros(0, dtype=np.int32)
+        self.list_ptr = np.zeros(1, dtype=np.int64)
+        self.list_rows = np.zeros(0, dtype=np.int64)
+        self.trained_rows = 0
+        self.tail_ids = []
+        self.tail = np.zeros((0, dim), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.base_ids) + len(self.tail_ids)
+
+    def append(self, rows, vectors):
+        """Adds (seq, candidate_id) rows, in seq order, with their vectors."""
+        if not rows:
+            return
+        self.tail_ids.extend(candidate_id for _, candidate_id in rows)
+        self.tail = np.concatenate([self.tail, np.asarray(vectors, dtype=np.float32)])
+        self.last_seq = rows[-1][0]
+
+    def needs_compaction(self):
+        return len(self.tail_ids) >= max(COMPACT_ROWS, len(self.base_ids) // 4)
+
+    def _assign(self, vectors):
+        out = np.empty(len(vectors), dtype=np.int32)
+        for i in range(0, len(vectors), 65536):
+            out[i:i + 65536] = np.argmax(vectors[i:i + 65536] @ self.centroids.T, axis=1)
+        return out
+
+    def compact(self, path=None):
+        """Appends the tail to the vectors file and rebuilds the IVF lists."""
+        if not self.tail_ids:
+            return
+        path = path or VECTORS_FILE.format(self.model_id)
+        tail = self.tail
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            for i in range(0, len(self.base), 65536):
+                f.write(np.ascontiguousarray(self.base[i:i + 65536]).tobytes())
+            f.write(tail.tobytes())
+        os.replace(tmp_path, path)
+        self.base_ids = np.concatenate([self.base_ids, np.array(self.tail_ids, dtype=np.int64)])
+        self.base = np.memmap(path, dtype=np.float32, mode='r', shape=(len(self.base_ids), self.dim))
+        self.tail_ids = []
+        self.tail = np.zeros((0, self.dim), dtype=np.float32)
+
+        n = len(self.base_ids)
+        if n < IVF_MIN_ROWS:
+            return
+        if self.centroids is None or n > 4 * self.trained_rows:
+            # (Re)train the lists as the store grows: about 4 sqrt(n) of them
+            n_lists = int(min(4096, max(16, 4 * math.sqrt(n))))
+            rng = np.random.default_rng(0)
+            sample = np.sort(rng.choice(n, min(n, n_lists * KMEANS_SAMPLE_PER_LIST), replace=False))
+            self.centroids = _kmeans(np.asarray(self.base[sample]), n_lists, rng)
+            self.trained_rows = n
+            self.assign = self._assign(self.base)
+        else:
+            self.assign = np.concatenate([self.assign, self._assign(tail)])
+        self._build_lists()
+
+    def _build_lists(self):
+        self.list_rows = np.argsort(self.assign, kind='stable').astype(np.int64)
+        self.list_ptr = np.concatenate([[0], np.cumsum(np.bincount(self.assign, minlength=len(self.centroids)))])
+
+    def search(self, query, k, nprobe=NPROBE):
+        """The k nearest candidates to a unit query vector as [(candidate_id, similarity)], best first."""
+        n_base = len(self.base_ids)
+        if self.centroids is not None and len(self.assign) == n_base:
+            probes = np.argsort(-(self.centroids @ query))[:nprobe]
+            rows = np.sort(np.concatenate([self.list_rows[self.list_ptr[p]:self.list_ptr[p + 1]] for p in probes]))
+            ids = self.base_ids[rows]
+            sims = self.base[rows] @ query
+        else:
+            ids = self.base_ids
+            sims = np.asarray(self.base @ query)
+        if self.tail_ids:
+            ids = np.concatenate([ids, np.array(self.tail_ids, dtype=np.int64)])
+            sims = np.concatenate([sims, self.tail @ query])
+        if k <= 0 or not len(ids):
+            return []
+        top = np.argpartition(-sims, k - 1)[:k] if k < len(sims) else np.arange(len(sims))
+        top = top[np.lexsort((ids[top], -sims[top]))]
+        return [(int(ids[i]), float(sims[i])) for i in top]
+
+    def save(self, path=None, vectors_path=None):
+        path = path or INDEX_FILE.format(self.model_id)
+        self.compact(vectors_path)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f,
+                     ids=self.base_ids,
+                     assign=self.assign,
+                     centroids=self.centroids if self.centroids is not None else np.zeros((0, self.dim), np.float32),
+                     model_id=np.array(self.model_id),
+                     state=np.array([self.last_seq, self.trained_rows], dtype=np.int64))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, model_id, dim, path=None, vectors_path=None):
+        path = path or INDEX_FILE.format(model_id)
+        vectors_path = vectors_path or VECTORS_FILE.format(model_id)
+        with np.load(path) as f:
+            index = cls(str(f['model_id']), dim)
+            index.base_ids = f['ids']
+            index.assign = f['assign']
+            centroids = f['centroids']
+            index.last_seq, index.trained_rows = (int(v) for v in f['state'])
+        # The file only ever grows by appending, so its first rows always match the snapshot
+        index.base = np.memmap(vectors_path, dtype=np.float32, mode='r', shape=(len(index.base_ids), dim)) \
+            if len(index.base_ids) else np.zeros((0, dim), dtype=np.float32)
+        if len(centroids):
+            index.centroids = centroids
+            index._build_lists()
+        return index
+
+_model = None
+_model_stamp = None
+_index = None
+_lock = threading.Lock()
+_trainer = None
+_trainer_pid = None
+_trainer_lock = threading.Lock()
+_train_requested = threading.Event()
+_force_retrain = False
+
+def _current_model(conn):
+    """
+    The saved model if it was trained on the current store, else None.
+    MODEL_FILE is reloaded whenever it changes, so a model trained by any
+    process is picked up by all of them.
+    """
+    global _model, _model_stamp, _index
+    try:
+        st = os.stat(MODEL_FILE)
+        stamp = (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        stamp = None
+    if stamp != _model_stamp:
+        _model = _index = None
+        _model_stamp = stamp
+        if stamp is not None:
+            try:
+                _model = SemanticModel.load()
+            except Exception as e:
+                print(f"Warning: Could not load semantic model: {e}")
+        if _model is not None and os.path.exists(INDEX_FILE.format(_model.model_id)):
+            try:
+                _index = SemanticIndex.load(_model.model_id, _model.dim)
+            except Exception as e:
+                # Re-embedded on the next refresh
+                print(f"Warning: Could not load semantic index: {e}")
+    if _model is None or _model.generation != db_handler.candidates_generation(conn):
+        # A model of a cleared store is no use; the trainer replaces it
+        return None
+    return _model
+
+@contextlib.contextmanager
+def _train_lock():
+    """Yields whether this process got the cross-process training lock (False if another process holds it)."""
+    with open(TRAIN_LOCK_FILE, 'a+b') as f:
+        try:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _train(conn, generation):
+    # An evenly spaced, deterministic sample: every process would pick the same documents
+    total = conn.execute("SELECT COUNT(*) FROM candidate_terms").fetchone()[0]
+    stride = max(1, -(-total // TRAIN_DOCS))
+    rows = conn.execute("SELECT counts FROM candidate_terms WHERE seq % ? = 0 ORDER BY seq LIMIT ?",
+                        (stride, TRAIN_DOCS)).fetchall()
+    model = SemanticModel.train([json.loads(row[0]) for row in rows])
+    model.generation = generation
+    return model
+
+def _remove_stale_files(model_id):
+    # Unlinking a file another process still has mapped is fine on POSIX;
+    # Windows refuses, and those files go on the next training instead
+    prefixes = (INDEX_FILE.split("{}")[0], VECTORS_FILE.split("{}")[0])
+    folder = os.path.dirname(MODEL_FILE)
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        if path.startswith(prefixes) and model_id not in name:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def train(force=False):
+    """
+    Trains and saves a model for the current store, unless one exists (or
+    there are fewer than MIN_DOCS resumes). Only one process trains at a
+    time; the others skip and load its model. Returns whether it trained.
+    """
+    conn = db_handler.get_connection()
+    os.makedirs(os.path.dirname(TRAIN_LOCK_FILE), exist_ok=True)
+    with _train_lock() as locked:
+        if not locked:
+            return False
+        with _lock:
+            current = _current_model(conn)
+        if current is not None and not force:
+            return False
+        docs = conn.execute("SELECT value FROM meta WHERE key = 'corpus_docs'").fetchone()
+        if not docs or int(docs[0]) < MIN_DOCS:
+            return False
+        model = _train(conn, db_handler.candidates_generation(conn))
+        # Embed every candidate before publishing the model, so workers that
+        # load it get its vectors with it instead of each re-embedding the store
+        index = SemanticIndex(model.model_id, model.dim)
+        _catch_up(conn, model, index)
+        index.save()
+        model.save()
+        _remove_stale_files(model.model_id)
+    return True
+
+def _trainer_loop():
+    global _force_retrain
+    while True:
+        force, _force_retrain = _force_retrain, False
+        try:
+            train(force)
+        except Exception as e:
+            print(f"Semantic trainer error: {e}")
+        _train_requested.wait(TRAIN_POLL_SECONDS)
+        _train_requested.clear()
+
+def start_trainer():
+    """Starts this process's background trainer once (again after a fork)."""
+    global _trainer, _trainer_pid
+    with _trainer_lock:
+        if _trainer_pid == os.getpid() and _trainer is not None:
+            return
+        _trainer_pid = os.getpid()
+        _trainer = threading.Thread(target=_trainer_loop, name="semantic-trainer", daemon=True)
+        _trainer.start()
+
+def _catch_up(conn, model, index):
+    """Embeds the resumes stored since the index was last updated; returns whether it compacted."""
+    compacted = False
+    while True:
+        rows = conn.execute("SELECT seq, candidate_id, counts FROM candidate_terms WHERE seq > ? "
+                            "ORDER BY seq LIMIT ?", (index.last_seq, FETCH_ROWS)).fetchall()
+        if rows:
+            vectors = model.embed([json.loads(row['counts']) for row in rows])
+            index.append([(row['seq'], row['candidate_id']) for row in rows], vectors)
+        if index.needs_compaction():
+            index.compact()
+            compacted = True
+        if len(rows) < FETCH_ROWS:
+            return compacted
+
+def _refresh():
+    """Loads the current model and catches the vector index up with new resumes."""
+    global _index
+    conn = db_handler.get_connection()
+    model = _current_model(conn)
+    if model is None:
+        return None, None
+    if _index is None:
+        _index = SemanticIndex(model.model_id, model.dim)
+    if _catch_up(conn, model, _index):
+        _index.save()
+    return model, _index
+
+def preload():
+    """Loads a trained model and catches its vectors up; never trains one."""
+    with _lock:
+        _refresh()
+
+def similarities(resume_texts, job_description):
+    """
+    Latent-space cosine similarity (0..1) of each resume to the job
+    description, or None when there is no model yet.
+    """
+    start_trainer()
+    with _lock:
+        model = _current_model(db_handler.get_connection())
+    if model is None:
+        return None
+    vectors = model.embed_texts(list(resume_texts) + [job_description])
+    return [max(float(s), 0.0) for s in vectors[:-1] @ vectors[-1]]
+
+def keyword_cosine(resume_counts, job_counts):
+    """Raw term-count cosine, the same value get_match_score computes (as 0..1)."""
+    dot = sum(c * resume_counts.get(t, 0) for t, c in job_counts.items())
+    norm = math.sqrt(sum(c * c for c in job_counts.values())) * math.sqrt(sum(c * c for c in resume_counts.values()))
+    return dot / norm if norm else 0.0
+
+def blend(keyword, semantic, weight=WEIGHT):
+    return (1 - weight) * keyword + weight * semantic
+
+def top_matches(text, k=20, weight=WEIGHT):
+    """
+    The k stored candidates closest to the text by blended score, as
+    [(candidate_id, blended, semantic, keyword)] with scores in 0..1. The
+    IVF index picks SHORTLIST x k semantic neighbours, which are re-ranked
+    with their exact keyword cosine. None when there is no model yet.
+    """
+    start_trainer()
+    with _lock:
+        model, index = _refresh()
+        if model is None:
+            return None
+        query = model.embed_texts([text])[0]
+        neighbours = index.search(query, k * SHORTLIST)
+    job_counts = count_terms(text)
+    resume_counts = db_handler.get_term_counts(c_id for c_id, _ in neighbours)
+    ranked = []
+    for c_id, semantic in neighbours:
+        semantic = max(semantic, 0.0)
+        keyword = keyword_cosine(resume_counts.get(c_id, {}), job_counts)
+        ranked.append((c_id, blend(keyword, semantic, weight), semantic, keyword))
+    ranked.sort(key=lambda r: (-r[1], r[0]))
+    return ranked[:k]
+
+def rebuild():
+    """Asks the background trainer to retrain the model on the current resumes; candidates are re-embedded after."""
+    global _force_retrain
+    _force_retrain = True
+    start_trainer()
+    _train_requested.set()
+
+def stats():
+    start_trainer()
+    with _lock:
+        model = _current_model(db_handler.get_connection())
+        index = _index
+    if model is None:
+        return {"trained": False, "min_docs": MIN_DOCS}
+    return {
+        "trained": True,
+        "dim": model.dim,
+        "vocabulary": len(model.terms),
+        "vectors": len(index) if index else 0,
+        "ivf_lists": len(index.centroids) if index is not None and index.centroids is not None else 0,
+        "weight": WEIGHT,
+    }
@@ -0,0 +1,306 @@
+import os
+import re
+import threading
+import numpy as np
+import db_handler
+
+INDEX_FILE = os.path.join("data", "skill_index.npz")
+# Candidates added since the last snapshot are kept in per-skill Python lists
+# and merged into the packed arrays once there are this many (or a quarter of
+# the base, whichever is more).
+COMPACT_ROWS = 20000
+FETCH_ROWS = 10000
+
+class SkillIndex:
+    """
+    Inverted index from normalised skill to the candidates that have it.
+
+    Candidates are numbered by position in the sorted `ids` array, and each
+    skill's postings are a sorted run of int32 positions inside one packed
+    array (CSR style: `ptr[row]:ptr[row + 1]`). Queries work on boolean
+    bitmaps over positions, which makes AND/OR/NOT plain numpy operators. A
+    forward copy (candidate -> skill rows, `fwd_ptr`/`fwd_rows`) lets facet
+    counts read only the matching candidates' skills.
+    """
+    def __init__(self):
+        self.generation = 0
+        self.last_id = 0
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.skills = []
+        self.rows = {}
+        self.ptr = np.zeros(1, dtype=np.int64)
+        self.positions = np.zeros(0, dtype=np.int32)
+        self.fwd_ptr = np.zeros(1, dtype=np.int64)
+        self.fwd_rows = np.zeros(0, dtype=np.int32)
+        self.tail_ids = []
+        self.tail = {}
+
+    def __len__(self):
+        return len(self.ids) + len(self.tail_ids)
+
+    def append(self, rows):
+        """Adds (candidate_id, skills) rows in id order."""
+        for candidate_id, skills in rows:
+            position = len(self)
+            self.tail_ids.append(candidate_id)
+            for skill in skills:
+                self.tail.setdefault(skill, []).append(position)
+            self.last_id = candidate_id
+
+    def needs_compaction(self):
+        return len(self.tail_ids) >= max(COMPACT_ROWS, len(self.ids) // 4)
+
+    def compact(self):
+        """Merges the tail into the packed postings."""
+        if not self.tail_ids:
+            return
+        for skill in self.tail:
+            if skill not in self.rows:
+                self.rows[skill] = len(self.skills)
+                self.skills.append(skill)
+        # (row, position) pairs of the base and the tail, sorted by row then position
+        base_rows = np.repeat(np.arange(len(self.ptr) - 1, dtype=np.int32), np.diff(self.ptr))
+        tail_rows = np.concatenate([np.full(len(p), self.rows[s], dtype=np.int32) for s, p in self.tail.items()]
+                                   or [np.zeros(0, dtype=np.int32)])
+        tail_positions = np.concatenate([np.array(p, dtype=np.int32) for p in self.tail.values()]
+                                        or [np.zeros(0, dtype=np.int32)])
+        rows = np.concatenate([base_rows, tail_rows])
+        positions = np.concatenate([self.positions, tail_positions])
+        order = np.lexsort((positions, rows))
+        self.positions = positions[order]
+        self.ptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=len(self.skills)))])
+        self.ids = np.concatenate([self.ids, np.array(self.tail_ids, dtype=np.int64)])
+        self.tail_ids = []
+        self.tail = {}
+        self._build_forward()
+
+    def _build_forward(self):
+        rows = np.repeat(np.arange(len(self.ptr) - 1, dtype=np.int32), np.diff(self.ptr))
+        order = np.argsort(self.positions, kind='stable')
+        self.fwd_rows = rows[order]
+        self.fwd_ptr = np.concatenate([[0], np.cumsum(np.bincount(self.positions, minlength=len(self.ids)))])
+
+    def _count_skills(self, positions):
+        """Per-skill counts over the skills of the given base positions."""
+        starts = self.fwd_ptr[positions]
+        lengths = self.fwd_ptr[positions + 1] - starts
+        # Concatenated ranges starts[i]:starts[i] + lengths[i]
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        picked = self.fwd_rows[np.arange(len(offsets)) + offsets]
+        return np.bincount(picked, minlength=len(self.skills))
+
+    def postings(self, skill):
+        """Sorted positions of the candidates with the skill."""
+        row = self.rows.get(skill)
+        base = self.positions[self.ptr[row]:self.ptr[row + 1]] if row is not None else self.positions[:0]
+        tail = self.tail.get(skill)
+        return np.concatenate([base, np.array(tail, dtype=np.int32)]) if tail else base
+
+    def bitmap(self, skill):
+        mask = np.zeros(len(self), dtype=bool)
+        mask[self.postings(skill)] = True
+        return mask
+
+    def candidate_ids(self, mask):
+        all_ids = np.concatenate([self.ids, np.array(self.tail_ids, dtype=np.int64)]) if self.tail_ids else self.ids
+        return all_ids[mask]
+
+    def facets(self, mask=None, limit=None):
+        """
+        Candidate count per skill, within the mask (or over everyone), most
+        common first, as [(skill, count)].
+        """
+        if mask is None:
+            mask = np.ones(len(self), dtype=bool)
+        base = mask[:len(self.ids)]
+        selected = np.flatnonzero(base)
+        if len(selected) <= len(self.ids) // 2:
+            base_counts = self._count_skills(selected)
+        else:
+            # Cheaper to count the candidates left out and subtract
+            base_counts = np.diff(self.ptr) - self._count_skills(np.flatnonzero(~base))
+        counts = dict(zip(self.skills, base_counts.tolist()))
+        for skill, positions in self.tail.items():
+            counts[skill] = counts.get(skill, 0) + int(mask[positions].sum())
+        ranked = sorted(((s, c) for s, c in counts.items() if c), key=lambda x: (-x[1], x[0]))
+        return ranked[:limit] if limit else ranked
+
+    def save(self, path=INDEX_FILE):
+        self.compact()
+        # Postings are delta-encoded per skill so they compress well on disk
+        deltas = np.diff(self.positions, prepend=0)
+        starts = self.ptr[:-1][np.diff(self.ptr) > 0]
+        deltas[starts] = self.positions[starts]
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f,
+                                skills=np.array(self.skills, dtype=str),
+                                ids=self.ids,
+                                ptr=self.ptr,
+                                deltas=deltas,
+                                state=np.array([self.generation, self.last_id], dtype=np.int64))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        index = cls()
+        with np.load(path) as f:
+            index.skills = f['skills'].tolist()
+            index.ids = f['ids']
+            index.ptr = f['ptr']
+            deltas = f['deltas'].astype(np.int64)
+            index.generation, index.last_id = (int(v) for v in f['state'])
+        index.rows = {skill: row for row, skill in enumerate(index.skills)}
+        # Undo the per-skill delta encoding: a running sum restarted at each skill
+        sums = np.cumsum(deltas)
+        lengths = np.diff(index.ptr)
+        starts = index.ptr[:-1][lengths > 0]
+        offsets = np.repeat(sums[starts] - deltas[starts], lengths[lengths > 0])
+        index.positions = (sums - offsets).astype(np.int32)
+        index._build_forward()
+        return index
+
+QUERY_TOKEN = re.compile(r'\s*(\(|\)|\bAND\b|\bOR\b|\bNOT\b)\s*', re.IGNORECASE)
+
+def parse_query(query):
+    """
+    Parses a boolean skill query such as "python AND (docker OR kubernetes)
+    AND NOT java" into nested tuples: ('and', a, b), ('or', a, b),
+    ('not', a) or ('skill', name). Raises ValueError on malformed input.
+    """
+    tokens = [t for t in QUERY_TOKEN.split(query) if t and t.strip()]
+    tokens = [t.upper() if t.upper() in ('AND', 'OR', 'NOT') else t for t in tokens]
+    pos = 0
+
+    def peek():
+        return tokens[pos] if pos < len(tokens) else None
+
+    def take():
+        nonlocal pos
+        pos += 1
+        return tokens[pos - 1]
+
+    def expr():
+        node = term()
+        while peek() == 'OR':
+            take()
+            node = ('or', node, term())
+        return node
+
+    def term():
+        node = factor()
+        while peek() == 'AND':
+            take()
+            node = ('and', node, factor())
+        return node
+
+    def factor():
+        token = peek()
+        if token is None:
+            raise ValueError("Incomplete skill query.")
+        take()
+        if token == 'NOT':
+            return ('not', factor())
+        if token == '(':
+            node = expr()
+            if peek() != ')':
+                raise ValueError("Missing ')' in skill query.")
+            take()
+            return node
+        if token in (')', 'AND', 'OR'):
+            raise ValueError(f"Unexpected '{token}' in skill query.")
+        return ('skill', db_handler.normalize_skill(token))
+
+    if not tokens:
+        raise ValueError("Empty skill query.")
+    node = expr()
+    if pos != len(tokens):
+        raise ValueError(f"Unexpected '{tokens[pos]}' in skill query.")
+    return node
+
+def evaluate(index, node):
+    """Bitmap of the candidates matching a parsed query."""
+    op = node[0]
+    if op == 'skill':
+        return index.bitmap(node[1])
+    if op == 'not':
+        return ~evaluate(index, node[1])
+    if op == 'and':
+        return evaluate(index, node[1]) & evaluate(index, node[2])
+    return evaluate(index, node[1]) | evaluate(index, node[2])
+
+_index = None
+_lock = threading.Lock()
+
+def _load(generation):
+    if os.path.exists(INDEX_FILE):
+        try:
+            index = SkillIndex.load()
+            if index.generation == generation:
+                return index
+            # Snapshot of a store that has since been cleared
+            os.remove(INDEX_FILE)
+        except Exception as e:
+            print(f"Warning: Could not load skill index, rebuilding: {e}")
+    index = SkillIndex()
+    index.generation = generation
+    return index
+
+def _refresh():
+    """
+    Catches the shared index up with candidates stored since it was last read.
+    Candidate ids only grow, so everything past last_id is new.
+    """
+    global _index
+    conn = db_handler.get_connection()
+    generation = db_handler.candidates_generation(conn)
+    if _index is None or _index.generation != generation:
+        # First use, or the store was cleared since
+        _index = _load(generation)
+
+    compacted = False
+    while True:
+        ids = [row[0] for row in conn.execute(
+            "SELECT id FROM candidates WHERE id > ? ORDER BY id LIMIT ?", (_index.last_id, FETCH_ROWS))]
+        if not ids:
+            break
+        skills = {candidate_id: [] for candidate_id in ids}
+        for row in conn.execute("SELECT candidate_id, skill FROM candidate_skills "
+                                "WHERE candidate_id BETWEEN ? AND ?", (ids[0], ids[-1])):
+            skills[row[0]].append(row[1])
+        _index.append(skills.items())
+        if _index.needs_compaction():
+            _index.compact()
+            compacted = True
+        if len(ids) < FETCH_ROWS:
+            break
+
+    if compacted:
+        _index.save()
+    return _index
+
+def get_index():
+    with _lock:
+        return _refresh()
+
+def search(query, limit=None, facets=None):
+    """
+    Runs a boolean skill query over every stored candidate. Returns
+    {"count", "candidate_ids" (newest first, up to limit), "facets"}, where
+    facets holds the most common skills among the matches (top `facets`).
+    """
+    node = parse_query(query)
+    with _lock:
+        index = _refresh()
+        mask = evaluate(index, node)
+        ids = index.candidate_ids(mask)[::-1]
+        return {
+            "count": int(len(ids)),
+            "candidate_ids": ids[:limit].tolist() if limit is not None else ids.tolist(),
+            "facets": index.facets(mask, facets) if facets else [],
+        }
+
+def skill_facets(limit=None):
+    """Candidate count per skill over the whole store, most common first."""
+    with _lock:
+        return _refresh().facets(limit=limit)
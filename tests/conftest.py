@@ -0,0 +1,15 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# The app keeps its database, indexes and spool folders under relative paths;
+# run from a throwaway directory so tests never touch a real store. Must
+# happen before the app modules are imported.
+_tmp = tempfile.TemporaryDirectory(prefix="talentlens-tests-")
+os.chdir(_tmp.name)
+os.environ["TALENTLENS_DB"] = os.path.join(_tmp.name, "data", "talentlens.db")
+os.environ["TALENTLENS_PARSE_CACHE_MB"] = "0"
+os.environ["TALENTLENS_REPORT_CACHE_MB"] = "0"
@@ -0,0 +1,104 @@
+import io
+import os
+import tarfile
+import time
+import zipfile
+
+import pytest
+
+import archive
+import db_handler
+import ingest
+
+ENTRIES = {
+    "resumes/alice.pdf": b"%PDF-1.4 alice",
+    "resumes/bob.docx": b"PK bob",
+    "notes.txt": b"not a resume",
+    "__MACOSX/resumes/._alice.pdf": b"resource fork",
+    "resumes/.DS_Store": b"finder junk",
+}
+
+
+def make_zip(path, entries=ENTRIES):
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr("resumes/", b"")
+        for name, data in entries.items():
+            zf.writestr(name, data)
+    return str(path)
+
+
+def make_tar(path, entries=ENTRIES):
+    with tarfile.open(path, 'w:gz') as tf:
+        for name, data in entries.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+    return str(path)
+
+
+@pytest.mark.parametrize("make, name", [(make_zip, "batch.zip"), (make_tar, "batch.tar.gz")])
+def test_iter_entries_skips_folders_and_junk(tmp_path, make, name):
+    path = make(tmp_path / name)
+    entries = [(entry, size, f.read()) for entry, size, f in archive.iter_entries(path)]
+    assert entries == [(entry, len(data), data) for entry, data in ENTRIES.items()
+                       if entry in ("resumes/alice.pdf", "resumes/bob.docx", "notes.txt")]
+
+
+def test_iter_entries_rejects_other_files(tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(b"%PDF-1.4")
+    with pytest.raises(archive.ArchiveError):
+        list(archive.iter_entries(str(path)))
+
+
+def test_copy_entry_stops_at_the_limit(tmp_path):
+    target = tmp_path / "entry.pdf"
+    assert archive.copy_entry(io.BytesIO(b"x" * 100), str(target), limit=100) == 100
+    with pytest.raises(archive.BadEntry):
+        archive.copy_entry(io.BytesIO(b"x" * 101), str(target), limit=100)
+    assert not target.exists()
+
+
+def queue_archive(path):
+    """An archive row as create_batch would queue it, without starting the workers."""
+    ingest._connection()
+    batch_id = f"test{time.time_ns():028x}"[:32]
+    with db_handler.transaction() as conn:
+        conn.execute("INSERT INTO ingest_batches (id, job_description, job_role, created) "
+                     "VALUES (?, 'python', 'Archive test', 'now')", (batch_id,))
+        file_id = conn.execute("INSERT INTO ingest_files (batch_id, filename, path, kind, status, updated) "
+                               "VALUES (?, ?, ?, 'archive', 'running', ?)",
+                               (batch_id, os.path.basename(path), path, time.time())).lastrowid
+        row = conn.execute("SELECT * FROM ingest_files WHERE id = ?", (file_id,)).fetchone()
+        batch = conn.execute("SELECT * FROM ingest_batches WHERE id = ?", (batch_id,)).fetchone()
+    return row, batch
+
+
+def unpacked(file_id):
+    rows = ingest._connection().execute(
+        "SELECT filename, status, error, path FROM ingest_files WHERE archive_id = ? ORDER BY id", (file_id,))
+    return [dict(row) for row in rows]
+
+
+def test_unpack_queues_resumes_and_skips_the_rest(tmp_path, monkeypatch):
+    entries = dict(ENTRIES, **{"big.pdf": b"x" * 64})
+    monkeypatch.setattr(archive, "MAX_ENTRY_BYTES", 32)
+    row, batch = queue_archive(make_zip(tmp_path / "batch.zip", entries))
+
+    assert ingest._unpack(row, batch) == 4
+    files = unpacked(row['id'])
+    assert [(f['filename'], f['status']) for f in files] == [
+        ("alice.pdf", "queued"), ("bob.docx", "queued"), ("notes.txt", "skipped"), ("big.pdf", "skipped")]
+    assert files[2]['error'] == "Unsupported file type."
+    assert files[3]['error'].startswith("Larger than")
+    for f in files[:2]:
+        with open(f['path'], 'rb') as copy:
+            assert copy.read() == entries[f"resumes/{f['filename']}"]
+    assert all(f['path'] == '' for f in files[2:])
+
+
+def test_unpack_resumes_after_the_entries_already_queued(tmp_path):
+    row, batch = queue_archive(make_zip(tmp_path / "batch.zip"))
+    ingest._unpack(row, batch)
+    assert ingest._unpack(row, batch) == 3
+    assert len(unpacked(row['id'])) == 3
@@ -0,0 +1,56 @@
+import base64
+import json
+
+import pytest
+
+import db_handler
+
+
+def raw_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+@pytest.mark.parametrize("sort, value", [
+    ("date", 1700000000),
+    ("match_score", 87.5),
+    ("match_score", None),
+    ("experience", 3),
+])
+def test_round_trip(sort, value):
+    assert db_handler.decode_cursor(db_handler.encode_cursor(value, 42), sort) == (value, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", raw_cursor("oops"), raw_cursor([1, 2, 3])])
+def test_rejects_malformed(cursor):
+    with pytest.raises(ValueError):
+        db_handler.decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("sort, payload", [
+    ("date", [[1], 5]),
+    ("date", [{"a": 1}, 5]),
+    ("date", [12.5, 5]),
+    ("date", [None, 5]),
+    ("match_score", ["87", 5]),
+    ("match_score", [True, 5]),
+    ("experience", [3, "5"]),
+    ("experience", [3, 5.0]),
+])
+def test_rejects_values_that_dont_fit_the_sort(sort, payload):
+    with pytest.raises(ValueError):
+        db_handler.decode_cursor(raw_cursor(payload), sort)
+
+
+def test_pages_follow_the_cursor():
+    for n in range(5):
+        db_handler.add_candidate({"name": f"Cursor {n}", "match_score": float(n), "job_role": "Cursor test"},
+                                 resume_text=f"cursor test resume number {n}")
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = db_handler.query_candidates(sort='match_score', cursor=cursor, limit=2,
+                                                   job_role="Cursor test")
+        seen.extend(c['match_score'] for c in page)
+        if cursor is None:
+            break
+    assert seen == [4.0, 3.0, 2.0, 1.0, 0.0]
@@ -0,0 +1,32 @@
+import pytest
+
+import db_handler
+from job_matcher import get_match_score, get_match_scores
+
+RESUMES = [
+    "Senior Python developer: Flask, SQLite, Docker and Kubernetes on AWS.",
+    "Data scientist with pandas, scikit-learn and SQL; Python and R.",
+    "Frontend engineer. React, TypeScript, CSS. Some Node.js.",
+    "",
+]
+JOBS = [
+    ("Backend", "Python backend developer with Flask and Docker experience."),
+    ("Data", "Data scientist: Python, SQL, scikit-learn, statistics."),
+    ("Web", "React and TypeScript frontend engineer."),
+]
+
+
+def test_batch_scores_match_pairwise_scores():
+    for title, description in JOBS:
+        db_handler.add_job(title, description)
+    jobs = db_handler.get_jobs()
+    descriptions = {job['id']: job['description'] for job in jobs}
+
+    job_ids, scores = get_match_scores(RESUMES, jobs)
+
+    assert sorted(job_ids) == sorted(descriptions)
+    for resume, row in zip(RESUMES, scores):
+        assert len(row) == len(job_ids)
+        for job_id, score in zip(job_ids, row):
+            expected = get_match_score(resume, descriptions[job_id]) if resume.strip() else 0.0
+            assert score == pytest.approx(expected, abs=0.01)
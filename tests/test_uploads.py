@@ -0,0 +1,68 @@
+import pytest
+
+import app as talentlens
+import uploads
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_FOLDER", str(tmp_path / "partial"))
+    return talentlens.app.test_client()
+
+
+def start(client, size):
+    response = client.post("/api/uploads", data={"filename": "resumes.zip", "size": size})
+    assert response.status_code == 201
+    return response.get_json()["upload_id"]
+
+
+def put(client, upload_id, offset, data):
+    return client.put(f"/api/uploads/{upload_id}", data=data, headers={"Upload-Offset": str(offset)})
+
+
+def test_chunks_resume_from_the_received_offset(client):
+    upload_id = start(client, 10)
+    assert put(client, upload_id, 0, b"01234").get_json()["received"] == 5
+
+    # A dropped connection: the client asks where to carry on
+    status = client.get(f"/api/uploads/{upload_id}").get_json()
+    assert (status["received"], status["complete"]) == (5, False)
+
+    response = put(client, upload_id, status["received"], b"56789")
+    assert response.status_code == 200
+    assert response.get_json()["complete"] is True
+
+
+@pytest.mark.parametrize("offset", [0, 3, 8])
+def test_wrong_offset_is_a_conflict(client, offset):
+    upload_id = start(client, 10)
+    put(client, upload_id, 0, b"01234")
+    response = put(client, upload_id, offset, b"xx")
+    assert response.status_code == 409
+    assert response.get_json()["offset"] == 5
+    assert client.get(f"/api/uploads/{upload_id}").get_json()["received"] == 5
+
+
+def test_chunk_past_the_declared_size_is_rejected(client):
+    upload_id = start(client, 4)
+    response = put(client, upload_id, 0, b"012345")
+    assert response.status_code == 409
+    assert response.get_json()["offset"] == 0
+    assert client.get(f"/api/uploads/{upload_id}").get_json()["received"] == 0
+
+
+def test_incomplete_upload_cannot_be_queued(client):
+    upload_id = start(client, 10)
+    put(client, upload_id, 0, b"0123")
+    response = client.post(f"/api/uploads/{upload_id}/batch", data={"job_description": "python"})
+    assert response.status_code == 409
+    assert response.get_json()["offset"] == 4
+
+
+def test_upload_is_taken_once(client, tmp_path):
+    upload_id = start(client, 4)
+    put(client, upload_id, 0, b"data")
+    assert uploads.take_upload(upload_id, str(tmp_path / "first.zip")) == "resumes.zip"
+    assert (tmp_path / "first.zip").read_bytes() == b"data"
+    with pytest.raises(uploads.UploadError):
+        uploads.take_upload(upload_id, str(tmp_path / "second.zip"))
@@ -0,0 +1,162 @@
+import contextlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+# Resumable chunked uploads for files too big for one request (bulk archives).
+# Each upload is a <id>.part file that chunks are appended to, plus an
+# <id>.json with its name and total size; the .part size is the offset the
+# client resumes from, so a dropped connection only loses the chunk in flight.
+# Like the batch spool, they live under instance/, which Flask doesn't serve.
+UPLOAD_FOLDER = os.path.join('instance', 'uploads', 'partial')
+MAX_UPLOAD_MB = int(os.environ.get("TALENTLENS_MAX_UPLOAD_MB", "4096"))
+# Unfinished uploads untouched for this long are removed
+UPLOAD_TTL = 24 * 3600
+COPY_CHUNK = 1024 * 1024
+# Windows locks byte ranges: lock the byte just past the largest allowed upload
+LOCK_OFFSET = MAX_UPLOAD_MB * 1024 * 1024
+
+ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+class UploadError(Exception):
+    """
+    A chunk that can't be accepted. offset is where the client should resume
+    from (None if the upload doesn't exist).
+    """
+    def __init__(self, message, offset=None):
+        super().__init__(message)
+        self.offset = offset
+
+def _paths(upload_id):
+    if not ID_RE.match(upload_id or ''):
+        return None, None
+    base = os.path.join(UPLOAD_FOLDER, upload_id)
+    return base + '.part', base + '.json'
+
+@contextlib.contextmanager
+def _locked(f):
+    """Holds an exclusive lock on an open file, across processes too."""
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+        return
+    f.seek(LOCK_OFFSET)
+    # LK_LOCK retries for about 10 seconds, then raises OSError
+    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+    try:
+        yield
+    finally:
+        f.seek(LOCK_OFFSET)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _expire():
+    now = time.time()
+    for name in os.listdir(UPLOAD_FOLDER):
+        upload_id, ext = os.path.splitext(name)
+        try:
+            # The .part is touched by every chunk, so it dates the upload's last activity
+            if ext == '.part' and now - os.path.getmtime(os.path.join(UPLOAD_FOLDER, name)) > UPLOAD_TTL:
+                cancel_upload(upload_id)
+        except OSError:
+            pass
+
+def start_upload(filename, size):
+    """Opens a new upload of size bytes and returns its id."""
+    if size <= 0 or size > MAX_UPLOAD_MB * 1024 * 1024:
+        raise UploadError(f"Upload size must be between 1 byte and {MAX_UPLOAD_MB} MB.")
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    _expire()
+    upload_id = uuid.uuid4().hex
+    part_path, meta_path = _paths(upload_id)
+    open(part_path, 'wb').close()
+    with open(meta_path, 'w') as f:
+        json.dump({"filename": filename, "size": size, "created": time.time()}, f)
+    return upload_id
+
+def get_upload(upload_id):
+    """{"id", "filename", "size", "received", "complete"} or None for unknown ids."""
+    part_path, meta_path = _paths(upload_id)
+    if not part_path or not os.path.exists(meta_path):
+        return None
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        received = os.path.getsize(part_path)
+    except (OSError, ValueError):
+        return None
+    return {
+        "id": upload_id,
+        "filename": meta['filename'],
+        "size": meta['size'],
+        "received": received,
+        "complete": received >= meta['size'],
+    }
+
+def append_chunk(upload_id, offset, stream):
+    """
+    Appends the bytes of stream at offset, which must equal the bytes
+    received so far (otherwise UploadError carries the right offset). Returns
+    the new total. Chunks are copied in fixed-size pieces, never held whole.
+    """
+    upload = get_upload(upload_id)
+    if upload is None:
+        raise UploadError("Unknown upload.")
+    part_path, _ = _paths(upload_id)
+    # Serialises concurrent chunks for the same upload, across processes too
+    with open(part_path, 'r+b') as f, _locked(f):
+        received = os.fstat(f.fileno()).st_size
+        if offset != received:
+            raise UploadError(f"Expected offset {received}.", offset=received)
+        f.seek(received)
+        while True:
+            chunk = stream.read(COPY_CHUNK)
+            if not chunk:
+                break
+            received += len(chunk)
+            if received > upload['size']:
+                f.truncate(offset)
+                raise UploadError("Chunk goes past the declared upload size.", offset=offset)
+            f.write(chunk)
+        f.flush()
+    return received
+
+def take_upload(upload_id, path):
+    """
+    Moves a complete upload to path and forgets it. Returns its filename;
+    raises UploadError while bytes are still missing, or if a concurrent
+    request took the upload first.
+    """
+    part_path, meta_path = _paths(upload_id)
+    if not part_path or not os.path.exists(meta_path):
+        raise UploadError("Unknown upload.")
+    try:
+        f = open(part_path, 'r+b')
+    except FileNotFoundError:
+        raise UploadError("Upload was already taken.")
+    # The metadata file is the claim: whoever removes it under the lock owns the upload
+    with f, _locked(f):
+        upload = get_upload(upload_id)
+        if upload is None:
+            raise UploadError("Upload was already taken.")
+        if not upload['complete']:
+            raise UploadError("Upload is not complete.", offset=upload['received'])
+        os.remove(meta_path)
+    shutil.move(part_path, path)
+    return upload['filename']
+
+def cancel_upload(upload_id):
+    for path in _paths(upload_id):
+        if path and os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,31 @@
+"""
+Production entry point:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+gunicorn.conf.py sets preload_app, so this module is imported once in the
+gunicorn master. Everything expensive (spaCy pipelines, the skill matcher,
+the candidate/skill/job indexes, a trained semantic model) is loaded here,
+before the workers are forked, and the workers share those pages
+copy-on-write instead of each loading its own copy.
+"""
+import gc
+import candidate_index
+import job_index
+import nlp_models
+import semantic
+import skill_index
+from app import app
+
+def preload():
+    nlp_models.preload()
+    job_index.get_index()
+    candidate_index.get_index()
+    skill_index.get_index()
+    semantic.preload()
+    # Move everything loaded so far out of the collector's reach: a
+    # collection in a worker would otherwise write to (and so copy) every
+    # page holding a tracked object
+    gc.freeze()
+
+preload()